@@ -0,0 +1,3 @@
+"""
+Shared utilities used by both idea_potential and idea_refinement_engine
+"""
@@ -0,0 +1,127 @@
+"""
+Headless answers to the clarification and validation questions both engines ask, so a run
+doesn't block on input() and can be run unattended, benchmarked or load-tested
+"""
+
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Union
+
+from settings import ANSWER_PROVIDER, ANSWER_PROVIDER_FALLBACK
+
+CLARIFICATION = "clarification"
+VALIDATION = "validation"
+
+
+@dataclass
+class Question:
+    """A question an engine needs answered, with the answer suggestions it generated for it"""
+    text: str
+    kind: str = CLARIFICATION
+    suggestions: List[str] = field(default_factory=list)
+    context: Dict[str, Any] = field(default_factory=dict)
+    number: int = 1  # Position among the run's questions of this kind, from 1
+
+
+class AnswerProvider(ABC):
+    """Answers questions in place of a person at the terminal.
+    
+    answer() returns None when the provider has nothing to add; the engine then stops asking
+    questions of that kind and continues with what it has, e.g. summarises the clarification.
+    """
+    
+    # Whether the engine should generate answer suggestions for the questions
+    uses_suggestions = False
+    
+    @abstractmethod
+    def answer(self, question: Question) -> Optional[str]:
+        """The answer to a question, or None to stop asking questions of its kind"""
+
+
+class SkipAnswers(AnswerProvider):
+    """Answers nothing, so the idea is analyzed as given"""
+    
+    def answer(self, question: Question) -> Optional[str]:
+        return None
+
+
+class SuggestedAnswers(AnswerProvider):
+    """Picks one of the suggestions the engine generated (SuggesterAgent or GenericSuggestionAgent) for every question"""
+    
+    uses_suggestions = True
+    
+    def __init__(self, choice: int = 0, max_answers: int = 6):
+        self.choice = choice
+        # The clarifiers keep asking until they are satisfied, so auto-answered runs are capped
+        self.max_answers = max_answers
+    
+    def answer(self, question: Question) -> Optional[str]:
+        if question.number > self.max_answers or not question.suggestions:
+            return None
+        return question.suggestions[min(self.choice, len(question.suggestions) - 1)]
+
+
+class ScriptedAnswers(AnswerProvider):
+    """Answers from a script in order: one list for every question, or a list per question kind.
+    
+    When the script runs out, questions go to the fallback provider, or the engine stops asking.
+    A script is consumed as it is answered, so use a new provider for every run.
+    """
+    
+    def __init__(self, answers: Union[List[str], Dict[str, List[str]]], fallback: Optional[AnswerProvider] = None):
+        if isinstance(answers, dict):
+            self._queues = {kind: deque(items) for kind, items in answers.items()}
+        else:
+            self._queues = {None: deque(answers)}
+        self.fallback = fallback
+    
+    @classmethod
+    def from_file(cls, path: str, fallback: Optional[AnswerProvider] = None) -> 'ScriptedAnswers':
+        """Load a JSON list or {kind: [answers]} object, or a JSONL file of answers or {"kind", "answer"} objects"""
+        with open(path, encoding="utf-8") as f:
+            if not path.lower().endswith(".jsonl"):
+                return cls(json.load(f), fallback)
+            lines = [json.loads(line) for line in f if line.strip()]
+        if all(isinstance(line, str) for line in lines):
+            return cls(lines, fallback)
+        answers: Dict[str, List[str]] = {}
+        for line in lines:
+            answers.setdefault(line.get("kind", CLARIFICATION), []).append(line["answer"])
+        return cls(answers, fallback)
+    
+    @property
+    def uses_suggestions(self) -> bool:
+        return self.fallback is not None and self.fallback.uses_suggestions
+    
+    def answer(self, question: Question) -> Optional[str]:
+        queue = self._queues.get(question.kind, self._queues.get(None))
+        if queue:
+            return str(queue.popleft())
+        return self.fallback.answer(question) if self.fallback is not None else None
+
+
+def answer_provider_from_spec(spec: str, fallback: Optional[str] = None) -> Optional[AnswerProvider]:
+    """Build a provider from 'console', 'skip', 'auto[:choice]' or 'scripted:<path>'; None for console.
+    
+    The fallback spec answers the questions a script runs out of answers for.
+    """
+    kind, _, params = spec.partition(':')
+    if kind == 'console':
+        return None
+    if kind == 'skip':
+        return SkipAnswers()
+    if kind == 'auto':
+        # Suggestions are numbered from 1, as they are shown at the terminal
+        if params and not (params.isdigit() and int(params) >= 1):
+            raise ValueError(f"Answer provider 'auto:<choice>' needs a suggestion number from 1, got {spec!r}")
+        return SuggestedAnswers(choice=int(params) - 1 if params else 0)
+    if kind == 'scripted' and params:
+        return ScriptedAnswers.from_file(params, fallback=answer_provider_from_spec(fallback) if fallback else None)
+    raise ValueError(f"Unknown answer provider: {spec}")
+
+
+def get_answer_provider() -> Optional[AnswerProvider]:
+    """A new provider as configured by ANSWER_PROVIDER, or None to ask at the terminal"""
+    return answer_provider_from_spec(ANSWER_PROVIDER, ANSWER_PROVIDER_FALLBACK)
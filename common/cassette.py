@@ -0,0 +1,170 @@
+"""
+Record/replay of LLM calls for offline, reproducible benchmarking
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from settings import LLM_CASSETTE_MODE, LLM_CASSETTE_PATH, LLM_CASSETTE_LATENCY, LLM_CASSETTE_SEED
+
+CASSETTE_MODES = ('off', 'record', 'replay')
+
+
+class CassetteMiss(KeyError):
+    """A replayed request that was never recorded"""
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Content address of a request: everything that determines the response"""
+    payload = {
+        "model": request.get("model"),
+        "messages": request.get("messages"),
+        "temperature": request.get("temperature"),
+        "response_format": request.get("response_format")
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LatencyModel:
+    """Simulated response latency for replayed calls"""
+    
+    def __init__(self, spec: str = 'recorded', seed: int = 0):
+        self.spec = spec
+        self.kind, _, params = spec.partition(':')
+        self.params = [float(value) for value in params.split(',') if value.strip()]
+        if self.kind not in ('none', 'recorded', 'fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown cassette latency model: {spec}")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def sample(self, recorded_seconds: float) -> float:
+        """Seconds to wait before serving a replayed response"""
+        if self.kind == 'none':
+            return 0.0
+        if self.kind == 'recorded':
+            return recorded_seconds * (self.params[0] if self.params else 1.0)
+        if self.kind == 'fixed':
+            return self.params[0]
+        with self._lock:
+            if self.kind == 'uniform':
+                return self._random.uniform(self.params[0], self.params[1])
+            # LLM latencies are long-tailed; parameterised by median and log-space sigma
+            median, sigma = self.params
+            return self._random.lognormvariate(math.log(median), sigma)
+
+
+class Cassette:
+    """JSONL file of recorded LLM request/response pairs"""
+    
+    def __init__(self, path: str = LLM_CASSETTE_PATH, mode: str = LLM_CASSETTE_MODE,
+                 latency: str = LLM_CASSETTE_LATENCY, seed: int = LLM_CASSETTE_SEED):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Cassette mode must be 'record' or 'replay', got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = LatencyModel(latency, seed)
+        self.entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.hits = 0
+        self.misses = 0
+        self.simulated_seconds = 0.0
+        
+        if mode == 'replay':
+            self._load()
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No cassette to replay at {self.path}")
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]].append(entry)
+    
+    def record(self, request: Dict[str, Any], content: Optional[str], usage: Optional[Dict[str, int]] = None,
+               latency_seconds: float = 0.0, finish_reason: Optional[str] = None, source: str = None):
+        """Append one request/response pair to the cassette"""
+        entry = {
+            "key": request_key(request),
+            "recorded_at": datetime.now().isoformat(),
+            "source": source,
+            "request": request,
+            "content": content,
+            "usage": usage or {},
+            "latency_seconds": round(latency_seconds, 3),
+            "finish_reason": finish_reason
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+            self.recorded += 1
+    
+    def lookup(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the recorded response for a request.
+        
+        Identical requests recorded several times are served in recording order,
+        and the last one is repeated once they run out.
+        """
+        key = request_key(request)
+        with self._lock:
+            recordings = self.entries.get(key)
+            if not recordings:
+                self.misses += 1
+                raise CassetteMiss(f"Request not in cassette {self.path} (model {request.get('model')})")
+            index = min(self._served[key], len(recordings) - 1)
+            self._served[key] += 1
+            self.hits += 1
+            return recordings[index]
+    
+    def replay_delay(self, entry: Dict[str, Any]) -> float:
+        """Sample the simulated latency for a replayed entry"""
+        delay = self.latency.sample(entry.get("latency_seconds", 0.0))
+        with self._lock:
+            self.simulated_seconds += delay
+        return delay
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "recorded": self.recorded,
+            "hits": self.hits,
+            "misses": self.misses,
+            "simulated_latency_seconds": round(self.simulated_seconds, 3)
+        }
+
+
+_shared_cassette: Optional[Cassette] = None
+_shared_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Get the process-wide cassette, or None when record/replay is off"""
+    global _shared_cassette
+    if LLM_CASSETTE_MODE not in CASSETTE_MODES:
+        raise ValueError(f"LLM_CASSETTE_MODE must be one of {CASSETTE_MODES}, got {LLM_CASSETTE_MODE!r}")
+    if LLM_CASSETTE_MODE == 'off':
+        return None
+    with _shared_cassette_lock:
+        if _shared_cassette is None:
+            _shared_cassette = Cassette()
+    return _shared_cassette
@@ -0,0 +1,253 @@
+"""
+Tolerant extraction of JSON from LLM responses
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+FENCE_PATTERN = re.compile(r"```(?:json|JSON)?[ \t]*\n?(.*?)(?:```|$)", re.DOTALL)
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+CLOSERS = {"{": "}", "[": "]"}
+
+
+@dataclass
+class JSONExtraction:
+    """A JSON value found in a response, with the repairs needed to parse it"""
+    value: Any = None
+    complete: bool = True
+    repairs: List[str] = field(default_factory=list)
+    
+    @property
+    def found(self) -> bool:
+        return self.value is not None
+
+
+@dataclass
+class _Candidate:
+    """A balanced (or truncated) JSON fragment located by the scanner"""
+    text: str
+    complete: bool
+    # For truncated fragments: the longest prefix ending after a finished value, and the brackets it leaves open
+    safe_prefix: str = ""
+    safe_closers: str = ""
+    open_string: bool = False
+
+
+def _scan(text: str, start: int) -> Tuple[_Candidate, int]:
+    """Scan one JSON container starting at text[start], tracking strings of either quote style"""
+    stack: List[Dict[str, Any]] = []
+    quote: Optional[str] = None
+    escaped = False
+    string_is_value = False
+    safe = (start, "")
+    scalar_start: Optional[int] = None
+    i = start
+    
+    def closers() -> str:
+        return "".join(CLOSERS[frame["open"]] for frame in reversed(stack))
+    
+    def value_position() -> bool:
+        frame = stack[-1]
+        return frame["open"] == "[" or frame["after_colon"]
+    
+    while i < len(text):
+        char = text[i]
+        if quote is not None:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+                if string_is_value:
+                    safe = (i + 1, closers())
+            i += 1
+            continue
+        
+        if scalar_start is not None and (char in ",}]" or char.isspace()):
+            scalar_start = None
+            safe = (i, closers())
+        if char in "\"'":
+            quote = char
+            string_is_value = value_position()
+        elif char in "{[":
+            stack.append({"open": char, "after_colon": False})
+            if len(stack) == 1:
+                safe = (i + 1, closers())
+        elif char in "}]":
+            if not stack or CLOSERS[stack[-1]["open"]] != char:
+                # Mismatched bracket: the fragment can't be balanced from here
+                break
+            stack.pop()
+            if not stack:
+                return _Candidate(text[start:i + 1], complete=True), i + 1
+            safe = (i + 1, closers())
+        elif char == ":":
+            stack[-1]["after_colon"] = True
+        elif char == ",":
+            stack[-1]["after_colon"] = False
+        elif not char.isspace() and scalar_start is None:
+            scalar_start = i
+        i += 1
+    
+    candidate = _Candidate(text[start:i], complete=False, safe_prefix=text[start:safe[0]], safe_closers=safe[1],
+                           open_string=quote is not None and string_is_value)
+    if candidate.open_string:
+        # Keep a truncated string value: close it, then whatever is still open
+        body = text[start:i].rstrip("\\")
+        candidate.text = body + quote + closers()
+    return candidate, i
+
+
+def _normalize(fragment: str) -> Tuple[str, List[str]]:
+    """Rewrite near-JSON into JSON: single-quoted strings, trailing commas and Python literals"""
+    out: List[str] = []
+    repairs = set()
+    quote: Optional[str] = None
+    escaped = False
+    i = 0
+    while i < len(fragment):
+        char = fragment[i]
+        if quote is not None:
+            if escaped:
+                escaped = False
+                if quote == "'" and char == "'":
+                    # \' is not a JSON escape; the backslash is already in out
+                    out[-1] = "'"
+                    i += 1
+                    continue
+                out.append(char)
+            elif char == "\\":
+                escaped = True
+                out.append(char)
+            elif char == quote:
+                quote = None
+                out.append('"')
+            elif char == '"' and quote == "'":
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+                repairs.add("escaped newlines in strings")
+            else:
+                out.append(char)
+            i += 1
+            continue
+        
+        if char in "\"'":
+            quote = char
+            if char == "'":
+                repairs.add("single-quoted strings")
+            out.append('"')
+        elif char == ",":
+            j = i + 1
+            while j < len(fragment) and fragment[j].isspace():
+                j += 1
+            if j < len(fragment) and fragment[j] in "}]":
+                repairs.add("trailing commas")
+            else:
+                out.append(char)
+        elif char.isalpha():
+            j = i
+            while j < len(fragment) and (fragment[j].isalnum() or fragment[j] == "_"):
+                j += 1
+            word = fragment[i:j]
+            if word in PYTHON_LITERALS:
+                repairs.add("Python literals")
+            out.append(PYTHON_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(char)
+        i += 1
+    return "".join(out), sorted(repairs)
+
+
+def _parse(fragment: str) -> Tuple[Any, List[str]]:
+    """Parse a fragment as JSON, normalizing it first if it doesn't parse as is"""
+    try:
+        return json.loads(fragment), []
+    except ValueError:
+        pass
+    normalized, repairs = _normalize(fragment)
+    try:
+        return json.loads(normalized), repairs
+    except ValueError:
+        return None, []
+
+
+def _trim_dangling(prefix: str) -> str:
+    """Drop a trailing comma left after cutting a truncated fragment back to its last complete value"""
+    prefix = prefix.rstrip()
+    return prefix[:-1] if prefix.endswith(",") else prefix
+
+
+def _parse_candidate(candidate: _Candidate) -> Optional[JSONExtraction]:
+    if candidate.complete:
+        value, repairs = _parse(candidate.text)
+        return JSONExtraction(value, True, repairs) if value is not None else None
+    
+    attempts = []
+    if candidate.open_string:
+        attempts.append((candidate.text, "closed a truncated string"))
+    attempts.append((_trim_dangling(candidate.safe_prefix) + candidate.safe_closers, "cut back to the last complete value"))
+    for fragment, repair in attempts:
+        value, repairs = _parse(fragment)
+        if value is not None:
+            return JSONExtraction(value, False, repairs + [repair])
+    return None
+
+
+def _regions(text: str) -> List[str]:
+    """Fenced code blocks first (an unterminated fence runs to the end), then the whole text"""
+    regions = [match.group(1) for match in FENCE_PATTERN.finditer(text) if match.group(1).strip()]
+    return regions + [text]
+
+
+def iter_json(text: str) -> Iterator[JSONExtraction]:
+    """Yield every JSON object or array found in the text, in order (fenced blocks take precedence)"""
+    if not text:
+        return
+    found = False
+    for region in _regions(text):
+        if found and region is text:
+            # The fenced blocks held JSON; scanning the whole text would find it again
+            return
+        position = 0
+        while True:
+            starts = [index for index in (region.find("{", position), region.find("[", position)) if index != -1]
+            if not starts:
+                break
+            start = min(starts)
+            candidate, end = _scan(region, start)
+            extraction = _parse_candidate(candidate)
+            if extraction is not None:
+                found = True
+                yield extraction
+            # Continue inside arrays too, so objects wrapped in a list are still found
+            position = end if extraction is not None and isinstance(extraction.value, dict) else start + 1
+
+
+def extract_json_result(text: str, partial: bool = True) -> JSONExtraction:
+    """Find the first JSON object in an LLM response, tolerating fences, prose and near-JSON.
+    
+    A complete object is preferred over a truncated one; with partial=True a truncated object is
+    closed and returned (complete=False) when nothing complete is found.
+    """
+    truncated = None
+    for extraction in iter_json(text):
+        if not isinstance(extraction.value, dict):
+            continue
+        if extraction.complete:
+            return extraction
+        if truncated is None:
+            truncated = extraction
+    if partial and truncated is not None:
+        return truncated
+    return JSONExtraction()
+
+
+def extract_json(text: str, partial: bool = True) -> Optional[Dict[str, Any]]:
+    """Get the first JSON object in an LLM response, or None"""
+    return extract_json_result(text, partial).value
@@ -0,0 +1,128 @@
+"""
+Test the headless answer providers and building them from ANSWER_PROVIDER specs
+"""
+
+import json
+
+import pytest
+
+from common import answer_providers
+from common.answer_providers import (CLARIFICATION, VALIDATION, Question, ScriptedAnswers, SkipAnswers,
+                                     SuggestedAnswers, answer_provider_from_spec, get_answer_provider)
+
+SUGGESTIONS = ["Nurses on night shifts", "Students", "Parents"]
+
+
+def question(number=1, kind=CLARIFICATION, suggestions=SUGGESTIONS):
+    return Question(f"Question {number}?", kind, list(suggestions), number=number)
+
+
+def write_script(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def test_console_and_skip_specs():
+    """'console' means asking at the terminal; 'skip' answers nothing"""
+    assert answer_provider_from_spec("console") is None
+    provider = answer_provider_from_spec("skip")
+    assert isinstance(provider, SkipAnswers)
+    assert provider.answer(question()) is None
+    assert not provider.uses_suggestions
+
+
+def test_auto_spec_picks_numbered_suggestion():
+    """'auto' takes the first suggestion, 'auto:<n>' the n-th, as numbered at the terminal"""
+    assert answer_provider_from_spec("auto").answer(question()) == "Nurses on night shifts"
+    assert answer_provider_from_spec("auto:2").answer(question()) == "Students"
+    # A choice past the last suggestion takes the last one
+    assert answer_provider_from_spec("auto:9").answer(question()) == "Parents"
+    assert answer_provider_from_spec("auto").uses_suggestions
+
+
+@pytest.mark.parametrize("spec", ["auto:0", "auto:-1", "auto:first"])
+def test_auto_spec_rejects_bad_choice(spec):
+    """Suggestion numbers start at 1"""
+    with pytest.raises(ValueError, match="from 1"):
+        answer_provider_from_spec(spec)
+
+
+def test_auto_answers_stop_at_cap_or_without_suggestions():
+    """Auto-answering ends after max_answers questions or when there is nothing to pick from"""
+    provider = SuggestedAnswers(max_answers=2)
+    assert provider.answer(question(number=2)) == "Nurses on night shifts"
+    assert provider.answer(question(number=3)) is None
+    assert provider.answer(question(suggestions=[])) is None
+
+
+@pytest.mark.parametrize("spec", ["unknown", "scripted", "scripted:", "Console"])
+def test_unknown_spec_rejected(spec):
+    """Typos and a script spec without a path fail instead of silently asking at the terminal"""
+    with pytest.raises(ValueError, match="Unknown answer provider"):
+        answer_provider_from_spec(spec)
+
+
+def test_scripted_spec_from_json_list(tmp_path):
+    """A JSON list answers every question in order"""
+    path = write_script(tmp_path, "answers.json", json.dumps(["Nurses", 42]))
+    provider = answer_provider_from_spec(f"scripted:{path}")
+    assert provider.answer(question(kind=VALIDATION)) == "Nurses"
+    assert provider.answer(question()) == "42"
+
+
+def test_scripted_spec_from_json_object_by_kind(tmp_path):
+    """A {kind: [answers]} object keeps a separate script for each kind of question"""
+    path = write_script(tmp_path, "answers.json", json.dumps({CLARIFICATION: ["Nurses"], VALIDATION: ["Yes"]}))
+    provider = answer_provider_from_spec(f"scripted:{path}")
+    assert provider.answer(question(kind=VALIDATION)) == "Yes"
+    assert provider.answer(question()) == "Nurses"
+    assert provider.answer(question(kind="other")) is None
+
+
+def test_scripted_spec_from_jsonl(tmp_path):
+    """JSONL holds plain answers, or {"kind", "answer"} objects defaulting to clarification"""
+    plain = write_script(tmp_path, "plain.jsonl", '"Nurses"\n\n"Weekly"\n')
+    provider = answer_provider_from_spec(f"scripted:{plain}")
+    assert [provider.answer(question()), provider.answer(question())] == ["Nurses", "Weekly"]
+    
+    tagged = write_script(tmp_path, "tagged.jsonl",
+                          '{"answer": "Nurses"}\n{"kind": "validation", "answer": "Yes"}\n')
+    provider = answer_provider_from_spec(f"scripted:{tagged}")
+    assert provider.answer(question(kind=VALIDATION)) == "Yes"
+    assert provider.answer(question()) == "Nurses"
+
+
+def test_script_running_out_stops_questions():
+    """Without a fallback, an exhausted script returns None so the engine stops asking"""
+    provider = ScriptedAnswers(["Nurses"])
+    assert provider.answer(question()) == "Nurses"
+    assert provider.answer(question(number=2)) is None
+    assert provider.answer(question(number=3)) is None
+
+
+def test_script_running_out_uses_fallback(tmp_path):
+    """With a fallback spec, questions past the script's end go to the fallback provider"""
+    path = write_script(tmp_path, "answers.json", json.dumps(["Nurses"]))
+    provider = answer_provider_from_spec(f"scripted:{path}", fallback="auto:3")
+    assert provider.uses_suggestions
+    assert provider.answer(question()) == "Nurses"
+    assert provider.answer(question(number=2)) == "Parents"
+    
+    provider = answer_provider_from_spec(f"scripted:{path}", fallback="skip")
+    assert not provider.uses_suggestions
+    provider.answer(question())
+    assert provider.answer(question(number=2)) is None
+
+
+def test_get_answer_provider_reads_settings(tmp_path, monkeypatch):
+    """get_answer_provider() builds a fresh provider from the configured spec and fallback"""
+    path = write_script(tmp_path, "answers.json", json.dumps(["Nurses"]))
+    monkeypatch.setattr(answer_providers, "ANSWER_PROVIDER", f"scripted:{path}")
+    monkeypatch.setattr(answer_providers, "ANSWER_PROVIDER_FALLBACK", "auto")
+    
+    first, second = get_answer_provider(), get_answer_provider()
+    assert first is not second
+    assert first.answer(question()) == "Nurses"
+    assert second.answer(question()) == "Nurses"
+    assert isinstance(first.fallback, SuggestedAnswers)
@@ -0,0 +1,93 @@
+"""
+Test the tolerant JSON extractor against a corpus of recorded-style LLM responses
+
+Run directly to also benchmark it against the old first-brace/last-brace slice:
+    python -m common.test_json_extractor
+Set LLM_CASSETTE_PATH to include the responses of a recorded cassette in the benchmark.
+"""
+
+import json
+import os
+import time
+
+from common.json_extractor import extract_json, extract_json_result, iter_json
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "testdata", "json_responses.jsonl")
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def naive_parse(response):
+    """The parser both engines used before: slice from the first '{' to the last '}'"""
+    try:
+        start = response.find('{')
+        end = response.rfind('}') + 1
+        if start != -1 and end != 0:
+            return json.loads(response[start:end])
+    except Exception:
+        pass
+    return None
+
+
+def test_corpus():
+    """Every corpus response gives the expected object, flagged complete or truncated"""
+    failures = []
+    for case in load_corpus():
+        extraction = extract_json_result(case["response"])
+        if extraction.value != case["expected"]:
+            failures.append(f"{case['name']}: got {extraction.value!r}")
+        elif extraction.found and extraction.complete != case["complete"]:
+            failures.append(f"{case['name']}: complete={extraction.complete}")
+    assert not failures, "\n".join(failures)
+
+
+def test_partial_disabled():
+    """With partial=False truncated objects are rejected"""
+    assert extract_json('{"score": 7, "reasoning": "Users', partial=False) is None
+    assert extract_json('{"score": 7}', partial=False) == {"score": 7}
+
+
+def test_complete_object_preferred_over_truncated():
+    """A later complete object wins over an earlier truncated one"""
+    response = '```json\n{"draft": 1,\n```\nCorrected:\n```json\n{"final": true}\n```'
+    assert extract_json(response) == {"final": True}
+
+
+def test_iter_json_finds_every_value():
+    """iter_json yields top-level values in order, including objects inside arrays"""
+    values = [extraction.value for extraction in iter_json('[1, 2] then {"b": [{"c": 1}]}')]
+    assert values == [[1, 2], {"b": [{"c": 1}]}]
+
+
+def _cassette_responses():
+    path = os.getenv("LLM_CASSETTE_PATH")
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line).get("content") or "" for line in f if line.strip()]
+
+
+def benchmark(repeat=200):
+    """Success rate and parse time of the extractor vs the naive slice"""
+    responses = [case["response"] for case in load_corpus()] + _cassette_responses()
+    print(f"📊 JSON extraction benchmark ({len(responses)} responses x {repeat})")
+    for name, parse in (("naive slice", naive_parse), ("extract_json", extract_json)):
+        parsed = sum(1 for response in responses if isinstance(parse(response), dict))
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for response in responses:
+                parse(response)
+        per_response = (time.perf_counter() - started) / (repeat * len(responses)) * 1e6
+        print(f"   {name:<13} parsed {parsed}/{len(responses)} objects, {per_response:.1f} µs per response")
+
+
+if __name__ == "__main__":
+    test_corpus()
+    test_partial_disabled()
+    test_complete_object_preferred_over_truncated()
+    test_iter_json_finds_every_value()
+    print("✅ All JSON extraction tests passed")
+    benchmark()
@@ -2,6 +2,7 @@
 # A comprehensive system to analyze and validate business ideas
 
 from .pipeline import IdeaPotentialPipeline
+from .checkpoints import RunCheckpoint
 
 def get_agent_selection():
     """
@@ -54,7 +55,7 @@ def get_agent_selection():
     
     return use_suggester_agent, use_roadmap_agent, use_refiner_agent
 
-def run_idea_analysis(idea: str = None, interactive: bool = False, use_suggester_agent: bool = None, use_roadmap_agent: bool = None, use_refiner_agent: bool = None):
+def run_idea_analysis(idea: str = None, interactive: bool = False, use_suggester_agent: bool = None, use_roadmap_agent: bool = None, use_refiner_agent: bool = None, run_id: str = None):
     """
     Run the idea potential analysis system
     
@@ -64,20 +65,28 @@ def run_idea_analysis(idea: str = None, interactive: bool = False, use_suggester
         use_suggester_agent (bool): Whether to use the suggester agent (None for user prompt)
         use_roadmap_agent (bool): Whether to use the roadmap agent (None for user prompt)
         use_refiner_agent (bool): Whether to use the refiner agent (None for user prompt)
+        run_id (str): Resume this checkpointed run, skipping its finished steps
     
     Returns:
         dict: Analysis results
     """
     
-    # Get agent selection from user if not provided
-    if use_suggester_agent is None or use_roadmap_agent is None or use_refiner_agent is None:
-        use_suggester_agent, use_roadmap_agent, use_refiner_agent = get_agent_selection()
+    pipeline = None
+    if run_id:
+        # The resumed run keeps its own idea, mode and agent selection; these only pick the summary lines
+        agent_config = RunCheckpoint(run_id).manifest().get('agent_config', {})
+        use_roadmap_agent = agent_config.get('use_roadmap_agent')
+        use_refiner_agent = agent_config.get('use_refiner_agent')
+    else:
+        # Get agent selection from user if not provided
+        if use_suggester_agent is None or use_roadmap_agent is None or use_refiner_agent is None:
+            use_suggester_agent, use_roadmap_agent, use_refiner_agent = get_agent_selection()
     
-    # Initialize pipeline with selected agents
-    pipeline = IdeaPotentialPipeline(use_suggester_agent=use_suggester_agent, use_roadmap_agent=use_roadmap_agent, use_refiner_agent=use_refiner_agent)
+        # Initialize pipeline with selected agents
+        pipeline = IdeaPotentialPipeline(use_suggester_agent=use_suggester_agent, use_roadmap_agent=use_roadmap_agent, use_refiner_agent=use_refiner_agent)
     
     # Get idea from user if not provided
-    if not idea:
+    if pipeline is not None and not idea:
         print("\n📝 Please enter your business idea:")
         idea = input("> ").strip()
         
@@ -86,7 +95,10 @@ def run_idea_analysis(idea: str = None, interactive: bool = False, use_suggester
             return {"error": "No idea provided"}
     
     try:
-        if interactive:
+        if pipeline is None:
+            # Resume the checkpointed run, skipping the steps it already finished
+            results = IdeaPotentialPipeline.resume(run_id)
+        elif interactive:
             # Run interactive analysis
             results = pipeline.run_interactive_analysis(idea)
         else:
@@ -1,122 +1,677 @@
 import openai
+import asyncio
+import concurrent.futures
+import contextvars
 import json
-from typing import Dict, Any, List, Optional, Type, TypeVar
-from idea_potential.config import OPENAI_API_KEY, MODEL_CONFIG
+import sys
+import textwrap
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Type, TypeVar, Coroutine, Callable, Tuple, Awaitable
+from idea_potential.config import (MODEL_CONFIG, LLM_RETRY_CONFIG, CONTEXT_BUDGETS, CASCADE_CONFIG,
+                                   COMPLETION_CONFIG, COMPLETION_BUDGETS)
+from idea_potential.llm_cache import get_llm_cache
+from idea_potential.llm_clients import get_async_openai_client
+from idea_potential.llm_errors import (LLMCallError, RETRYABLE_ERRORS, classify_error, retry_after_seconds,
+                                       backoff_delay)
+from idea_potential.rate_limiter import ModelRateLimiter, get_rate_limiter
+from idea_potential.usage_ledger import UsageLedger
+from idea_potential.structured_outputs import strict_json_schema, compact_schema, expected_completion_tokens
+from idea_potential.schema_repair import repair_structured_output, filled_ratio
+from idea_potential.streaming_json import IncrementalJSONParser
+from idea_potential.batch import BatchDeferred, current_batch_session
+from idea_potential.hedging import Hedger, get_hedger
+from common.cassette import Cassette, get_cassette
+from common.json_extractor import extract_json_result
+from idea_potential.context_builder import ContextBuilder
+from idea_potential.task_graph import cancellation_requested
 from pydantic import BaseModel
 
 T = TypeVar('T', bound=BaseModel)
 
+# Background event loop that drives the synchronous call_llm* wrappers, so sync
+# callers (and worker threads) share one loop and one set of async connections
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_thread: Optional[threading.Thread] = None
+_sync_loop_lock = threading.Lock()
+
+# Agent method that issued the current LLM call, for the usage ledger
+_llm_call_method: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('llm_call_method', default=None)
+
+# Fixes applied to the response of the calling context's last structured call, read back by structured_data().
+# A context variable rather than agent state, since the task graph runs several methods of one agent at once.
+_structured_repairs: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar('structured_repairs',
+                                                                                          default=None)
+
+# How often a blocked sync caller checks whether its task graph step has been told to stop
+CANCEL_POLL_SECONDS = 0.5
+
+CONTINUE_PROMPT = ("Your previous response was cut off by the length limit. Continue it exactly where it stopped, "
+                   "without repeating anything and without any commentary or code fences.")
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting it on first use"""
+    global _sync_loop, _sync_loop_thread
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="llm-sync-loop", daemon=True)
+            thread.start()
+            _sync_loop, _sync_loop_thread = loop, thread
+    return _sync_loop
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine on the background loop and block until it finishes"""
+    loop = _get_sync_loop()
+    if threading.current_thread() is _sync_loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() called from the LLM event loop; await the async method instead")
+    
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    tasks: List[asyncio.Task] = []
+    
+    def _start():
+        task = loop.create_task(coro)
+        tasks.append(task)
+        
+        def _done(done_task: asyncio.Task):
+            if done_task.cancelled():
+                future.cancel()
+            elif done_task.exception() is not None:
+                future.set_exception(done_task.exception())
+            else:
+                future.set_result(done_task.result())
+        
+        task.add_done_callback(_done)
+    
+    # Run in a copy of the caller's context so context variables carry over
+    loop.call_soon_threadsafe(_start, context=contextvars.copy_context())
+    while True:
+        try:
+            return future.result(timeout=CANCEL_POLL_SECONDS)
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                raise
+            if cancellation_requested():
+                break
+    
+    # The caller's task graph step was told to stop: cancel the call in flight (e.g. the HTTP request)
+    loop.call_soon_threadsafe(lambda: [task.cancel() for task in tasks])
+    try:
+        return future.result()
+    except concurrent.futures.CancelledError:
+        raise LLMCallError('cancelled', "task graph step stopped") from None
+
+
+def _calling_method() -> Optional[str]:
+    """Name of the nearest function on the stack outside this module"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_filename != __file__:
+            # Coroutines driven by the event loop have no agent frame above them
+            if frame.f_globals.get('__name__', '').startswith(('asyncio', 'concurrent')):
+                return None
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return None
+
+
+def _continuation_text(previous: str, addition: str) -> str:
+    """The part of a continuation that extends the previous text, without fences or a repeated overlap"""
+    if addition.lstrip().startswith("```") and "```" not in previous:
+        addition = addition.lstrip()[3:]
+        addition = addition[4:] if addition.startswith("json") else addition
+        addition = addition.lstrip("\n")
+    if addition.rstrip().endswith("```") and "```" not in previous:
+        addition = addition.rstrip()[:-3]
+    # Models sometimes repeat the last few words before continuing
+    for size in range(min(len(previous), len(addition), 200), 9, -1):
+        if previous.endswith(addition[:size]):
+            return addition[size:]
+    return addition
+
+
 class BaseAgent:
     """Base class for all agents in the idea potential analysis system"""
     
     def __init__(self, agent_type: str):
         self.agent_type = agent_type
         self.model = MODEL_CONFIG.get(agent_type, 'gpt-4o')
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.cassette: Optional[Cassette] = get_cassette()
+        # Recording and replay bypass the response cache so every call goes through the cassette
+        self.cache = get_llm_cache() if self.cassette is None else None
+        # Per-run usage ledger, attached by the pipeline
+        self.ledger: Optional[UsageLedger] = None
+    
+    def _get_async_client(self) -> openai.AsyncOpenAI:
+        """Get the shared AsyncOpenAI client for the running event loop"""
+        return get_async_openai_client()
+    
+    async def _create_completion(self, request: Dict[str, Any], schema: Optional[Dict[str, Any]] = None,
+                                 stream_parser: Optional[IncrementalJSONParser] = None) -> Optional[str]:
+        """Run a chat completion, serving identical requests from the response cache"""
+        if cancellation_requested():
+            raise LLMCallError('cancelled', "task graph step stopped before the call")
+        method = _llm_call_method.get() or _calling_method()
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(request, schema)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if self.ledger is not None:
+                    self.ledger.record(self.agent_type, method, request['model'], cache_hit=True)
+                if stream_parser is not None and cached.get("content"):
+                    stream_parser.feed(cached["content"])
+                return cached.get("content")
         
-    def call_llm(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
-        """Make a call to the OpenAI API"""
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=4000
-            )
-            
-            # Log token usage
-            if hasattr(response, 'usage') and response.usage:
-                print(f"[TOKENS] {self.model}: {response.usage.prompt_tokens} prompt + {response.usage.completion_tokens} completion = {response.usage.total_tokens} total")
+        batch_session = current_batch_session()
+        if batch_session is not None:
+            content = self._batch_completion(batch_session, request, schema, method)
+            if cache_key is not None and content:
+                self.cache.set(cache_key, {"content": content})
+            if stream_parser is not None and content:
+                stream_parser.feed(content)
+            return content
+        
+        response = await self._send_with_retries(request, method, stream_parser)
+        
+        content = response.choices[0].message.content
+        complete = True
+        if getattr(response.choices[0], 'finish_reason', None) == 'length':
+            content, complete = await self._continue_truncated(request, method, content or "", stream_parser)
+        if cache_key is not None and content and complete:
+            self.cache.set(cache_key, {"content": content})
+        return content
+    
+    async def _continue_truncated(self, request: Dict[str, Any], method: Optional[str], content: str,
+                                  stream_parser: Optional[IncrementalJSONParser] = None) -> Tuple[str, bool]:
+        """Continue a response cut off at max_tokens instead of asking again, returning it and whether it finished"""
+        # A response_format would make the model start a new JSON document rather than continue this one
+        continuation_request = {key: value for key, value in request.items() if key != 'response_format'}
+        continuations = 0
+        complete = False
+        while continuations < COMPLETION_CONFIG['max_continuations']:
+            continuations += 1
+            continuation_request['messages'] = request['messages'] + [
+                {"role": "assistant", "content": content},
+                {"role": "user", "content": CONTINUE_PROMPT}
+            ]
+            response = await self._send_with_retries(continuation_request, method)
+            addition = _continuation_text(content, response.choices[0].message.content or "")
+            content += addition
+            if stream_parser is not None and addition:
+                stream_parser.feed(addition)
+            if getattr(response.choices[0], 'finish_reason', None) != 'length':
+                complete = True
+                break
+        
+        if self.ledger is not None:
+            self.ledger.record_truncation(self.agent_type, method, request['model'], request.get('max_tokens'),
+                                          continuations, complete)
+        status = "completed" if complete else "still truncated"
+        print(f"[TRUNCATED] {self.agent_type}.{method or 'unknown'}: hit max_tokens={request.get('max_tokens')}, "
+              f"{status} after {continuations} continuation(s)")
+        return content, complete
+    
+    def _batch_completion(self, batch_session, request: Dict[str, Any], schema: Optional[Dict[str, Any]],
+                          method: Optional[str]) -> Optional[str]:
+        """Serve a call from a bulk batch run, deferring it to the next batch job if its result isn't in yet"""
+        result = batch_session.result_for(request, schema)
+        if result is None:
+            raise BatchDeferred(f"{self.agent_type}.{method or 'unknown'}")
+        if 'error' in result:
+            raise LLMCallError('batch_error', result['error'])
+        
+        usage = result.get('usage') or {}
+        if self.ledger is not None:
+            self.ledger.record(self.agent_type, method, request['model'], usage.get('prompt_tokens', 0),
+                               usage.get('cached_tokens', 0), usage.get('completion_tokens', 0), batch=True)
+        return result.get('content')
+    
+    async def _send_with_retries(self, request: Dict[str, Any], method: Optional[str],
+                                 stream_parser: Optional[IncrementalJSONParser] = None) -> Any:
+        """Send a request, retrying transient errors with jittered backoff until the call's deadline"""
+        if self.cassette is not None and self.cassette.replaying:
+            return await self._replay_from_cassette(request, method, stream_parser)
+        
+        config = LLM_RETRY_CONFIG
+        deadline = time.monotonic() + config['deadline_seconds']
+        rate_limiter = get_rate_limiter()
+        limiter = rate_limiter.for_model(request['model']) if rate_limiter is not None else None
+        hedger = get_hedger()
+        if hedger is not None and not hedger.applies_to(method):
+            hedger = None
+        estimated_tokens = self._estimate_tokens(request)
+        queued = 0.0
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            reserved_tokens = None
+            try:
+                # Wait for rate limit capacity instead of running into 429s
+                if limiter is not None:
+                    async with asyncio.timeout(max(deadline - time.monotonic(), 0)):
+                        waited, reserved_tokens = await limiter.acquire(estimated_tokens)
+                    queued += waited
+                
+                started = time.perf_counter()
+                if stream_parser is None:
+                    timeout = max(deadline - time.monotonic(), 1.0)
+                    send = lambda: self._get_async_client().chat.completions.create(**request, timeout=timeout)
+                    if hedger is not None:
+                        # Latency-critical call: duplicate it if it runs past the method's p90
+                        response = await self._send_hedged(hedger, limiter, request, method, estimated_tokens, send)
+                    else:
+                        response = await send()
+                else:
+                    async with asyncio.timeout(max(deadline - time.monotonic(), 1.0)):
+                        response = await self._consume_stream(request, stream_parser)
+                latency = time.perf_counter() - started
+                
+                usage = getattr(response, 'usage', None)
+                if reserved_tokens is not None:
+                    limiter.settle(reserved_tokens, getattr(usage, 'total_tokens', None) or estimated_tokens)
+                    reserved_tokens = None
+                self._record_usage(method, request['model'], response, latency, queued, attempt)
+                if self.cassette is not None:
+                    self._record_to_cassette(request, method, response, latency)
+                return response
             
-            return response.choices[0].message.content
+            except Exception as e:
+                if reserved_tokens is not None:
+                    limiter.settle(reserved_tokens, 0)
+                kind = classify_error(e)
+                remaining = deadline - time.monotonic()
+                if kind not in RETRYABLE_ERRORS or attempt >= config['max_attempts'] or remaining <= 0:
+                    raise LLMCallError(kind, str(e), attempt) from e
+                
+                delay = max(retry_after_seconds(e) or 0.0,
+                            backoff_delay(attempt - 1, config['base_delay'], config['max_delay']))
+                if delay >= remaining:
+                    raise LLMCallError(kind, f"{e} (deadline reached before retry)", attempt) from e
+                print(f"[RETRY] {self.agent_type}.{method or 'unknown'}: {kind} on attempt {attempt}, retrying in {delay:.1f}s")
+                if stream_parser is not None:
+                    # The retried stream starts from scratch; fields already reported are not reported again
+                    stream_parser.reset()
+                await asyncio.sleep(delay)
+    
+    async def _send_hedged(self, hedger: Hedger, limiter: Optional[ModelRateLimiter], request: Dict[str, Any],
+                           method: Optional[str], estimated_tokens: int, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Send through the hedger; a duplicate reserves rate limit capacity of its own and its cost is recorded"""
+        hedge_tokens: List[float] = []
+        
+        def reserve() -> bool:
+            if limiter is None:
+                return True
+            reserved = limiter.try_acquire(estimated_tokens)
+            if reserved is None:
+                return False
+            hedge_tokens.append(reserved)
+            return True
+        
+        def discarded(winner: Any, loser: Optional[Any]):
+            if loser is not None:
+                # Both finished: the duplicate's real usage is known
+                if hedge_tokens:
+                    limiter.settle(hedge_tokens[0], getattr(loser.usage, 'total_tokens', None) or estimated_tokens)
+                self._record_usage(method, request['model'], loser, 0.0, hedge=True)
+                return
+            # Cancelled mid-flight: its reservation stands and its cost is estimated as the prompt
+            # plus as many completion tokens as the winner produced
+            if self.ledger is not None:
+                usage = getattr(winner, 'usage', None)
+                prompt_tokens = estimated_tokens - request.get('max_tokens', 0)
+                self.ledger.record(self.agent_type, method, request['model'], prompt_tokens,
+                                   completion_tokens=getattr(usage, 'completion_tokens', 0) or 0, hedge=True)
+        
+        return await hedger.run(request['model'], method, send, reserve=reserve, on_discarded=discarded)
+    
+    async def _replay_from_cassette(self, request: Dict[str, Any], method: Optional[str],
+                                    stream_parser: Optional[IncrementalJSONParser] = None) -> Any:
+        """Serve a recorded response after its simulated latency"""
+        entry = self.cassette.lookup(request)
+        delay = self.cassette.replay_delay(entry)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        content = entry.get("content")
+        if stream_parser is not None and content:
+            stream_parser.feed(content)
+        recorded_usage = entry.get("usage", {})
+        usage = SimpleNamespace(
+            prompt_tokens=recorded_usage.get("prompt_tokens", 0),
+            completion_tokens=recorded_usage.get("completion_tokens", 0),
+            total_tokens=recorded_usage.get("prompt_tokens", 0) + recorded_usage.get("completion_tokens", 0),
+            prompt_tokens_details=SimpleNamespace(cached_tokens=recorded_usage.get("cached_tokens", 0))
+        )
+        message = SimpleNamespace(content=content)
+        response = SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message, finish_reason=entry.get("finish_reason"))])
+        self._record_usage(method, request['model'], response, delay)
+        return response
+    
+    def _record_to_cassette(self, request: Dict[str, Any], method: Optional[str], response: Any, latency: float):
+        """Capture a live request/response pair"""
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        choice = response.choices[0]
+        self.cassette.record(
+            request, choice.message.content,
+            usage={
+                "prompt_tokens": getattr(usage, 'prompt_tokens', 0) or 0,
+                "cached_tokens": getattr(details, 'cached_tokens', 0) or 0,
+                "completion_tokens": getattr(usage, 'completion_tokens', 0) or 0
+            },
+            latency_seconds=latency, finish_reason=getattr(choice, 'finish_reason', None),
+            source=f"idea_potential.{self.agent_type}.{method or 'unknown'}"
+        )
+    
+    async def _consume_stream(self, request: Dict[str, Any], stream_parser: IncrementalJSONParser) -> Any:
+        """Stream a completion into the parser, returning a response shaped like a non-streamed one"""
+        stream = await self._get_async_client().chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        parts = []
+        usage = None
+        finish_reason = None
+        async for chunk in stream:
+            # With include_usage the final chunk carries the usage and no choices
+            if getattr(chunk, 'usage', None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta.content if choice.delta else None
+            if delta:
+                parts.append(delta)
+                stream_parser.feed(delta)
+            finish_reason = choice.finish_reason or finish_reason
+        
+        message = SimpleNamespace(content="".join(parts))
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+    
+    @staticmethod
+    def _estimate_tokens(request: Dict[str, Any]) -> int:
+        """Rough token count a request reserves against the TPM limit (prompt + max completion)"""
+        prompt_chars = sum(len(str(message.get("content", ""))) for message in request.get("messages", []))
+        return prompt_chars // 4 + 4 * len(request.get("messages", [])) + request.get("max_tokens", 0)
+    
+    def _record_usage(self, method: Optional[str], model: str, response: Any, latency: float,
+                      queued: float = 0.0, attempts: int = 1, hedge: bool = False):
+        """Record token usage, latency and cost of a completed call in the ledger"""
+        if self.ledger is None:
+            return
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+        self.ledger.record(self.agent_type, method, model, prompt_tokens, cached_tokens,
+                           completion_tokens, latency, queued_seconds=queued, attempts=attempts, hedge=hedge)
+    
+    def _run_sync(self, coro: Coroutine[Any, Any, Any], method: Optional[str] = None) -> Any:
+        """Run an LLM coroutine from sync code, attributing its calls to the given agent method.
+        
+        The method selects the per-method config (budgets, cascade, hedging); without one the
+        calls are attributed to the calling function for the usage ledger only.
+        """
+        token = _llm_call_method.set(method or _calling_method())
+        try:
+            return run_sync(coro)
+        finally:
+            _llm_call_method.reset(token)
+    
+    def _completion_budget(self, response_model: Optional[Type[BaseModel]] = None) -> int:
+        """max_tokens for the calling method: its configured budget, or an estimate from the response schema"""
+        method = _llm_call_method.get() or _calling_method()
+        if method in COMPLETION_BUDGETS:
+            return COMPLETION_BUDGETS[method]
+        if response_model is None:
+            return COMPLETION_CONFIG['default_max_tokens']
+        estimate = int(expected_completion_tokens(response_model) * COMPLETION_CONFIG['schema_headroom'])
+        return min(max(estimate, COMPLETION_CONFIG['min_max_tokens']), COMPLETION_CONFIG['max_max_tokens'])
+    
+    def _forget_cached(self, request: Dict[str, Any], schema: Optional[Dict[str, Any]] = None):
+        """Drop a cached response that turned out to be unusable"""
+        if self.cache is not None:
+            self.cache.delete(self.cache.make_key(request, schema))
+    
+    async def acall_llm(self, messages: List[Dict[str, str]], temperature: float = 0.7,
+                        max_tokens: Optional[int] = None) -> str:
+        """Make an async call to the OpenAI API"""
+        try:
+            request = {
+                "model": self.model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens or self._completion_budget()
+            }
+            return await self._create_completion(request) or ""
+        except LLMCallError as e:
+            # Bad credentials or an exhausted quota fail every call, so stop the run
+            if e.fatal:
+                raise
+            print(f"Error calling LLM: {e}")
+            return ""
         except Exception as e:
             print(f"Error calling LLM: {e}")
             return ""
     
-    def call_llm_structured(self, messages: List[Dict[str, str]], response_model: Type[T], temperature: float = 0.7) -> Optional[T]:
-        """Make a structured call to the OpenAI API using Pydantic models"""
+    def call_llm(self, messages: List[Dict[str, str]], temperature: float = 0.7, method: Optional[str] = None) -> str:
+        """Make a call to the OpenAI API (blocking wrapper around acall_llm)"""
+        return self._run_sync(self.acall_llm(messages, temperature), method)
+    
+    def _structured_request(self, messages: List[Dict[str, str]], response_model: Type[T],
+                            temperature: float) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build a structured-output request and the schema it is cached under"""
+        modified_messages = [dict(message) for message in messages]
+        strict_schema = strict_json_schema(response_model)
+        if strict_schema is not None:
+            # Strict mode: the model can only produce JSON matching the schema
+            schema = strict_schema
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {"name": response_model.__name__, "strict": True, "schema": strict_schema}
+            }
+        else:
+            # Free-form Dict fields can't be expressed in strict mode; describe the shape instead
+            schema = response_model.model_json_schema()
+            response_format = {"type": "json_object"}
+            if modified_messages and modified_messages[-1]["role"] == "user":
+                modified_messages[-1]["content"] += f"\n\nRespond with JSON in this shape:\n{compact_schema(response_model)}"
+                
+        request = {
+            "model": self.model,
+            "messages": modified_messages,
+            "temperature": temperature,
+            "max_tokens": self._completion_budget(response_model),
+            "response_format": response_format
+        }
+        return request, schema
+                
+    def _parse_structured(self, response_content: Optional[str], response_model: Type[T],
+                          request: Dict[str, Any], schema: Dict[str, Any]) -> Optional[T]:
+        """Validate a structured response, repairing it locally if it doesn't match the model"""
+        if not response_content:
+            return None
+        try:
+            json_data = json.loads(response_content)
+            return response_model(**json_data)
+        except Exception as validation_error:
+            print(f"Pydantic validation error: {validation_error}")
+            repaired = self._repair_structured(response_content, response_model)
+            if repaired is None:
+                # Don't serve the same unusable response on the next run
+                self._forget_cached(request, schema)
+            return repaired
+    
+    async def acall_llm_structured(self, messages: List[Dict[str, str]], response_model: Type[T], temperature: float = 0.7) -> Optional[T]:
+        """Make an async structured call to the OpenAI API using Pydantic models"""
         try:
             # Check if the model supports structured output
             if self.model.startswith('gpt-4o'):
-                # Add JSON instruction to the last user message if not already present
-                modified_messages = messages.copy()
-                if modified_messages and modified_messages[-1]["role"] == "user":
-                    if "json" not in modified_messages[-1]["content"].lower():
-                        modified_messages[-1]["content"] += "\n\nPlease respond with valid JSON format."
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=modified_messages,
-                    temperature=temperature,
-                    max_tokens=4000,
-                    response_format={"type": "json_object"}
-                )
-                
-                # Log token usage
-                if hasattr(response, 'usage') and response.usage:
-                    print(f"[TOKENS] {self.model}: {response.usage.prompt_tokens} prompt + {response.usage.completion_tokens} completion = {response.usage.total_tokens} total")
-                
-                # Parse the JSON response
-                response_content = response.choices[0].message.content
-                if response_content:
-                    # Parse JSON and validate with Pydantic model
-                    json_data = json.loads(response_content)
-                    try:
-                        return response_model(**json_data)
-                    except Exception as validation_error:
-                        print(f"Pydantic validation error: {validation_error}")
-                        # Return None to trigger fallback
-                        return None
+                request, schema = self._structured_request(messages, response_model, temperature)
+                if self._cascade_model() is not None:
+                    result = await self._cascade_attempt(request, schema, response_model)
+                    if result is not None:
+                        return result
+                response_content = await self._create_completion(request, schema)
+                return self._parse_structured(response_content, response_model, request, schema)
             else:
                 # Fallback to regular call for models that don't support structured output
                 print(f"Model {self.model} doesn't support structured output, falling back to regular call")
-                response_content = self.call_llm(messages, temperature)
+                modified_messages = [dict(message) for message in messages]
+                if modified_messages and modified_messages[-1]["role"] == "user":
+                    modified_messages[-1]["content"] += f"\n\nRespond with JSON in this shape:\n{compact_schema(response_model)}"
+                response_content = await self.acall_llm(modified_messages, temperature,
+                                                        self._completion_budget(response_model))
                 if response_content:
-                    result = self.parse_json_response(response_content)
-                    if result:
-                        return response_model(**result)
-                        
+                    return self._repair_structured(response_content, response_model)
+        
+        except LLMCallError as e:
+            if e.fatal:
+                raise
+            print(f"Error calling LLM with structured output: {e}")
         except Exception as e:
             print(f"Error calling LLM with structured output: {e}")
-            # Fallback to regular call
-            response_content = self.call_llm(messages, temperature)
-            if response_content:
-                result = self.parse_json_response(response_content)
-                if result:
-                    try:
-                        return response_model(**result)
-                    except Exception as parse_error:
-                        print(f"Error parsing structured response: {parse_error}")
-                        # Try to fix common validation issues
-                        try:
-                            # Handle enum validation errors by trying to convert values
-                            if "enum" in str(parse_error).lower():
-                                # This is a complex case, just return None and let the fallback handle it
-                                return None
-                            elif "list_type" in str(parse_error).lower():
-                                # Handle list type errors
-                                return None
-                            elif "missing" in str(parse_error).lower():
-                                # Handle missing field errors
-                                return None
-                        except:
-                            pass
         
         return None
     
-    def parse_json_response(self, response: str) -> Optional[Dict[str, Any]]:
-        """Parse JSON response from LLM"""
+    def _cascade_model(self) -> Optional[str]:
+        """The cheaper model to try first for the calling method, if it is cascaded"""
+        method = _llm_call_method.get() or _calling_method()
+        model = CASCADE_CONFIG['model']
+        if not CASCADE_CONFIG['enabled'] or method not in CASCADE_CONFIG['methods'] or model == self.model:
+            return None
+        return model
+    
+    async def _cascade_attempt(self, request: Dict[str, Any], schema: Dict[str, Any],
+                               response_model: Type[T]) -> Optional[T]:
+        """Try a structured call on the cascade model, returning None when it should escalate to the agent's model"""
+        method = _llm_call_method.get() or _calling_method()
+        cascade_request = dict(request, model=self._cascade_model())
+        result, reason = None, None
+        try:
+            response_content = await self._create_completion(cascade_request, schema)
+            if not response_content:
+                reason = 'empty'
+            else:
+                # No local repair here: a response that needs repairing is escalated instead
+                result = response_model(**json.loads(response_content))
+                if filled_ratio(result) < CASCADE_CONFIG['min_filled_ratio']:
+                    result, reason = None, 'low_confidence'
+        except LLMCallError as e:
+            if e.fatal:
+                raise
+            reason = e.kind
+        except Exception:
+            reason = 'validation'
+        
+        if self.ledger is not None:
+            self.ledger.record_cascade(self.agent_type, method, cascade_request['model'], result is None, reason)
+        if result is None:
+            print(f"[CASCADE] {self.agent_type}.{method or 'unknown'}: escalating from "
+                  f"{cascade_request['model']} to {self.model} ({reason})")
+        return result
+    
+    def _repair_structured(self, response_content: str, response_model: Type[T]) -> Optional[T]:
+        """Coerce a response that failed validation into the model locally instead of asking again"""
+        data = self.parse_json_response(response_content)
+        if not data:
+            return None
+        result, fixes = repair_structured_output(data, response_model)
+        if fixes:
+            print(f"[REPAIR] {response_model.__name__}: {len(fixes)} fix(es) - {', '.join(fixes[:5])}")
+        if self.ledger is not None:
+            method = _llm_call_method.get() or _calling_method()
+            self.ledger.record_repair(self.agent_type, method, response_model.__name__, fixes, result is not None)
+        if result is None:
+            print(f"Could not repair {response_model.__name__} response")
+            return None
+        repairs = _structured_repairs.get()
+        if repairs is not None:
+            repairs.extend(fixes)
+        return result
+    
+    def call_llm_structured(self, messages: List[Dict[str, str]], response_model: Type[T], temperature: float = 0.7,
+                            method: Optional[str] = None) -> Optional[T]:
+        """Make a structured call to the OpenAI API (blocking wrapper around acall_llm_structured)"""
+        # The call runs in a copy of this context, so it fills the list set here
+        _structured_repairs.set([])
+        return self._run_sync(self.acall_llm_structured(messages, response_model, temperature), method)
+    
+    async def acall_llm_structured_stream(self, messages: List[Dict[str, str]], response_model: Type[T],
+                                          on_field: Callable[[str, Any], None], temperature: float = 0.7) -> Optional[T]:
+        """Make a streamed structured call, passing each field to on_field as soon as it is complete"""
+        parser = IncrementalJSONParser(on_field)
         try:
-            # Find JSON in response
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end != 0:
-                json_str = response[start:end]
-                return json.loads(json_str)
+            if not self.model.startswith('gpt-4o'):
+                result = await self.acall_llm_structured(messages, response_model, temperature)
+                if result is not None:
+                    parser.feed(result.model_dump_json())
+                return result
+            
+            request, schema = self._structured_request(messages, response_model, temperature)
+            response_content = await self._create_completion(request, schema, stream_parser=parser)
+            return self._parse_structured(response_content, response_model, request, schema)
+        
+        except LLMCallError as e:
+            if e.fatal:
+                raise
+            print(f"Error streaming LLM with structured output: {e}")
         except Exception as e:
-            print(f"Error parsing JSON response: {e}")
+            print(f"Error streaming LLM with structured output: {e}")
+        
         return None
     
+    def call_llm_structured_stream(self, messages: List[Dict[str, str]], response_model: Type[T],
+                                   on_field: Callable[[str, Any], None], temperature: float = 0.7,
+                                   method: Optional[str] = None) -> Optional[T]:
+        """Make a streamed structured call (blocking wrapper; on_field runs on the LLM event loop thread)"""
+        _structured_repairs.set([])
+        return self._run_sync(self.acall_llm_structured_stream(messages, response_model, on_field, temperature), method)
+    
+    def build_context(self, method: Optional[str] = None, **sections: Tuple[Any, int]) -> Dict[str, str]:
+        """Serialize upstream data (name=(value, priority)) for a prompt within the method's token budget"""
+        method = method or _calling_method()
+        builder = ContextBuilder(CONTEXT_BUDGETS.get(method, CONTEXT_BUDGETS['default']), self.model)
+        for name, (value, priority) in sections.items():
+            builder.add(name, value, priority)
+        context = builder.build()
+        if builder.trimmed():
+            print(f"[CONTEXT] {self.agent_type}.{method}: trimmed {', '.join(builder.trimmed())} "
+                  f"({builder.original_tokens} -> {builder.tokens} tokens)")
+        return context
+    
+    def prompt_messages(self, role: str, instructions: str, data: str) -> List[Dict[str, str]]:
+        """Lay out a prompt for provider prefix caching: static role and instructions first, per-idea data last"""
+        return [
+            {"role": "system", "content": f"{role}\n\n{textwrap.dedent(instructions).strip()}"},
+            {"role": "user", "content": textwrap.dedent(data).strip()}
+        ]
+    
+    def structured_data(self, result: BaseModel) -> Dict[str, Any]:
+        """Convert the response of this context's last structured call to a dict, listing its locally repaired fields"""
+        data = result.dict()
+        repairs = _structured_repairs.get()
+        if repairs:
+            data['repaired_fields'] = list(repairs)
+        return data
+    
+    def parse_json_response(self, response: str) -> Optional[Dict[str, Any]]:
+        """Parse JSON response from LLM"""
+        extraction = extract_json_result(response or "")
+        if not extraction.found:
+            print("Error parsing JSON response: no JSON object found")
+            return None
+        if extraction.repairs:
+            status = "" if extraction.complete else " (truncated)"
+            print(f"[JSON] {self.agent_type}: parsed response{status} after {', '.join(extraction.repairs)}")
+        return extraction.value
+    
     def log_activity(self, activity: str, data: Any = None):
         """Log agent activity for debugging"""
         print(f"[{self.agent_type.upper()}] {activity}")
@@ -127,4 +682,4 @@ class BaseAgent:
         """Validate input data"""
         if input_data is None or (isinstance(input_data, str) and not input_data.strip()):
             return False
-        return True 
\ No newline at end of file
+        return True
@@ -0,0 +1,284 @@
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Callable
+from idea_potential.config import BATCH_CONFIG
+from idea_potential.llm_cache import LLMResponseCache
+from idea_potential.llm_clients import get_openai_client
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+class BatchDeferred(BaseException):
+    """Raised when a call's result is not available yet in a bulk batch run.
+    
+    Derives from BaseException so it unwinds the whole analysis past the agents'
+    `except Exception` handlers; the run is replayed once the batch job completes.
+    """
+
+
+class BatchBackend:
+    """Interface for submitting a JSONL batch of chat completion requests and collecting the results"""
+    
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        """Submit batch input lines, returning a job id"""
+        raise NotImplementedError
+    
+    def status(self, job_id: str) -> str:
+        """Get a job's status: 'in_progress', 'completed' or 'failed'"""
+        raise NotImplementedError
+    
+    def results(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get a finished job's results keyed by custom_id ({"content", "usage"} or {"error"})"""
+        raise NotImplementedError
+
+
+def batch_line(custom_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    """One line of a batch input file"""
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": request}
+
+
+def parse_output_line(line: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert one line of a batch output or error file into a result"""
+    if line.get("error"):
+        error = line["error"]
+        return {"error": error.get("message", str(error)) if isinstance(error, dict) else str(error)}
+    
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code", 200) != 200 or not body.get("choices"):
+        message = (body.get("error") or {}).get("message") if isinstance(body.get("error"), dict) else None
+        return {"error": message or f"HTTP {response.get('status_code')}"}
+    
+    usage = body.get("usage") or {}
+    return {
+        "content": body["choices"][0]["message"].get("content"),
+        "usage": {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0)
+        }
+    }
+
+
+def _read_jsonl(text: str) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Submits jobs to the OpenAI Batch API (half price, completed within the completion window)"""
+    
+    def __init__(self, client=None, completion_window: str = BATCH_CONFIG['completion_window']):
+        self.client = client or get_openai_client()
+        self.completion_window = completion_window
+    
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        data = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines).encode("utf-8")
+        input_file = self.client.files.create(file=("batch_input.jsonl", data), purpose="batch")
+        batch = self.client.batches.create(input_file_id=input_file.id, endpoint=BATCH_ENDPOINT,
+                                           completion_window=self.completion_window)
+        return batch.id
+    
+    def status(self, job_id: str) -> str:
+        batch = self.client.batches.retrieve(job_id)
+        if batch.status in ('completed', 'expired'):
+            # Requests an expired job didn't finish come back as missing and are resubmitted
+            return 'completed'
+        if batch.status in ('failed', 'cancelled'):
+            return 'failed'
+        return 'in_progress'
+    
+    def results(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        batch = self.client.batches.retrieve(job_id)
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                for line in _read_jsonl(self.client.files.content(file_id).text):
+                    results[line["custom_id"]] = parse_output_line(line)
+        return results
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """Stand-in backend that keeps jobs as JSONL files in a directory, for testing bulk runs offline.
+    
+    A job is complete once `<job_id>_output.jsonl` exists in the Batch API output format. With a
+    responder (request body -> response content) jobs are completed as soon as they are submitted.
+    """
+    
+    def __init__(self, directory: str = BATCH_CONFIG['local_dir'],
+                 responder: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.directory = directory
+        self.responder = responder
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, job_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{job_id}_{kind}.jsonl")
+    
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        job_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        with open(self._path(job_id, "input"), 'w', encoding='utf-8') as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        if self.responder is not None:
+            self.complete(job_id, self.responder)
+        return job_id
+    
+    def complete(self, job_id: str, responder: Callable[[Dict[str, Any]], str]):
+        """Write the output file for a job by answering each request with the responder"""
+        with open(self._path(job_id, "input"), encoding='utf-8') as f:
+            lines = _read_jsonl(f.read())
+        
+        output = []
+        for line in lines:
+            try:
+                content = responder(line["body"])
+                body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                     "finish_reason": "stop"}],
+                        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}}
+                output.append({"custom_id": line["custom_id"], "response": {"status_code": 200, "body": body},
+                               "error": None})
+            except Exception as e:
+                output.append({"custom_id": line["custom_id"], "response": None,
+                               "error": {"code": "responder_error", "message": str(e)}})
+        
+        with open(self._path(job_id, "output"), 'w', encoding='utf-8') as f:
+            for line in output:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    
+    def status(self, job_id: str) -> str:
+        return 'completed' if os.path.exists(self._path(job_id, "output")) else 'in_progress'
+    
+    def results(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        with open(self._path(job_id, "output"), encoding='utf-8') as f:
+            return {line["custom_id"]: parse_output_line(line) for line in _read_jsonl(f.read())}
+
+
+_active_session: contextvars.ContextVar[Optional['BatchSession']] = contextvars.ContextVar('batch_session', default=None)
+
+
+def current_batch_session() -> Optional['BatchSession']:
+    """Get the batch session of the bulk run in progress, if any"""
+    return _active_session.get()
+
+
+class BatchSession:
+    """Persistent state of a bulk run: batched requests and their results, keyed by request content"""
+    
+    def __init__(self, path: str = BATCH_CONFIG['state_path']):
+        self.path = path
+        self._lock = threading.RLock()
+        self.requests: Dict[str, Dict[str, Any]] = {}
+        self.jobs: Dict[str, str] = {}
+        self.memo: Dict[str, Any] = {}
+        self.results: Dict[str, Any] = {}
+        
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.requests = state.get("requests", {})
+            self.jobs = state.get("jobs", {})
+            self.memo = state.get("memo", {})
+            self.results = state.get("results", {})
+    
+    @contextmanager
+    def activate(self):
+        """Route LLM calls made in this context through the session"""
+        token = _active_session.set(self)
+        try:
+            yield self
+        finally:
+            _active_session.reset(token)
+    
+    def result_for(self, request: Dict[str, Any], schema: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get the batch result for a request, registering it for the next job if there is none yet"""
+        key = LLMResponseCache.make_key(request, schema)
+        with self._lock:
+            entry = self.requests.setdefault(key, {"request": request, "job_id": None, "result": None})
+            return entry["result"]
+    
+    def memoize(self, name: str, args: Any, compute: Callable[[], Any]) -> Any:
+        """Compute a non-LLM step once per bulk run, so replays see the same inputs"""
+        key = hashlib.sha256(json.dumps([name, args], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self.memo:
+                return self.memo[key]
+        value = compute()
+        with self._lock:
+            self.memo[key] = value
+        return value
+    
+    def unsubmitted(self) -> List[str]:
+        """Keys of requests that are waiting for a job"""
+        with self._lock:
+            return [key for key, entry in self.requests.items() if entry["result"] is None and entry["job_id"] is None]
+    
+    def open_jobs(self) -> List[str]:
+        with self._lock:
+            return [job_id for job_id, status in self.jobs.items() if status == 'in_progress']
+    
+    def submit(self, backend: BatchBackend) -> Optional[str]:
+        """Submit every request still waiting for a job as one batch job"""
+        keys = self.unsubmitted()
+        if not keys:
+            return None
+        lines = [batch_line(key, self.requests[key]["request"]) for key in keys]
+        job_id = backend.submit(lines)
+        with self._lock:
+            for key in keys:
+                self.requests[key]["job_id"] = job_id
+            self.jobs[job_id] = 'in_progress'
+        print(f"📦 Submitted batch job {job_id} with {len(keys)} requests")
+        self.save()
+        return job_id
+    
+    def collect(self, backend: BatchBackend) -> int:
+        """Store the results of every finished job without blocking, returning how many jobs finished"""
+        finished = 0
+        for job_id in self.open_jobs():
+            status = backend.status(job_id)
+            if status == 'in_progress':
+                continue
+            results = backend.results(job_id) if status == 'completed' else {}
+            with self._lock:
+                for key, entry in self.requests.items():
+                    if entry["job_id"] != job_id:
+                        continue
+                    if key in results:
+                        entry["result"] = results[key]
+                    else:
+                        # Missing from a failed or expired job; goes into the next job
+                        entry["job_id"] = None
+                self.jobs[job_id] = status
+            finished += 1
+            print(f"📦 Batch job {job_id} {status} ({len(results)} results)")
+        if finished:
+            self.save()
+        return finished
+    
+    def wait(self, backend: BatchBackend, poll_interval: float = BATCH_CONFIG['poll_interval_seconds']):
+        """Block until every open job has finished"""
+        while True:
+            self.collect(backend)
+            if not self.open_jobs():
+                return
+            time.sleep(poll_interval)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "jobs": self.jobs, "memo": self.memo, "results": self.results}
+    
+    def save(self) -> str:
+        """Write the session state atomically"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, default=str)
+        os.replace(temp_path, self.path)
+        return self.path
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Any, Callable
+import openai
+from idea_potential.llm_clients import create_async_openai_client, http2_available
+
+# Number of LLM calls each agent makes during a full pipeline run (roadmap and refiner enabled)
+PIPELINE_CALL_PLAN = [
+    ('clarifier', 6),
+    ('suggester', 5),
+    ('research', 6),
+    ('validation', 6),
+    ('roadmap', 7),
+    ('report', 2),
+    ('refiner', 5)
+]
+
+
+class ConnectionStats:
+    """Collects connection setup events from httpcore's trace extension"""
+    
+    def __init__(self):
+        self.tcp_connects = 0
+        self.tls_handshakes = 0
+        self.connect_seconds = 0.0
+        self._started: Dict[str, float] = {}
+    
+    async def trace(self, event_name: str, info: Dict[str, Any]):
+        """Record TCP connect and TLS handshake timings"""
+        for step in ('connect_tcp', 'start_tls'):
+            if event_name == f"connection.{step}.started":
+                self._started[step] = time.perf_counter()
+            elif event_name == f"connection.{step}.complete":
+                self.connect_seconds += time.perf_counter() - self._started.pop(step, time.perf_counter())
+                if step == 'connect_tcp':
+                    self.tcp_connects += 1
+                else:
+                    self.tls_handshakes += 1
+    
+    async def on_request(self, request):
+        """httpx request hook that attaches the trace callback"""
+        request.extensions["trace"] = self.trace
+
+
+async def _make_call(client: openai.AsyncOpenAI, endpoint: str, model: str):
+    """Issue one cheap API request"""
+    if endpoint == 'chat':
+        await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": "ping"}],
+            max_tokens=1
+        )
+    else:
+        await client.models.list()
+
+
+async def _run_plan(get_client: Callable[[str], openai.AsyncOpenAI], endpoint: str, model: str) -> float:
+    """Replay the pipeline call plan agent by agent, returning wall time"""
+    start = time.perf_counter()
+    for agent_type, calls in PIPELINE_CALL_PLAN:
+        client = get_client(agent_type)
+        for _ in range(calls):
+            await _make_call(client, endpoint, model)
+    return time.perf_counter() - start
+
+
+async def benchmark(endpoint: str = 'models', model: str = 'gpt-4o-mini') -> Dict[str, Any]:
+    """Compare one client per agent against a single shared, pooled client"""
+    results = {}
+    
+    # Per-agent clients: every agent opens its own pool (the old behaviour)
+    stats = ConnectionStats()
+    per_agent_clients: Dict[str, openai.AsyncOpenAI] = {}
+    
+    def per_agent_client(agent_type: str) -> openai.AsyncOpenAI:
+        if agent_type not in per_agent_clients:
+            per_agent_clients[agent_type] = create_async_openai_client(event_hooks={"request": [stats.on_request]})
+        return per_agent_clients[agent_type]
+    
+    wall = await _run_plan(per_agent_client, endpoint, model)
+    results['per_agent'] = _summarize(stats, wall, len(per_agent_clients))
+    for client in per_agent_clients.values():
+        await client.close()
+    
+    # Shared client: all agents reuse one connection pool
+    stats = ConnectionStats()
+    shared = create_async_openai_client(event_hooks={"request": [stats.on_request]})
+    wall = await _run_plan(lambda agent_type: shared, endpoint, model)
+    results['shared'] = _summarize(stats, wall, 1)
+    await shared.close()
+    
+    results['http2'] = http2_available()
+    results['total_calls'] = sum(calls for _, calls in PIPELINE_CALL_PLAN)
+    return results
+
+
+def _summarize(stats: ConnectionStats, wall_seconds: float, clients: int) -> Dict[str, Any]:
+    """Summarize one benchmark mode"""
+    return {
+        "clients": clients,
+        "tcp_connects": stats.tcp_connects,
+        "tls_handshakes": stats.tls_handshakes,
+        "connect_seconds": round(stats.connect_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3)
+    }
+
+
+def main(argv: List[str] = None):
+    """Run the client benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Benchmark per-agent vs shared OpenAI clients over a full pipeline run")
+    parser.add_argument('--endpoint', choices=['models', 'chat'], default='models',
+                        help="'models' lists models (free); 'chat' sends 1-token completions")
+    parser.add_argument('--model', default='gpt-4o-mini', help="Model used for --endpoint chat")
+    args = parser.parse_args(argv)
+    
+    results = asyncio.run(benchmark(args.endpoint, args.model))
+    print(json.dumps(results, indent=2))
+    
+    saved = results['per_agent']['connect_seconds'] - results['shared']['connect_seconds']
+    print(f"\nConnections opened: {results['per_agent']['tcp_connects']} per-agent vs {results['shared']['tcp_connects']} shared")
+    print(f"Connection setup time saved: {saved:.3f}s over {results['total_calls']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from idea_potential.config import CHECKPOINT_CONFIG
+
+MANIFEST = "manifest"
+
+
+def new_run_id() -> str:
+    """Unique, time-ordered id for a pipeline run"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class RunCheckpoint:
+    """Step outputs of one pipeline run, one JSON file per step in the run's directory"""
+    
+    def __init__(self, run_id: str, root: str = CHECKPOINT_CONFIG['dir']):
+        self.run_id = run_id
+        self.directory = os.path.join(root, run_id)
+        self._lock = threading.Lock()
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+    
+    def _write(self, name: str, data: Any):
+        """Write atomically, so a crash mid-write never leaves a truncated checkpoint behind"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(temp_path, path)
+    
+    def _read(self, name: str) -> Optional[Any]:
+        try:
+            with open(self._path(name), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            print(f"Ignoring unreadable checkpoint {self._path(name)}: {e}")
+            return None
+    
+    def save(self, step: str, data: Any):
+        """Checkpoint a finished step's output"""
+        self._write(step, {"step": step, "saved_at": datetime.now().isoformat(), "data": data})
+    
+    def load(self, step: str) -> Optional[Any]:
+        """Get a finished step's output, or None if the step hasn't been checkpointed"""
+        entry = self._read(step)
+        return entry.get("data") if entry else None
+    
+    def completed_steps(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len(".json")] for name in os.listdir(self.directory)
+                      if name.endswith(".json") and name != f"{MANIFEST}.json")
+    
+    def manifest(self) -> Dict[str, Any]:
+        """The run's idea, options and status"""
+        return self._read(MANIFEST) or {}
+    
+    def update_manifest(self, **fields) -> Dict[str, Any]:
+        with self._lock:
+            manifest = self.manifest()
+            manifest.update(fields, run_id=self.run_id, updated_at=datetime.now().isoformat())
+            self._write(MANIFEST, manifest)
+        return manifest
@@ -64,11 +64,9 @@ class ClarifierAgent(BaseAgent):
     def _generate_first_question(self) -> Dict[str, Any]:
         """Generate the first question based on the original idea"""
         
-        prompt = f"""
+        instructions = """
         You are an expert business analyst and idea validator. Your job is to ask the most critical first question to understand a business idea's potential.
 
-        ORIGINAL IDEA: {self.original_idea}
-
         Based on this idea, what is the SINGLE most critical question that needs to be answered first to properly evaluate its potential? 
 
         Focus on the most fundamental aspect that will help understand:
@@ -76,69 +74,36 @@ class ClarifierAgent(BaseAgent):
         2. Value proposition and differentiation, OR  
         3. Feasibility and resources needed
 
-        Please respond with valid JSON format containing:
-        {{
-            "question": "The single most critical question to ask first",
-            "reason": "Why this question is critical and what it will reveal",
-            "category": "market|value_proposition|feasibility",
-            "question_number": 1,
-            "total_questions": "dynamic",
-            "status": "asking"
-        }}
+        This is question_number 1 with total_questions "dynamic" and status "asking".
 
-        For the category field, use exactly one of these values:
+        For the category field:
         - "market" for questions about target market, customers, or market validation
         - "value_proposition" for questions about value proposition, differentiation, or competitive advantage  
         - "feasibility" for questions about technical feasibility, resources, or implementation
         """
         
-        messages = [
-            {"role": "system", "content": "You are a business analyst expert at asking the right questions to validate ideas. Always ask ONE question at a time."},
-            {"role": "user", "content": prompt}
-        ]
+        prompt = f"""
+        ORIGINAL IDEA: {self.original_idea}
+        """
         
-        try:
-            # Try structured output first
-            result = self.call_llm_structured(messages, IndividualQuestionResponse, temperature=0.3)
-            
-            if result:
-                question_data = {
-                    "question": result.question,
-                    "reason": result.reason,
-                    "category": result.category,
-                    "question_number": result.question_number,
-                    "total_questions": result.total_questions,
-                    "status": result.status
-                }
-                
-                self.questions_asked.append(question_data)
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": f"Question: {question_data['question']}\nReason: {question_data['reason']}"
-                })
-                
-                return question_data
-                
-        except Exception as e:
-            print(f"Error generating first question with structured output: {e}")
-        
-        # Fallback to regular LLM call
-        response = self.call_llm(messages, temperature=0.3)
-        result = self.parse_json_response(response)
+        messages = self.prompt_messages("You are a business analyst expert at asking the right questions to validate ideas. Always ask ONE question at a time.", instructions, prompt)
         
+        # Strict structured output; a failed call is not retried unstructured
+        result = self.call_llm_structured(messages, IndividualQuestionResponse, temperature=0.3, method='_generate_first_question')
+            
         if result:
             question_data = {
-                "question": result.get("question", "What is your target market?"),
-                "reason": result.get("reason", "Understanding the target market is critical for idea validation"),
-                "category": result.get("category", "market"),
-                "question_number": 1,
-                "total_questions": "dynamic",
-                "status": "asking"
+                "question": result.question,
+                "reason": result.reason,
+                "category": result.category,
+                "question_number": result.question_number,
+                "total_questions": result.total_questions,
+                "status": result.status
             }
             
             self.questions_asked.append(question_data)
             self.conversation_history.append({
-                "role": "assistant", 
+                "role": "assistant",
                 "content": f"Question: {question_data['question']}\nReason: {question_data['reason']}"
             })
             
@@ -152,13 +117,8 @@ class ClarifierAgent(BaseAgent):
         # Build conversation context
         conversation_summary = self._build_conversation_summary()
         
-        prompt = f"""
-        You are an expert business analyst conducting a dynamic conversation to validate a business idea. 
-
-        ORIGINAL IDEA: {self.original_idea}
-
-        CONVERSATION HISTORY:
-        {conversation_summary}
+        instructions = """
+        You are an expert business analyst conducting a dynamic conversation to validate a business idea.
 
         Based on the previous questions and answers, what is the NEXT most critical question to ask? 
 
@@ -169,64 +129,36 @@ class ClarifierAgent(BaseAgent):
 
         The question should build upon previous answers and move the conversation forward toward a complete understanding of the idea's potential.
 
-        Please respond with valid JSON format containing:
-        {{
-            "question": "The next critical question to ask",
-            "reason": "Why this question is important given the previous answers",
-            "category": "market|value_proposition|feasibility",
-            "question_number": {len(self.questions_asked) + 1},
-            "total_questions": "dynamic",
-            "status": "asking"
-        }}
+        Use the QUESTION NUMBER given as question_number, with total_questions "dynamic" and status "asking".
 
-        For the category field, use exactly one of these values:
+        For the category field:
         - "market" for questions about target market, customers, or market validation
         - "value_proposition" for questions about value proposition, differentiation, or competitive advantage
         - "feasibility" for questions about technical feasibility, resources, or implementation
         """
         
-        messages = [
-            {"role": "system", "content": "You are a business analyst expert at asking the right questions to validate ideas. Always ask ONE question at a time and build upon previous answers."},
-            {"role": "user", "content": prompt}
-        ]
+        prompt = f"""
+        ORIGINAL IDEA: {self.original_idea}
+
+        CONVERSATION HISTORY:
+        {conversation_summary}
+
+        QUESTION NUMBER: {len(self.questions_asked) + 1}
+        """
+        
+        messages = self.prompt_messages("You are a business analyst expert at asking the right questions to validate ideas. Always ask ONE question at a time and build upon previous answers.", instructions, prompt)
         
-        try:
-            # Try structured output first
-            result = self.call_llm_structured(messages, IndividualQuestionResponse, temperature=0.3)
+        # Strict structured output; a failed call is not retried unstructured
+        result = self.call_llm_structured(messages, IndividualQuestionResponse, temperature=0.3, method='_generate_follow_up_question')
             
-            if result:
-                question_data = {
-                    "question": result.question,
-                    "reason": result.reason,
-                    "category": result.category,
-                    "question_number": result.question_number,
-                    "total_questions": result.total_questions,
-                    "status": result.status
-                }
-                
-                self.questions_asked.append(question_data)
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": f"Question: {question_data['question']}\nReason: {question_data['reason']}"
-                })
-                
-                return question_data
-                
-        except Exception as e:
-            print(f"Error generating follow-up question with structured output: {e}")
-        
-        # Fallback to regular LLM call
-        response = self.call_llm(messages, temperature=0.3)
-        result = self.parse_json_response(response)
-        
         if result:
             question_data = {
-                "question": result.get("question", "What is your unique value proposition?"),
-                "reason": result.get("reason", "Understanding the value proposition is important for differentiation"),
-                "category": result.get("category", "value_proposition"),
-                "question_number": len(self.questions_asked) + 1,
-                "total_questions": "dynamic",
-                "status": "asking"
+                "question": result.question,
+                "reason": result.reason,
+                "category": result.category,
+                "question_number": result.question_number,
+                "total_questions": result.total_questions,
+                "status": result.status
             }
             
             self.questions_asked.append(question_data)
@@ -282,20 +214,8 @@ class ClarifierAgent(BaseAgent):
         # First, develop detailed user personas
         user_personas = self.develop_user_personas()
         
-        prompt = f"""
-        Based on the following idea and conversation, create a comprehensive summary of the clarified idea:
-
-        ORIGINAL IDEA: {self.original_idea}
-        
-        CONVERSATION SUMMARY:
-        """
-        
-        for i, (question, response) in enumerate(zip(self.questions_asked, self.user_responses)):
-            prompt += f"\nQ{i+1}: {question['question']}\nA{i+1}: {response}\n"
-        
-        prompt += f"""
-        USER PERSONAS DEVELOPED:
-        {user_personas}
+        instructions = """
+        Based on the following idea and conversation, create a comprehensive summary of the clarified idea.
 
         Create a comprehensive summary that includes:
         1. Refined idea description
@@ -305,23 +225,33 @@ class ClarifierAgent(BaseAgent):
         5. Next steps for validation
 
         Return as JSON:
-        {{
+        {
             "refined_idea": "Clear description of the idea after clarification",
             "target_market": "Identified target market",
-            "user_personas": {user_personas},
+            "user_personas": "The USER PERSONAS DEVELOPED, unchanged",
             "value_propositions": ["List of key value propositions"],
             "potential_challenges": ["List of potential challenges"],
             "validation_priorities": ["List of what needs to be validated"],
             "status": "clarified"
-        }}
+        }
+        """
+        
+        conversation = "\n".join(f"Q{i+1}: {question['question']}\nA{i+1}: {response}"
+                                 for i, (question, response) in enumerate(zip(self.questions_asked, self.user_responses)))
+        
+        prompt = f"""
+        ORIGINAL IDEA: {self.original_idea}
+
+        CONVERSATION SUMMARY:
+        {conversation}
+
+        USER PERSONAS DEVELOPED:
+        {user_personas}
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert at synthesizing information into clear business insights."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self.prompt_messages("You are an expert at synthesizing information into clear business insights.", instructions, prompt)
         
-        response = self.call_llm(messages, temperature=0.3)
+        response = self.call_llm(messages, temperature=0.3, method='generate_clarification_summary')
         result = self.parse_json_response(response)
         
         if result:
@@ -333,18 +263,15 @@ class ClarifierAgent(BaseAgent):
     def develop_user_personas(self) -> Dict[str, Any]:
         """Develop detailed user personas for the business idea"""
         
-        prompt = f"""
-        Develop detailed user personas for this business idea:
-
-        IDEA: {self.original_idea}
-        CONVERSATION CONTEXT: {self._build_conversation_summary()}
+        instructions = """
+        Develop detailed user personas for this business idea.
 
         Create 3-5 detailed user personas that represent the target market. For each persona, include:
 
         Return as JSON:
-        {{
+        {
             "primary_personas": [
-                {{
+                {
                     "name": "Persona name",
                     "role": "Job title/role",
                     "age_range": "Age range",
@@ -365,10 +292,10 @@ class ClarifierAgent(BaseAgent):
                     "communication_preferences": ["How they prefer to communicate"],
                     "learning_style": "How they prefer to learn new things",
                     "quote": "A representative quote from this persona"
-                }}
+                }
             ],
             "secondary_personas": [
-                {{
+                {
                     "name": "Persona name",
                     "role": "Job title/role",
                     "relationship_to_primary": "How they relate to primary personas",
@@ -376,23 +303,25 @@ class ClarifierAgent(BaseAgent):
                     "goals": ["List of goals"],
                     "pain_points": ["List of pain points"],
                     "motivations": ["List of motivations"]
-                }}
+                }
             ],
-            "persona_insights": {{
+            "persona_insights": {
                 "common_characteristics": ["Characteristics shared across personas"],
                 "key_differences": ["Key differences between personas"],
                 "unified_needs": ["Needs that all personas share"],
                 "persona_priorities": ["Priority order for addressing personas"]
-            }}
-        }}
+            }
+        }
+        """
+        
+        prompt = f"""
+        IDEA: {self.original_idea}
+        CONVERSATION CONTEXT: {self._build_conversation_summary()}
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert in user research and persona development with deep understanding of various industries and user types."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self.prompt_messages("You are an expert in user research and persona development with deep understanding of various industries and user types.", instructions, prompt)
         
-        response = self.call_llm(messages, temperature=0.4)
+        response = self.call_llm(messages, temperature=0.4, method='develop_user_personas')
         result = self.parse_json_response(response)
         
         if result:
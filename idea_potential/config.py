@@ -18,6 +18,167 @@ MODEL_CONFIG = {
     'refiner': 'gpt-4o'          # Final refinement
 }
 
+# Cheap-first cascade for structured calls: the listed methods try the cascade model first and
+# escalate to the agent's model when its response fails validation or looks low-confidence
+CASCADE_CONFIG = {
+    'enabled': os.getenv('LLM_CASCADE_ENABLED', 'true').lower() in ('true', '1', 'yes'),
+    'model': os.getenv('LLM_CASCADE_MODEL', 'gpt-4o-mini'),
+    # Escalate when fewer than this share of the response's fields have real content
+    'min_filled_ratio': 0.8,
+    'methods': {
+        'generate_relevant_keywords_and_subreddits',
+        'extract_core_concepts',
+        'generate_search_keywords',
+        'create_validation_summary',
+        'generate_suggestions'
+    }
+}
+
+# LLM response cache (content-addressed, shared by all agents)
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes')
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', 'idea_potential/.cache/llm_responses.sqlite3')
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # Entries older than a week are treated as misses
+LLM_CACHE_MAX_ENTRIES = 5000  # Least recently used entries are evicted beyond this
+
+# Pipeline step outputs, keyed by a fingerprint of the step's inputs and agent configuration,
+# so a rerun with one answer edited or an agent toggled only recomputes the affected steps
+STEP_CACHE_ENABLED = os.getenv('STEP_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes')
+STEP_CACHE_PATH = os.getenv('STEP_CACHE_PATH', 'idea_potential/.cache/pipeline_steps.sqlite3')
+STEP_CACHE_TTL_SECONDS = 24 * 60 * 60  # Research data goes stale, so reuse steps for a day at most
+STEP_CACHE_MAX_ENTRIES = 500
+STEP_CACHE_VERSION = 1  # Bump when a step's prompts or output format change
+
+# Shared OpenAI HTTP client (one connection pool per process)
+OPENAI_HTTP_CONFIG = {
+    'max_connections': 50,            # Upper bound on concurrent connections
+    'max_keepalive_connections': 20,  # Idle connections kept warm for reuse
+    'keepalive_expiry': 90.0,         # Seconds an idle connection stays open
+    'http2': True,                    # Used when the optional 'h2' package is installed
+    'timeout': 120.0                  # Per-request timeout in seconds
+}
+
+# Retries for transient LLM errors (rate limits, timeouts, 5xx, dropped connections)
+LLM_RETRY_CONFIG = {
+    'max_attempts': 4,          # Total attempts per call, including the first
+    'base_delay': 1.0,          # Seconds; doubled on every retry, with full jitter
+    'max_delay': 30.0,          # Upper bound on a single backoff
+    'deadline_seconds': 180.0   # Per-call deadline covering queueing, attempts and backoff
+}
+
+# Hedged requests for latency-critical interactive calls (opt-in): when the first request hasn't
+# answered by the method's p90 latency a duplicate is sent and whichever answers first wins
+HEDGE_CONFIG = {
+    'enabled': os.getenv('LLM_HEDGING_ENABLED', 'false').lower() in ('true', '1', 'yes'),
+    'methods': {'_generate_first_question', '_generate_follow_up_question', 'generate_suggestions'},
+    'percentile': 0.9,
+    'min_samples': 5,              # Observed latencies needed before the percentile is trusted
+    'default_delay_seconds': 10.0, # Hedge delay until then
+    'min_delay_seconds': 1.0,
+    'window': 100,                 # Recent latencies kept per model and method
+    'budget_ratio': 0.1            # At most this share of hedgeable calls may send a duplicate
+}
+
+# Model pricing in USD per 1M tokens, used by the per-run usage ledger
+MODEL_PRICING = {
+    'gpt-4o': {'input': 2.50, 'cached_input': 1.25, 'output': 10.00},
+    'gpt-4o-mini': {'input': 0.15, 'cached_input': 0.075, 'output': 0.60}
+}
+
+# Token budgets for upstream data interpolated into prompts, per agent method
+# (see context_builder.py); lower-priority sections are trimmed to fit
+CONTEXT_BUDGETS = {
+    'default': 4000,
+    'create_validation_matrix': 5000,
+    'create_development_roadmap': 6000,
+    'create_financial_models': 5000,
+    'generate_comprehensive_report': 9000,
+    'validate_report_authenticity': 6000,
+    'identify_gaps_and_improvements': 6000
+}
+
+# Completion length (max_tokens) per call: structured calls are sized from their response
+# model's schema, free-text calls use COMPLETION_BUDGETS. Responses cut off at the limit
+# are continued from where they stopped instead of being asked again.
+COMPLETION_CONFIG = {
+    'default_max_tokens': 4000,  # Free-text calls without a budget
+    'min_max_tokens': 512,
+    'max_max_tokens': 8000,
+    'schema_headroom': 1.25,     # Margin over the schema-based size estimate
+    'max_continuations': int(os.getenv('LLM_MAX_CONTINUATIONS', '2'))
+}
+COMPLETION_BUDGETS = {
+    'identify_categories_from_text': 1000,
+    'analyze_chunk_with_references': 2500,
+    'analyze_market_insights': 3000,
+    'generate_clarification_summary': 1500,
+    'develop_user_personas': 2500,
+    'analyze_competitors': 2500,
+    'estimate_market_size': 1500,
+    'generate_swot_analysis': 1500,
+    'create_risk_assessment': 2500,
+    'create_technical_requirements': 2500,
+    'create_architecture_plan': 2500,
+    'create_priority_matrix': 2000,
+    'create_resource_plan': 2500,
+    'create_milestone_timeline': 2500,
+    'create_roadmap_summary': 1500,
+    'create_financial_models': 3000,
+    'cross_check_claims': 2000,
+    'identify_gaps_and_improvements': 2500,
+    'generate_refinement_recommendations': 2500,
+    'create_final_validation_summary': 1500
+}
+
+# Bulk runs through the Batch API (IdeaPotentialPipeline.run_batch)
+BATCH_CONFIG = {
+    'state_path': 'idea_potential/.batch/batch_state.json',  # Requests, results and job ids of a bulk run
+    'local_dir': 'idea_potential/.batch/jobs',               # Job files of LocalFileBatchBackend
+    'completion_window': '24h',
+    'poll_interval_seconds': 60,
+    'price_multiplier': 0.5                                  # Batch API discount applied in the usage ledger
+}
+
+# Many ideas from a JSONL/CSV file (portfolio.py, `main.py --batch`), analyzed concurrently in one
+# process so they share the HTTP clients, rate limiter and caches
+PORTFOLIO_CONFIG = {
+    'max_concurrency': int(os.getenv('PORTFOLIO_MAX_CONCURRENCY', '4')),  # Ideas analyzed at once
+    'output_path': 'idea_potential/reports/portfolio_results.jsonl'      # One line per finished idea
+}
+
+# Every step's output is checkpointed to <dir>/<run_id>/ so a failed run can be resumed
+# with IdeaPotentialPipeline.resume(run_id) instead of starting over
+CHECKPOINT_CONFIG = {
+    'enabled': os.getenv('CHECKPOINTS_ENABLED', 'true').lower() in ('true', '1', 'yes'),
+    'dir': os.getenv('CHECKPOINT_DIR', 'idea_potential/runs')
+}
+
+# Stream long structured responses (e.g. the comprehensive report) and surface fields as they complete
+STREAMING_ENABLED = os.getenv('STREAMING_ENABLED', 'true').lower() in ('true', '1', 'yes')
+
+# Independent sub-analyses inside an agent (see task_graph.py) run concurrently, at most this many at once
+AGENT_MAX_CONCURRENCY = int(os.getenv('AGENT_MAX_CONCURRENCY', '4'))
+# Pipeline steps (see IdeaPotentialPipeline._analysis_graph) run as soon as their inputs exist, at most this many at once
+PIPELINE_MAX_CONCURRENCY = int(os.getenv('PIPELINE_MAX_CONCURRENCY', '3'))
+# Each of the refiner's concurrent report checks gives up after this long and the refinement continues without it;
+# the check's LLM call is cancelled, but tokens it already generated may still be billed
+REFINER_CHECK_TIMEOUT_SECONDS = float(os.getenv('REFINER_CHECK_TIMEOUT_SECONDS', '240'))
+
+# Client-side rate limits per model (requests and tokens per minute), shared by all
+# agents and pipelines in the process. Off by default: every request reserves its prompt plus
+# max_tokens (up to 8000), so a low tier's limit admits only a few of the concurrent steps per
+# minute. Enable it with your OpenAI account's tier limits, e.g. RATE_LIMIT_GPT_4O_TPM=800000.
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() in ('true', '1', 'yes')
+RATE_LIMITS = {
+    'gpt-4o': {
+        'rpm': int(os.getenv('RATE_LIMIT_GPT_4O_RPM', '500')),
+        'tpm': int(os.getenv('RATE_LIMIT_GPT_4O_TPM', '30000'))
+    },
+    'gpt-4o-mini': {
+        'rpm': int(os.getenv('RATE_LIMIT_GPT_4O_MINI_RPM', '500')),
+        'tpm': int(os.getenv('RATE_LIMIT_GPT_4O_MINI_TPM', '200000'))
+    }
+}
+
 # Dynamic subreddit mapping based on idea categories
 SUBREDDIT_CATEGORIES = {
     # AI/ML/Technology
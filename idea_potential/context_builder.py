@@ -0,0 +1,120 @@
+import json
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; fall back to a character estimate
+    tiktoken = None
+
+# Section priorities: lower-priority sections are trimmed first, and only LOW sections are dropped entirely
+LOW = 1
+MEDIUM = 2
+HIGH = 3
+
+# (max string length, max list items, max nesting depth) per trim level; level 0 is untrimmed
+TRIM_LEVELS = [
+    (None, None, None),
+    (400, 8, None),
+    (200, 5, None),
+    (100, 3, 3),
+    (60, 2, 2),
+]
+OMITTED = "(omitted to fit the context budget)"
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Count tokens with the model's tokenizer (about 4 characters per token without tiktoken)"""
+    if tiktoken is None:
+        return len(text) // 4 + 1
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def compact(value: Any, max_string: int = None, max_items: int = None, max_depth: int = None, depth: int = 0) -> Any:
+    """Drop empty fields and shorten long strings, lists and deep nesting"""
+    if isinstance(value, dict):
+        if max_depth is not None and depth >= max_depth:
+            return f"({len(value)} fields)"
+        return {key: compact(item, max_string, max_items, max_depth, depth + 1)
+                for key, item in value.items() if not _is_empty(item)}
+    if isinstance(value, (list, tuple)):
+        items = [item for item in value if not _is_empty(item)]
+        if max_depth is not None and depth >= max_depth:
+            return f"({len(items)} items)"
+        kept = items if max_items is None else items[:max_items]
+        result = [compact(item, max_string, max_items, max_depth, depth + 1) for item in kept]
+        if len(kept) < len(items):
+            result.append(f"(+{len(items) - len(kept)} more)")
+        return result
+    if isinstance(value, str) and max_string is not None and len(value) > max_string:
+        return value[:max_string].rstrip() + "…"
+    return value
+
+
+def serialize(value: Any) -> str:
+    """Compact JSON instead of a Python repr: no indentation, no spaces after separators"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class ContextBuilder:
+    """Serializes upstream artifacts for a prompt and trims them to fit a token budget"""
+    
+    def __init__(self, budget: int, model: str = "gpt-4o"):
+        self.budget = budget
+        self.model = model
+        self.sections: Dict[str, Tuple[Any, int]] = {}
+        self.levels: Dict[str, int] = {}
+        self.original_tokens = 0
+        self.tokens = 0
+    
+    def add(self, name: str, value: Any, priority: int = MEDIUM) -> 'ContextBuilder':
+        self.sections[name] = (value, priority)
+        self.levels[name] = 0
+        return self
+    
+    def _render(self, name: str) -> str:
+        value, _ = self.sections[name]
+        level = self.levels[name]
+        if level >= len(TRIM_LEVELS):
+            return OMITTED
+        return serialize(compact(value, *TRIM_LEVELS[level]))
+    
+    def _total_tokens(self, rendered: Dict[str, str]) -> int:
+        return sum(count_tokens(text, self.model) for text in rendered.values())
+    
+    def build(self) -> Dict[str, str]:
+        """Render every section, trimming lower-priority sections first until the total fits the budget"""
+        rendered = {name: self._render(name) for name in self.sections}
+        self.original_tokens = self._total_tokens(rendered)
+        self.tokens = self.original_tokens
+        
+        for priority in sorted({priority for _, priority in self.sections.values()}):
+            names = [name for name, (_, section_priority) in self.sections.items() if section_priority == priority]
+            # Only low-priority sections may be dropped completely
+            max_level = len(TRIM_LEVELS) if priority <= LOW else len(TRIM_LEVELS) - 1
+            for level in range(1, max_level + 1):
+                if self.tokens <= self.budget:
+                    return rendered
+                for name in names:
+                    self.levels[name] = level
+                    rendered[name] = self._render(name)
+                self.tokens = self._total_tokens(rendered)
+        return rendered
+    
+    def trimmed(self) -> List[str]:
+        """Names of the sections that had to be trimmed or dropped"""
+        return [name for name, level in self.levels.items() if level > 0]
@@ -0,0 +1,145 @@
+import asyncio
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Any, Awaitable, Callable, Deque, Optional, Tuple, TypeVar
+from idea_potential.config import HEDGE_CONFIG
+
+R = TypeVar('R')
+
+
+class LatencyTracker:
+    """Recent call latencies per (model, method), for picking hedge delays"""
+    
+    def __init__(self, window: int = HEDGE_CONFIG['window']):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+    
+    def observe(self, model: str, method: str, seconds: float):
+        with self._lock:
+            self._samples[(model, method)].append(seconds)
+    
+    def percentile(self, model: str, method: str, q: float) -> Optional[float]:
+        """The q-th latency percentile, or None with too few samples"""
+        with self._lock:
+            samples = sorted(self._samples.get((model, method), ()))
+        if len(samples) < HEDGE_CONFIG['min_samples']:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+
+class Hedger:
+    """Sends a duplicate of a slow request and takes whichever response arrives first"""
+    
+    def __init__(self, config: Dict[str, Any] = HEDGE_CONFIG):
+        self.config = config
+        self.latencies = LatencyTracker(config['window'])
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.over_budget = 0
+        self.rate_limited = 0
+    
+    def applies_to(self, method: Optional[str]) -> bool:
+        return self.config['enabled'] and method in self.config['methods']
+    
+    def delay(self, model: str, method: str) -> float:
+        """Seconds to wait for the first request before hedging: the method's p90 latency"""
+        observed = self.latencies.percentile(model, method, self.config['percentile'])
+        if observed is None:
+            return self.config['default_delay_seconds']
+        return max(observed, self.config['min_delay_seconds'])
+    
+    def _spend(self) -> bool:
+        """Take one hedge from the budget: one, plus a share of all hedgeable calls so far"""
+        with self._lock:
+            if self.hedges >= 1 + self.config['budget_ratio'] * self.calls:
+                self.over_budget += 1
+                return False
+            self.hedges += 1
+            return True
+    
+    def _reserve(self, reserve: Optional[Callable[[], bool]]) -> bool:
+        """Reserve rate limit capacity for a duplicate; without it the hedge is given back to the budget"""
+        if reserve is None or reserve():
+            return True
+        with self._lock:
+            self.hedges -= 1
+            self.rate_limited += 1
+        return False
+    
+    async def run(self, model: str, method: str, send: Callable[[], Awaitable[R]],
+                  reserve: Optional[Callable[[], bool]] = None,
+                  on_discarded: Optional[Callable[[R, Optional[R]], None]] = None) -> R:
+        """Run send(), racing it against a duplicate if it is still pending after the hedge delay.
+        
+        reserve() must take rate limit capacity for the duplicate without waiting and return whether
+        it could; if not, no duplicate is sent. on_discarded(winner, loser) is called with the response
+        that wasn't used, or None if that request was cancelled, so its cost can be accounted for.
+        """
+        with self._lock:
+            self.calls += 1
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        primary = asyncio.ensure_future(send())
+        pending = {primary}
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.delay(model, method))
+            if done or not self._spend() or not self._reserve(reserve):
+                result = await primary
+                self.latencies.observe(model, method, loop.time() - started)
+                return result
+            
+            print(f"[HEDGE] {method}: no response from {model} after {loop.time() - started:.1f}s, sending a duplicate")
+            backup = asyncio.ensure_future(send())
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        self.latencies.observe(model, method, loop.time() - started)
+                        if on_discarded is not None:
+                            other = primary if task is backup else backup
+                            # A request that failed costs nothing; one still running is cancelled below
+                            if other.done() and not other.cancelled() and other.exception() is None:
+                                on_discarded(task.result(), other.result())
+                            elif not other.done():
+                                on_discarded(task.result(), None)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Requests still running are no longer needed, also when the caller itself was cancelled
+            for task in pending:
+                task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hedgeable_calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "over_budget": self.over_budget,
+                "rate_limited": self.rate_limited
+            }
+
+
+_shared_hedger: Optional[Hedger] = None
+_shared_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Optional[Hedger]:
+    """Get the process-wide hedger, or None when hedging is disabled"""
+    global _shared_hedger
+    if not HEDGE_CONFIG['enabled']:
+        return None
+    with _shared_hedger_lock:
+        if _shared_hedger is None:
+            _shared_hedger = Hedger()
+    return _shared_hedger
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from idea_potential.config import (LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS,
+                                   LLM_CACHE_MAX_ENTRIES, STEP_CACHE_ENABLED, STEP_CACHE_PATH,
+                                   STEP_CACHE_TTL_SECONDS, STEP_CACHE_MAX_ENTRIES)
+
+
+class LLMResponseCache:
+    """Disk-backed, content-addressed cache for LLM responses with TTL and LRU eviction"""
+    
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # One connection shared by all threads; access is serialised by self._lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses (last_accessed)")
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(request: Dict[str, Any], schema: Optional[Dict[str, Any]] = None) -> str:
+        """Build a content address from everything that determines the response"""
+        payload = {
+            "model": request.get("model"),
+            "messages": request.get("messages"),
+            "temperature": request.get("temperature"),
+            "response_format": request.get("response_format"),
+            "schema": schema,
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for a key, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        
+        return json.loads(value)
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a value and evict the least recently used entries beyond the size cap"""
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+                (key, encoded, now, now)
+            )
+            if self.max_entries:
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_accessed ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    self.evictions += overflow
+            self._conn.commit()
+    
+    def delete(self, key: str):
+        """Remove a single entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current number of entries"""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "path": self.path,
+        }
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get the process-wide response cache, or None when caching is disabled"""
+    global _shared_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = LLMResponseCache()
+            except sqlite3.Error as e:
+                print(f"LLM response cache unavailable: {e}")
+                return None
+    return _shared_cache
+
+
+_shared_step_cache: Optional[LLMResponseCache] = None
+
+
+def get_step_cache() -> Optional[LLMResponseCache]:
+    """Get the process-wide cache of pipeline step outputs, or None when it is disabled"""
+    global _shared_step_cache
+    if not STEP_CACHE_ENABLED:
+        return None
+    with _shared_cache_lock:
+        if _shared_step_cache is None:
+            try:
+                _shared_step_cache = LLMResponseCache(STEP_CACHE_PATH, STEP_CACHE_TTL_SECONDS, STEP_CACHE_MAX_ENTRIES)
+            except sqlite3.Error as e:
+                print(f"Pipeline step cache unavailable: {e}")
+                return None
+    return _shared_step_cache
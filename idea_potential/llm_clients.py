@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict, Any, Optional
+import httpx
+import openai
+from idea_potential.config import OPENAI_API_KEY, OPENAI_HTTP_CONFIG
+
+# Process-wide client registry. Every agent shares these clients (and their
+# connection pools) instead of opening its own pool and TLS sessions.
+_clients: Dict[str, openai.OpenAI] = {}
+# Async clients are bound to the event loop they were created on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, openai.AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """Check whether the optional 'h2' package needed for HTTP/2 is installed"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _http_client_options(http_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build httpx client options from OPENAI_HTTP_CONFIG"""
+    config = {**OPENAI_HTTP_CONFIG, **(http_config or {})}
+    return {
+        "limits": httpx.Limits(
+            max_connections=config['max_connections'],
+            max_keepalive_connections=config['max_keepalive_connections'],
+            keepalive_expiry=config['keepalive_expiry']
+        ),
+        "http2": bool(config['http2']) and http2_available(),
+        "timeout": httpx.Timeout(config['timeout'], connect=10.0),
+    }
+
+
+def create_openai_client(api_key: str = OPENAI_API_KEY, http_config: Optional[Dict[str, Any]] = None,
+                         **httpx_options) -> openai.OpenAI:
+    """Create a new (unshared) OpenAI client with a tuned connection pool"""
+    http_client = openai.DefaultHttpxClient(**_http_client_options(http_config), **httpx_options)
+    # Retries are handled by BaseAgent with error classification and a per-call deadline
+    return openai.OpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+def create_async_openai_client(api_key: str = OPENAI_API_KEY, http_config: Optional[Dict[str, Any]] = None,
+                               **httpx_options) -> openai.AsyncOpenAI:
+    """Create a new (unshared) AsyncOpenAI client with a tuned connection pool"""
+    http_client = openai.DefaultAsyncHttpxClient(**_http_client_options(http_config), **httpx_options)
+    # Retries are handled by BaseAgent with error classification and a per-call deadline
+    return openai.AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+def get_openai_client(api_key: str = OPENAI_API_KEY) -> openai.OpenAI:
+    """Get the shared OpenAI client for this process"""
+    with _registry_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = create_openai_client(api_key)
+            _clients[api_key] = client
+    return client
+
+
+def get_async_openai_client(api_key: str = OPENAI_API_KEY) -> openai.AsyncOpenAI:
+    """Get the shared AsyncOpenAI client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(api_key)
+        if client is None:
+            client = create_async_openai_client(api_key)
+            loop_clients[api_key] = client
+    return client
+
+
+def close_clients():
+    """Close the shared sync clients (async clients close with their event loop)"""
+    with _registry_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,83 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import openai
+
+# Error kinds worth retrying; everything else fails immediately
+RETRYABLE_ERRORS = {'rate_limit', 'timeout', 'server_error', 'connection'}
+# Error kinds that will fail every call in the run, so they are raised instead of swallowed;
+# 'cancelled' calls belong to a task graph step that has been told to stop
+FATAL_ERRORS = {'auth', 'quota', 'cancelled'}
+
+
+class LLMCallError(Exception):
+    """An LLM call that failed after classification and retries"""
+    
+    def __init__(self, kind: str, message: str, attempts: int = 1):
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+        self.attempts = attempts
+    
+    @property
+    def retryable(self) -> bool:
+        return self.kind in RETRYABLE_ERRORS
+    
+    @property
+    def fatal(self) -> bool:
+        return self.kind in FATAL_ERRORS
+
+
+def classify_error(error: BaseException) -> str:
+    """Classify an exception raised by the OpenAI client"""
+    if isinstance(error, LLMCallError):
+        return error.kind
+    # APITimeoutError subclasses APIConnectionError, so check it first
+    if isinstance(error, (openai.APITimeoutError, TimeoutError)):
+        return 'timeout'
+    if isinstance(error, openai.APIConnectionError):
+        return 'connection'
+    if isinstance(error, openai.RateLimitError):
+        return 'quota' if getattr(error, 'code', None) == 'insufficient_quota' else 'rate_limit'
+    if isinstance(error, (openai.AuthenticationError, openai.PermissionDeniedError)):
+        return 'auth'
+    if isinstance(error, openai.BadRequestError):
+        return 'context_length' if getattr(error, 'code', None) == 'context_length_exceeded' else 'bad_request'
+    if isinstance(error, openai.APIStatusError):
+        if error.status_code >= 500:
+            return 'server_error'
+        if error.status_code in (408, 409):
+            return 'timeout'
+        return 'bad_request'
+    return 'unknown'
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read the server's Retry-After hint from an error response, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
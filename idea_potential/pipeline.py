@@ -1,19 +1,71 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from idea_potential.clarifier_agent import ClarifierAgent
 from idea_potential.research_agent import ResearchAgent
 from idea_potential.validation_agent import ValidationAgent
 from idea_potential.roadmap_agent import RoadmapAgent
 from idea_potential.report_agent import ReportAgent
 from idea_potential.refiner_agent import RefinerAgent
+from idea_potential.suggester_agent import SuggesterAgent
+from idea_potential.llm_cache import get_llm_cache, get_step_cache
+from idea_potential.usage_ledger import UsageLedger
+from common.cassette import get_cassette
+from common.answer_providers import CLARIFICATION, AnswerProvider, Question, get_answer_provider
+from idea_potential.hedging import get_hedger
+from idea_potential.config import (STREAMING_ENABLED, BATCH_CONFIG, PIPELINE_MAX_CONCURRENCY, CHECKPOINT_CONFIG,
+                                   MODEL_CONFIG, CASCADE_CONFIG, STEP_CACHE_VERSION, HEDGE_CONFIG,
+                                   CONTEXT_BUDGETS, COMPLETION_BUDGETS)
+from idea_potential.checkpoints import RunCheckpoint, new_run_id
+from idea_potential.batch import BatchBackend, BatchDeferred, BatchSession
+from idea_potential.task_graph import TaskGraph, cancellation_requested
+import hashlib
 import json
 from datetime import datetime
 
+class PipelineStepFailed(Exception):
+    """A required pipeline step returned an error, so the steps that depend on it can't run"""
+
+# The agent whose model produces each cached step's output
+STEP_AGENTS = {
+    'research': 'research',
+    'validation': 'validation',
+    'financial_models': 'report',
+    'roadmap': 'roadmap',
+    'report': 'report',
+    'refinement': 'refiner'
+}
+
+# Agents whose methods the per-method config (cascade, hedging, context and completion budgets) is keyed by
+AGENT_CLASSES = (ClarifierAgent, SuggesterAgent, ResearchAgent, ValidationAgent, RoadmapAgent, ReportAgent, RefinerAgent)
+
+def check_method_config():
+    """Fail fast on per-method config keys that name no agent method, which would silently never apply"""
+    methods = {name for agent in AGENT_CLASSES for name in vars(agent) if callable(getattr(agent, name))}
+    configured = {
+        'CASCADE_CONFIG methods': CASCADE_CONFIG['methods'],
+        'HEDGE_CONFIG methods': HEDGE_CONFIG['methods'],
+        'CONTEXT_BUDGETS': set(CONTEXT_BUDGETS) - {'default'},
+        'COMPLETION_BUDGETS': COMPLETION_BUDGETS
+    }
+    for setting, keys in configured.items():
+        unknown = sorted(set(keys) - methods)
+        if unknown:
+            raise ValueError(f"{setting} names unknown agent methods: {unknown}")
+
+check_method_config()
+
 class IdeaPotentialPipeline:
     """Main pipeline that orchestrates all agents for idea potential analysis"""
     
-    def __init__(self, use_roadmap_agent: bool = False, use_refiner_agent: bool = False, use_suggester_agent: bool = False):
+    def __init__(self, use_roadmap_agent: bool = False, use_refiner_agent: bool = False, use_suggester_agent: bool = False,
+                 run_id: Optional[str] = None, checkpoint: bool = CHECKPOINT_CONFIG['enabled'],
+                 answers: Optional[AnswerProvider] = None):
+        # Answers the interactive questions instead of input() (default: ANSWER_PROVIDER)
+        self.answers = answers if answers is not None else get_answer_provider()
+        
         # Must-have agents (always initialized)
-        self.clarifier = ClarifierAgent(use_suggester_agent=use_suggester_agent)
+        # Auto-answering picks from the suggester's answers, so it needs the suggester
+        self.clarifier = ClarifierAgent(use_suggester_agent=use_suggester_agent or
+                                        (self.answers is not None and self.answers.uses_suggestions))
         self.research = ResearchAgent()
         self.validator = ValidationAgent()
         self.report_builder = ReportAgent()
@@ -29,10 +81,110 @@ class IdeaPotentialPipeline:
             "use_refiner_agent": use_refiner_agent,
             "use_suggester_agent": use_suggester_agent
         }
+        self.ledger = self.start_usage_ledger()
+        # Finished steps are checkpointed under the run id so the run can be resumed
+        self.run_id = run_id or new_run_id()
+        self.checkpoint = RunCheckpoint(self.run_id) if checkpoint else None
+        self.results_filepath: Optional[str] = None
+        # Step outputs by input fingerprint; off while recording or replaying a cassette so every call goes through it
+        self.step_cache = get_step_cache() if get_cassette() is None else None
+        self.reused_steps: List[str] = []
+        self.recomputed_steps: List[str] = []
+    
+    @classmethod
+    def from_checkpoint(cls, run_id: str) -> Optional['IdeaPotentialPipeline']:
+        """Recreate the pipeline of a checkpointed run with the agents it was started with"""
+        manifest = RunCheckpoint(run_id).manifest()
+        if not manifest:
+            return None
+        return cls(**manifest.get('agent_config', {}), run_id=run_id, checkpoint=True)
+    
+    @classmethod
+    def resume(cls, run_id: str) -> Dict[str, Any]:
+        """Continue a checkpointed run, skipping the steps it already finished"""
+        pipeline = cls.from_checkpoint(run_id)
+        if pipeline is None:
+            return {"error": f"No checkpointed run {run_id} in {CHECKPOINT_CONFIG['dir']}"}
+        manifest = pipeline.checkpoint.manifest()
+        print(f"♻️ Resuming run {run_id} (finished steps: {', '.join(pipeline.checkpoint.completed_steps()) or 'none'})")
+        if manifest.get('mode') == 'interactive':
+            return pipeline.run_interactive_analysis(manifest['idea'])
+        if manifest.get('mode') == 'clarified':
+            pipeline._start_run(manifest['idea'], 'clarified')
+            return pipeline._finish_run(pipeline._analyze_clarified(pipeline.checkpoint.load('clarification')))
+        return pipeline.start_analysis(manifest['idea'])
+    
+    def _start_run(self, idea: str, mode: str):
+        self.reused_steps, self.recomputed_steps = [], []
+        if self.checkpoint is not None:
+            self.checkpoint.update_manifest(idea=idea, mode=mode, agent_config=self.agent_config, status='running')
+            print(f"💾 Run {self.run_id} checkpointed to {self.checkpoint.directory}")
+    
+    def _finish_run(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if self.checkpoint is not None:
+            if "error" in result:
+                self.checkpoint.update_manifest(status='failed', error=result['error'])
+                print(f"♻️ Resume with IdeaPotentialPipeline.resume('{self.run_id}')")
+            else:
+                self.checkpoint.update_manifest(status='completed', error=None, results_path=self.results_filepath)
+        return result
+    
+    def _fingerprint(self, step: str, inputs: Dict[str, Any]) -> str:
+        """Content address of a step's output: the step, everything it reads and the model that writes it"""
+        payload = {
+            "step": step,
+            "version": STEP_CACHE_VERSION,
+            "model": MODEL_CONFIG.get(STEP_AGENTS.get(step)),
+            "cascade_model": CASCADE_CONFIG['model'] if CASCADE_CONFIG['enabled'] else None,
+            "inputs": inputs
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def _restore(self, step: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if step in ('clarification', 'research', 'validation', 'roadmap', 'report', 'refinement'):
+            self.pipeline_data[step] = data
+            self.current_step = step
+        return data
+    
+    def _checkpointed(self, step: str, run: Callable[[], Dict[str, Any]],
+                      inputs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Serve a step from the run's checkpoint, or from the step cache when an earlier run had
+        the same inputs; otherwise run it and store its output in both"""
+        if self.checkpoint is not None:
+            saved = self.checkpoint.load(step)
+            if saved is not None:
+                print(f"♻️ Restored {step} from checkpoint")
+                return self._restore(step, saved)
+        
+        key = self._fingerprint(step, inputs) if inputs is not None and self.step_cache is not None else None
+        cached = self.step_cache.get(key) if key else None
+        if cached is not None:
+            print(f"🧩 Reused {step} (inputs unchanged)")
+            self.reused_steps.append(step)
+            result = self._restore(step, cached["data"])
+        else:
+            result = run()
+            if cancellation_requested():
+                # A step told to stop may return partial output, which mustn't be resumed from or reused
+                return result
+            if key:
+                self.recomputed_steps.append(step)
+                if isinstance(result, dict) and "error" not in result:
+                    self.step_cache.set(key, {"step": step, "data": result})
+        
+        if self.checkpoint is not None and isinstance(result, dict) and "error" not in result:
+            self.checkpoint.save(step, result)
+        return result
         
     def start_analysis(self, idea: str) -> Dict[str, Any]:
         """Start the idea potential analysis pipeline"""
         
+        self.ledger = self.start_usage_ledger()
+        self._start_run(idea, 'standard')
+        return self._finish_run(self._analyze(idea))
+    
+    def _analyze(self, idea: str) -> Dict[str, Any]:
         print("🚀 Starting Idea Potential Analysis Pipeline")
         print(f"📝 Idea: {idea}")
         print("=" * 50)
@@ -50,60 +202,202 @@ class IdeaPotentialPipeline:
         
         # Step 1: Clarify the idea
         print("\n🔍 Step 1: Clarifying the idea...")
-        clarification_result = self.clarify_idea(idea)
+        clarification_result = self._checkpointed('clarification', lambda: self.clarify_idea(idea))
         
         if "error" in clarification_result:
             return {"error": f"Clarification failed: {clarification_result['error']}"}
         
-        # Step 2: Conduct market research
-        print("\n📊 Step 2: Conducting market research...")
-        research_result = self.conduct_research(clarification_result)
-        
-        if "error" in research_result:
-            return {"error": f"Research failed: {research_result['error']}"}
-        
-        # Step 3: Create validation matrix
-        print("\n✅ Step 3: Creating validation matrix...")
-        validation_result = self.create_validation_matrix(clarification_result, research_result)
-        
-        if "error" in validation_result:
-            return {"error": f"Validation failed: {validation_result['error']}"}
-        
-        # Step 4: Build development roadmap (optional)
-        roadmap_result = {"error": "Roadmap agent not enabled"}
-        if self.agent_config['use_roadmap_agent']:
-            print("\n🗓️ Step 4: Building development roadmap...")
-            roadmap_result = self.create_roadmap(clarification_result, validation_result)
-            
-            if "error" in roadmap_result:
-                return {"error": f"Roadmap creation failed: {roadmap_result['error']}"}
-        else:
+        return self._analyze_clarified(clarification_result)
+    
+    def analyze_clarification(self, clarification: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze an already clarified idea, e.g. a what-if variant of an earlier run's clarification.
+        
+        Steps whose inputs match an earlier run are served from the step cache, so editing one
+        answer or toggling the roadmap agent only recomputes the steps downstream of the change.
+        """
+        if self.checkpoint is not None and self.checkpoint.manifest():
+            # Every what-if is a run of its own, not a resume of the previous one
+            self.run_id = new_run_id()
+            self.checkpoint = RunCheckpoint(self.run_id)
+        self.ledger = self.start_usage_ledger()
+        self._start_run(clarification.get('refined_idea', ''), 'clarified')
+        if self.checkpoint is not None:
+            self.checkpoint.save('clarification', clarification)
+        self.pipeline_data['clarification'] = clarification
+        return self._finish_run(self._analyze_clarified(clarification))
+    
+    def _analyze_clarified(self, clarification_result: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.agent_config['use_roadmap_agent']:
             print("\n🗓️ Step 4: Skipping roadmap (agent not enabled)")
-        
-        # Step 5: Generate comprehensive report
-        print("\n📋 Step 5: Generating comprehensive report...")
-        report_result = self.generate_report(clarification_result, research_result, validation_result, roadmap_result)
-        
-        if "error" in report_result:
-            return {"error": f"Report generation failed: {report_result['error']}"}
-        
-        # Step 6: Refine and validate report (optional)
-        refinement_result = {"error": "Refiner agent not enabled"}
-        if self.agent_config['use_refiner_agent']:
-            print("\n🔧 Step 6: Refining and validating report...")
-            refinement_result = self.refine_report(report_result, clarification_result, research_result, validation_result)
-        else:
+        if not self.agent_config['use_refiner_agent']:
             print("\n🔧 Step 6: Skipping refinement (agent not enabled)")
         
+        # Steps 2-6 run as a dependency graph: each step starts as soon as its inputs exist
+        graph = self._analysis_graph(clarification_result)
+        try:
+            results = graph.run()
+        except PipelineStepFailed as e:
+            return {"error": str(e)}
+        
         # Compile final results
         final_result = self.compile_final_results(
-            clarification_result, research_result, validation_result, 
-            roadmap_result, report_result, refinement_result
+            clarification_result, results["research"], results["validation"],
+            results.get("roadmap", {"error": "Roadmap agent not enabled"}), results["report"],
+            results.get("refinement", {"error": "Refiner agent not enabled"})
         )
         
         print("\n✅ Analysis complete!")
+        self.print_critical_path(graph)
+        self.print_cache_stats()
+        self.ledger.print_summary()
         return final_result
     
+    def _step(self, step: str, message: Optional[str], run: Callable[[], Dict[str, Any]],
+              failure: Optional[str] = None, inputs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run one pipeline step; a required step (with a failure label) that errors stops the run"""
+        if message:
+            print(f"\n{message}")
+        result = self._checkpointed(step, run, inputs)
+        if failure is not None and "error" in result:
+            raise PipelineStepFailed(f"{failure} failed: {result['error']}")
+        return result
+    
+    def _analysis_graph(self, clarification: Dict[str, Any], strict: bool = True) -> TaskGraph:
+        """The steps after clarification as a dependency graph of agent calls.
+        
+        Financial models only need the validation data, so they are built alongside the roadmap
+        instead of inside report generation. With strict=False failed steps don't stop the run.
+        """
+        required = (lambda label: label) if strict else (lambda label: None)
+        
+        def step(name: str, message: Optional[str], run: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 failure: Optional[str] = None) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+            # A step's inputs are the clarification and its dependencies' results, so it is
+            # recomputed only when one of them changed since a cached run
+            return lambda results: self._step(name, message, lambda: run(results), failure,
+                                              inputs=dict(results, clarification=clarification))
+        
+        graph = TaskGraph("pipeline", PIPELINE_MAX_CONCURRENCY)
+        graph.add("research", step(
+            "research", "📊 Step 2: Conducting market research...",
+            lambda _: self.conduct_research(clarification), required("Research")))
+        graph.add("validation", step(
+            "validation", "✅ Step 3: Creating validation matrix...",
+            lambda results: self.create_validation_matrix(clarification, results["research"]), required("Validation")),
+            deps=("research",))
+        graph.add("financial_models", step(
+            "financial_models", None, lambda results: self.report_builder.create_financial_models(
+                clarification, results["research"], results["validation"])), deps=("research", "validation"))
+        
+        report_deps = ("research", "validation", "financial_models")
+        if self.agent_config['use_roadmap_agent']:
+            graph.add("roadmap", step(
+                "roadmap", "🗓️ Step 4: Building development roadmap...",
+                lambda results: self.create_roadmap(clarification, results["validation"]), required("Roadmap creation")),
+                deps=("validation",))
+            report_deps += ("roadmap",)
+        graph.add("report", step(
+            "report", "📋 Step 5: Generating comprehensive report...",
+            lambda results: self.generate_report(clarification, results["research"], results["validation"],
+                                                 results.get("roadmap", {"error": "Roadmap agent not enabled"}),
+                                                 results["financial_models"]),
+            required("Report generation")), deps=report_deps)
+        
+        if self.agent_config['use_refiner_agent']:
+            graph.add("refinement", step(
+                "refinement", "🔧 Step 6: Refining and validating report...",
+                lambda results: self.refine_report(results["report"], clarification, results["research"],
+                                                   results["validation"])),
+                deps=("report", "research", "validation"))
+        return graph
+    
+    def print_critical_path(self, graph: TaskGraph):
+        """Print the chain of steps that determined the run's wall clock"""
+        path, seconds = graph.critical_path()
+        if path:
+            print(f"⏱️ Critical path: {' → '.join(path)} ({seconds:.1f}s, "
+                  f"{sum(graph.timings.values()):.1f}s of step time)")
+    
+    @classmethod
+    def run_batch(cls, ideas: List[str], backend: BatchBackend, state_path: str = BATCH_CONFIG['state_path'],
+                  wait: bool = True, poll_interval: float = BATCH_CONFIG['poll_interval_seconds'],
+                  **pipeline_options) -> Dict[str, Any]:
+        """Analyze many ideas non-interactively, submitting their LLM calls as batch jobs.
+        
+        Every round replays each unfinished idea: calls with results are answered from the
+        batch session, and the first call without one is queued and ends that idea's round.
+        All queued calls go out as one job. With wait=False one round is run and the state is
+        saved, so a scheduled job can call this repeatedly until every idea is complete.
+        """
+        session = BatchSession(state_path)
+        
+        while True:
+            session.collect(backend)
+            waiting = 0
+            for idea in ideas:
+                if idea in session.results:
+                    continue
+                # The batch session already persists the run's progress
+                pipeline = cls(**{'checkpoint': False, **pipeline_options})
+                with session.activate():
+                    try:
+                        session.results[idea] = pipeline.start_analysis(idea)
+                    except BatchDeferred as deferred:
+                        print(f"⏳ Waiting for batch results ({deferred})")
+                        waiting += 1
+                        continue
+            
+            session.submit(backend)
+            session.save()
+            if not waiting or not wait or not session.open_jobs():
+                break
+            session.wait(backend, poll_interval)
+        
+        return {
+            "completed": {idea: session.results[idea] for idea in ideas if idea in session.results},
+            "pending": [idea for idea in ideas if idea not in session.results],
+            "open_jobs": session.open_jobs(),
+            "state_path": session.path
+        }
+    
+    def start_usage_ledger(self) -> UsageLedger:
+        """Attach a fresh usage ledger to every agent for a new run"""
+        ledger = UsageLedger()
+        agents = [self.clarifier, self.clarifier.suggester, self.research, self.validator,
+                  self.report_builder, self.roadmap_builder, self.refiner]
+        for agent in agents:
+            if agent is not None:
+                agent.ledger = ledger
+        return ledger
+    
+    def get_usage_summary(self, group_by: tuple = ("agent", "method")) -> Dict[str, Any]:
+        """Get token, latency and cost totals for the current run, broken down per group"""
+        return {
+            "totals": self.ledger.totals(),
+            "breakdown": self.ledger.summarize(group_by)
+        }
+    
+    def print_cache_stats(self):
+        """Print LLM response cache hit/miss counters and step cache reuse"""
+        cache = get_llm_cache()
+        if cache is not None:
+            stats = cache.stats()
+            print(f"🗄️ LLM cache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} entries)")
+        cassette = get_cassette()
+        if cassette is not None:
+            stats = cassette.stats()
+            print(f"📼 LLM cassette ({stats['mode']}): {stats['recorded']} recorded, {stats['hits']} replayed, "
+                  f"{stats['misses']} misses, {stats['simulated_latency_seconds']}s simulated latency")
+        if self.reused_steps or self.recomputed_steps:
+            print(f"🧩 Step cache: {len(self.reused_steps)} reused, {len(self.recomputed_steps)} recomputed"
+                  + (f" ({', '.join(self.recomputed_steps)})" if self.recomputed_steps else ""))
+        hedger = get_hedger()
+        if hedger is not None:
+            stats = hedger.stats()
+            print(f"⏱️ Hedged requests: {stats['hedges']} of {stats['hedgeable_calls']} calls hedged, "
+                  f"{stats['hedge_wins']} won by the duplicate, {stats['over_budget']} skipped over budget, "
+                  f"{stats['rate_limited']} skipped at the rate limit")
+    
     def clarify_idea(self, idea: str) -> Dict[str, Any]:
         """Step 1: Clarify the idea through targeted questions"""
         
@@ -168,12 +462,15 @@ class IdeaPotentialPipeline:
         return roadmap_result
     
     def generate_report(self, clarification_data: Dict[str, Any], research_data: Dict[str, Any], 
-                       validation_data: Dict[str, Any], roadmap_data: Dict[str, Any]) -> Dict[str, Any]:
+                       validation_data: Dict[str, Any], roadmap_data: Dict[str, Any],
+                       financial_models: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Step 5: Generate comprehensive analysis report (JSON only)"""
         
         # Generate comprehensive report
         report_result = self.report_builder.generate_comprehensive_report(
-            clarification_data, research_data, validation_data, roadmap_data
+            clarification_data, research_data, validation_data, roadmap_data,
+            on_field=self._report_progress if STREAMING_ENABLED else None,
+            financial_models=financial_models
         )
         
         if "error" in report_result:
@@ -188,6 +485,11 @@ class IdeaPotentialPipeline:
         
         return self.pipeline_data['report']
     
+    def _report_progress(self, field: str, value: Any):
+        """Show report fields as they finish streaming"""
+        if '.' not in field:
+            print(f"  • {field.replace('_', ' ').capitalize()} ready")
+    
     def refine_report(self, report_data: Dict[str, Any], clarification_data: Dict[str, Any], 
                      research_data: Dict[str, Any], validation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Step 6: Refine and validate the final report"""
@@ -246,6 +548,7 @@ class IdeaPotentialPipeline:
                 "final_recommendation": "Unknown"
             },
             "report_filepath": "JSON report only",
+            "usage_summary": self.ledger.totals(),
             "detailed_data": {
                 "clarification": clarification_data,
                 "research": research_data,
@@ -312,8 +615,8 @@ class IdeaPotentialPipeline:
     def save_final_results(self, final_results: Dict[str, Any]) -> str:
         """Save final results to a JSON file"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"idea_analysis_results_{timestamp}.json"
+        # The run id keeps runs finishing in the same second from overwriting each other
+        filename = f"idea_analysis_results_{self.run_id}.json"
         
         # Create reports directory if it doesn't exist
         import os
@@ -325,6 +628,11 @@ class IdeaPotentialPipeline:
                 json.dump(final_results, f, indent=2, ensure_ascii=False)
             
             print(f"📁 Final results saved to: {filepath}")
+            self.results_filepath = filepath
+            
+            usage_filepath = self.ledger.save(filepath.replace('.json', '_usage.json'))
+            if usage_filepath:
+                print(f"📁 Usage ledger saved to: {usage_filepath}")
             return filepath
             
         except Exception as e:
@@ -348,9 +656,12 @@ class IdeaPotentialPipeline:
     def run_interactive_analysis(self, idea: str) -> Dict[str, Any]:
         """Run analysis with interactive clarification questions"""
         
-        print("🎯 Idea Potential Analysis System - Interactive Mode")
-        print("=" * 50)
-        print(f"📝 Idea: {idea}")
+        self.ledger = self.start_usage_ledger()
+        self._start_run(idea, 'interactive')
+        return self._finish_run(self._analyze_interactively(idea))
+    
+    def _clarify_interactively(self, idea: str) -> Dict[str, Any]:
+        """Ask clarifying questions one by one until the idea is clear, returning the clarification summary"""
         
         # Step 1: Clarify the idea
         print("\n🔍 Step 1: Clarifying your idea...")
@@ -418,33 +729,18 @@ class IdeaPotentialPipeline:
                     print(f"      💭 {suggestion['reasoning']}")
                 print(f"   {len(suggestions) + 1}. Type your own answer")
             
-            # Get user input
-            while True:
-                user_input = input("Your choice (number or your answer): ").strip()
-                
-                # Check if user selected a suggestion
-                if user_input.isdigit() and suggestions:
-                    choice = int(user_input)
-                    if 1 <= choice <= len(suggestions):
-                        answer = suggestions[choice - 1]['text']
-                        print(f"✅ Selected: {answer}")
-                        break
-                    elif choice == len(suggestions) + 1:
-                        # User wants to type their own answer
-                        answer = input("Your answer: ").strip()
-                        if answer:
-                            break
-                        else:
-                            print("⚠️ Please provide an answer")
-                    else:
-                        print(f"⚠️ Please enter a number between 1 and {len(suggestions) + 1}")
-                else:
-                    # User typed their own answer
-                    answer = user_input
-                    if answer:
-                        break
-                    else:
-                        print("⚠️ Please provide an answer")
+            if self.answers is None:
+                answer = self._ask_user(suggestions)
+            else:
+                answer = self.answers.answer(Question(
+                    question_data['question'], CLARIFICATION, [suggestion['text'] for suggestion in suggestions],
+                    {"idea": idea, "category": question_data['category'], "reason": question_data['reason']},
+                    number=question_count
+                ))
+                if answer is None:
+                    print("\n🔄 No more answers, generating final summary...")
+                    final_clarification = self.clarifier.generate_clarification_summary()
+                    break
             
             if not answer:
                 print("⚠️ No answer provided, continuing...")
@@ -464,10 +760,52 @@ class IdeaPotentialPipeline:
         if "error" in final_clarification:
             return {"error": f"Failed to generate clarification summary: {final_clarification['error']}"}
         
+        print(f"📊 Questions asked: {len(self.clarifier.questions_asked)}")
+        return final_clarification
+    
+    def _ask_user(self, suggestions: List[Dict[str, Any]]) -> str:
+        """Ask at the terminal for a suggestion's number or an own answer"""
+        while True:
+            user_input = input("Your choice (number or your answer): ").strip()
+                
+            # Check if user selected a suggestion
+            if user_input.isdigit() and suggestions:
+                choice = int(user_input)
+                if 1 <= choice <= len(suggestions):
+                    answer = suggestions[choice - 1]['text']
+                    print(f"✅ Selected: {answer}")
+                    break
+                elif choice == len(suggestions) + 1:
+                    # User wants to type their own answer
+                    answer = input("Your answer: ").strip()
+                    if answer:
+                        break
+                    else:
+                        print("⚠️ Please provide an answer")
+                else:
+                    print(f"⚠️ Please enter a number between 1 and {len(suggestions) + 1}")
+            else:
+                # User typed their own answer
+                answer = user_input
+                if answer:
+                    break
+                else:
+                    print("⚠️ Please provide an answer")
+        return answer
+    
+    def _analyze_interactively(self, idea: str) -> Dict[str, Any]:
+        print("🎯 Idea Potential Analysis System - Interactive Mode")
+        print("=" * 50)
+        print(f"📝 Idea: {idea}")
+        
+        # A resumed run keeps the answers given before it stopped
+        final_clarification = self._checkpointed('clarification', lambda: self._clarify_interactively(idea))
+        if "error" in final_clarification:
+            return final_clarification
+        
         print(f"\n✅ Clarification complete!")
         print(f"📝 Refined Idea: {final_clarification.get('refined_idea', 'Unknown')}")
         print(f"🎯 Target Market: {final_clarification.get('target_market', 'Unknown')}")
-        print(f"📊 Questions asked: {len(self.clarifier.questions_asked)}")
         
         # Continue with full analysis
         print("\n🚀 Starting full analysis...")
@@ -476,24 +814,22 @@ class IdeaPotentialPipeline:
             # Update pipeline data with clarification
             self.pipeline_data['clarification'] = final_clarification
             
-            # Continue with remaining steps
-            research_result = self.conduct_research(final_clarification)
-            validation_result = self.create_validation_matrix(final_clarification, research_result)
+            # Continue with remaining steps as a dependency graph
+            graph = self._analysis_graph(final_clarification, strict=False)
+            results = graph.run()
+            research_result = results["research"]
+            validation_result = results["validation"]
+            report_result = results["report"]
             
-            roadmap_result = {"error": "Roadmap agent not enabled"}
-            if self.agent_config['use_roadmap_agent']:
-                roadmap_result = self.create_roadmap(final_clarification, validation_result)
-                if "error" in roadmap_result:
-                    print(f"❌ Roadmap creation failed: {roadmap_result['error']}")
-                    roadmap_result = {"error": "Roadmap agent failed to generate report"}
+            roadmap_result = results.get("roadmap", {"error": "Roadmap agent not enabled"})
+            if self.agent_config['use_roadmap_agent'] and "error" in roadmap_result:
+                print(f"❌ Roadmap creation failed: {roadmap_result['error']}")
+                roadmap_result = {"error": "Roadmap agent failed to generate report"}
             
-            report_result = self.generate_report(final_clarification, research_result, validation_result, roadmap_result)
-            refinement_result = {"error": "Refiner agent not enabled"}
-            if self.agent_config['use_refiner_agent']:
-                refinement_result = self.refine_report(report_result, final_clarification, research_result, validation_result)
-                if "error" in refinement_result:
-                    print(f"❌ Refinement failed: {refinement_result['error']}")
-                    refinement_result = {"error": "Refiner agent failed to refine report"}
+            refinement_result = results.get("refinement", {"error": "Refiner agent not enabled"})
+            if self.agent_config['use_refiner_agent'] and "error" in refinement_result:
+                print(f"❌ Refinement failed: {refinement_result['error']}")
+                refinement_result = {"error": "Refiner agent failed to refine report"}
             
             # Compile final results
             final_result = self.compile_final_results(
@@ -503,6 +839,9 @@ class IdeaPotentialPipeline:
             
             print("\n✅ Analysis complete!")
             print(f"📁 Report saved to: {final_result.get('report_filepath', 'Not saved')}")
+            self.print_critical_path(graph)
+            self.print_cache_stats()
+            self.ledger.print_summary()
             
             return final_result
             
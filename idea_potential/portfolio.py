@@ -0,0 +1,151 @@
+import contextlib
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+try:
+    from tqdm import tqdm
+except ImportError:  # tqdm is optional; progress falls back to one line per finished idea
+    tqdm = None
+
+from idea_potential.config import PORTFOLIO_CONFIG
+from idea_potential.pipeline import IdeaPotentialPipeline
+
+
+def idea_id(idea: str) -> str:
+    """Stable id for an idea that wasn't given one, so a rerun recognises it"""
+    return hashlib.sha256(idea.strip().encode("utf-8")).hexdigest()[:12]
+
+
+def load_ideas(path: str) -> List[Dict[str, str]]:
+    """Read ideas from a JSONL file (objects with an "idea" field, or strings) or a CSV file with an "idea" column.
+    
+    An optional "id" field or column names the idea in the output; ideas are deduplicated by id.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    
+    ideas: Dict[str, Dict[str, str]] = {}
+    for number, row in enumerate(rows, 1):
+        if isinstance(row, str):
+            row = {"idea": row}
+        idea = str(row.get("idea") or "").strip()
+        if not idea:
+            print(f"Skipping row {number} of {path}: no idea")
+            continue
+        key = str(row.get("id") or idea_id(idea))
+        ideas.setdefault(key, {"id": key, "idea": idea})
+    return list(ideas.values())
+
+
+def load_results(output_path: str) -> Dict[str, Dict[str, Any]]:
+    """The latest output line of every idea in a results file; a line cut short by a crash is ignored"""
+    results: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(output_path):
+        return results
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "id" in entry:
+                results[entry["id"]] = entry
+    return results
+
+
+def analyze_idea(entry: Dict[str, str], previous: Optional[Dict[str, Any]] = None,
+                 **pipeline_options) -> Dict[str, Any]:
+    """Analyze one idea non-interactively and describe the outcome as an output line.
+    
+    An idea that failed in an earlier run continues from that run's checkpoint.
+    """
+    started = time.monotonic()
+    pipeline = None
+    if previous and previous.get("run_id"):
+        pipeline = IdeaPotentialPipeline.from_checkpoint(previous["run_id"])
+    try:
+        if pipeline is None:
+            pipeline = IdeaPotentialPipeline(**pipeline_options)
+        # start_analysis saves the results file and usage ledger of a completed run
+        result = pipeline.start_analysis(entry["idea"])
+    except Exception as e:
+        result = {"error": f"Analysis failed: {e}"}
+    
+    line = {
+        "id": entry["id"],
+        "idea": entry["idea"],
+        "run_id": pipeline.run_id if pipeline is not None else None,
+        "status": "failed" if "error" in result else "completed",
+        "finished_at": datetime.now().isoformat(),
+        "seconds": round(time.monotonic() - started, 1)
+    }
+    if "error" in result:
+        line["error"] = result["error"]
+    else:
+        # The full step data is in the results file; the line keeps the summaries
+        line["results_path"] = pipeline.results_filepath
+        line["result"] = {key: value for key, value in result.items() if key != "detailed_data"}
+    return line
+
+
+def run_portfolio(ideas: List[Dict[str, str]], output_path: str = PORTFOLIO_CONFIG['output_path'],
+                  max_concurrency: int = PORTFOLIO_CONFIG['max_concurrency'], log_path: Optional[str] = None,
+                  **pipeline_options) -> Dict[str, Any]:
+    """Analyze many ideas concurrently, appending one JSONL line per idea to output_path as it finishes.
+    
+    Ideas already completed in output_path are skipped, so an interrupted portfolio is resumed by
+    running it again. All pipelines share the process-wide HTTP clients, rate limiter and caches.
+    With a log_path the agents' output goes there instead of interleaving with the progress bar.
+    """
+    previous = load_results(output_path)
+    todo = [entry for entry in ideas if previous.get(entry["id"], {}).get("status") != "completed"]
+    skipped = len(ideas) - len(todo)
+    summary = {"completed": 0, "failed": 0, "skipped": skipped, "output_path": output_path}
+    
+    progress_stream = sys.stderr
+    print(f"📦 {len(ideas)} ideas: {skipped} already completed, {len(todo)} to analyze "
+          f"({max_concurrency} at a time)", file=progress_stream)
+    if not todo:
+        return summary
+    
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    progress = tqdm(total=len(todo), unit="idea", file=progress_stream) if tqdm is not None else None
+    
+    with contextlib.ExitStack() as stack:
+        output = stack.enter_context(open(output_path, "a", encoding="utf-8"))
+        if log_path:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(log_path, "a", encoding="utf-8"))))
+        executor = stack.enter_context(ThreadPoolExecutor(max_workers=max(1, max_concurrency),
+                                                          thread_name_prefix="portfolio"))
+        futures = [executor.submit(analyze_idea, entry, previous.get(entry["id"]), **pipeline_options)
+                   for entry in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            line = future.result()
+            # Flushed per idea so a crash loses at most the ideas still running
+            output.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            os.fsync(output.fileno())
+            summary[line["status"]] += 1
+            if progress is not None:
+                progress.set_postfix(failed=summary["failed"])
+                progress.update()
+            else:
+                print(f"[{done}/{len(todo)}] {line['id']}: {line['status']} ({line['seconds']}s)", file=progress_stream)
+    
+    if progress is not None:
+        progress.close()
+    print(f"✅ Portfolio done: {summary['completed']} completed, {summary['failed']} failed, "
+          f"{skipped} skipped; results in {output_path}", file=progress_stream)
+    return summary
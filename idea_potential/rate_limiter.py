@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from idea_potential.config import RATE_LIMIT_ENABLED, RATE_LIMITS
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `capacity` units per minute"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float):
+        """Add the capacity accumulated since the last update"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)"""
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0.0) / self.refill_per_second
+    
+    def take(self, amount: float) -> float:
+        """Remove units from the bucket, at most a full bucket, returning the units removed
+        (the level may go negative when settling)"""
+        taken = min(amount, self.capacity)
+        self.level -= taken
+        return taken
+    
+    def give_back(self, amount: float):
+        """Return unused units to the bucket"""
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ModelRateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one model"""
+    
+    def __init__(self, model: str, rpm: int, tpm: int):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        # Plain lock rather than asyncio.Lock so the limiter works across event loops
+        self._lock = threading.Lock()
+    
+    async def acquire(self, estimated_tokens: int) -> Tuple[float, float]:
+        """Wait until a request of the estimated size fits, returning the time spent waiting and the
+        tokens reserved, which are less than the estimate when it exceeds the bucket"""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    self.requests.take(1)
+                    reserved_tokens = self.tokens.take(estimated_tokens)
+                    return time.monotonic() - started, reserved_tokens
+            await asyncio.sleep(min(wait, 5.0))
+    
+    def try_acquire(self, estimated_tokens: int) -> Optional[float]:
+        """Reserve capacity for a request only if it fits right now, returning the tokens reserved or None"""
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            if self.requests.wait_time(1) > 0 or self.tokens.wait_time(estimated_tokens) > 0:
+                return None
+            self.requests.take(1)
+            return self.tokens.take(estimated_tokens)
+    
+    def settle(self, reserved_tokens: float, actual_tokens: int):
+        """Correct the token bucket once the real usage of a request is known.
+        
+        Works from the tokens acquire() reserved, not the estimate, so a capped reservation
+        isn't over-credited.
+        """
+        with self._lock:
+            self.tokens.refill(time.monotonic())
+            if actual_tokens < reserved_tokens:
+                self.tokens.give_back(reserved_tokens - actual_tokens)
+            else:
+                self.tokens.take(actual_tokens - reserved_tokens)
+    
+    def status(self) -> Dict[str, Any]:
+        """Get the remaining request and token capacity"""
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "model": self.model,
+                "requests_available": int(self.requests.level),
+                "tokens_available": int(self.tokens.level)
+            }
+
+
+class RateLimiter:
+    """Process-wide registry of per-model rate limiters"""
+    
+    def __init__(self, limits: Dict[str, Dict[str, int]] = None):
+        self.limits = RATE_LIMITS if limits is None else limits
+        self._limiters: Dict[str, ModelRateLimiter] = {}
+        self._lock = threading.Lock()
+    
+    def for_model(self, model: str) -> Optional[ModelRateLimiter]:
+        """Get the limiter for a model, or None if the model has no configured limits"""
+        name = model
+        if name not in self.limits:
+            # Dated snapshots (e.g. gpt-4o-2024-08-06) share their base model's limits
+            matches = [limit_name for limit_name in self.limits if model.startswith(limit_name)]
+            if not matches:
+                return None
+            name = max(matches, key=len)
+        
+        with self._lock:
+            if name not in self._limiters:
+                config = self.limits[name]
+                self._limiters[name] = ModelRateLimiter(name, config['rpm'], config['tpm'])
+            return self._limiters[name]
+    
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Get the remaining capacity of every active limiter"""
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.model: limiter.status() for limiter in limiters}
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Get the process-wide rate limiter, or None when rate limiting is disabled"""
+    global _shared_limiter
+    if not RATE_LIMIT_ENABLED:
+        return None
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+    return _shared_limiter
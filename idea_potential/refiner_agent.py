@@ -1,4 +1,7 @@
 from idea_potential.base_agent import BaseAgent
+from idea_potential.context_builder import LOW, MEDIUM, HIGH
+from idea_potential.config import REFINER_CHECK_TIMEOUT_SECONDS
+from idea_potential.task_graph import TaskGraph
 from typing import Dict, List, Any
 from idea_potential.structured_outputs import RefinedIdeaResponse, RefinementSuggestion, ValidationResponse, ValidationIssue
 
@@ -13,25 +16,20 @@ class RefinerAgent(BaseAgent):
                                    research_data: Dict[str, Any], validation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate the authenticity and consistency of the report"""
         
-        prompt = f"""
-        Validate the authenticity and consistency of this business idea analysis report:
-
-        ORIGINAL IDEA: {idea_data.get('refined_idea', 'Unknown')}
-        TARGET MARKET: {idea_data.get('target_market', 'Unknown')}
-
-        RESEARCH DATA:
-        - Market Insights: {research_data.get('insights', {})}
-        - Posts Analyzed: {research_data.get('insights', {}).get('posts_analyzed', 0)}
-
-        VALIDATION DATA:
-        - Validation Summary: {validation_data.get('validation_summary', {})}
-        - SWOT Analysis: {validation_data.get('swot_analysis', {})}
-
-        REPORT DATA:
-        - Executive Summary: {report_data.get('executive_summary', {})}
-        - Market Analysis: {report_data.get('market_analysis', {})}
-        - Technical Analysis: {report_data.get('technical_analysis', {})}
-        - Financial Analysis: {report_data.get('financial_analysis', {})}
+        insights = research_data.get('insights', {})
+        context = self.build_context(
+            market_insights=(insights, MEDIUM),
+            validation_summary=(validation_data.get('validation_summary', {}), HIGH),
+            swot_analysis=(validation_data.get('swot_analysis', {}), LOW),
+            executive_summary=(report_data.get('executive_summary', {}), HIGH),
+            market_analysis=(report_data.get('market_analysis', {}), MEDIUM),
+            technical_analysis=(report_data.get('technical_analysis', {}), MEDIUM),
+            financial_analysis=(report_data.get('financial_analysis', {}), MEDIUM),
+            method='validate_report_authenticity'
+        )
+        
+        instructions = """
+        Validate the authenticity and consistency of this business idea analysis report.
 
         Check for:
         1. Consistency between research findings and report conclusions
@@ -40,134 +38,68 @@ class RefinerAgent(BaseAgent):
         4. Completeness of analysis
         5. Accuracy of data interpretation
 
-        Provide validation results in the following JSON format:
-        {{
-          "authenticity_score": <0-10 integer>,
-          "consistency_check": "<detailed assessment of consistency>",
-          "data_quality": "<assessment of data quality>",
-          "identified_issues": [
-            {{
-              "issue": "<description of issue>",
-              "severity": "<high/medium/low>",
-              "recommendation": "<recommendation to fix>"
-            }}
-          ],
-          "report_strengths": ["<strength1>", "<strength2>", ...],
-          "validation_recommendation": "<accept/revise/reject>",
-          "overall_assessment": "<overall assessment of report quality>"
-        }}
+        Rate each issue's severity as high, medium or low, and make the validation_recommendation accept, revise or reject.
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert quality assurance specialist and business analyst with deep experience in validating business reports and ensuring data integrity."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        # Try structured output first
-        result = self.call_llm_structured(messages, ValidationResponse, temperature=0.3)
-        
-        if result:
-            # Convert Pydantic model to dict for compatibility
-            validation_data = result.dict()
-            self.log_activity("Validated report authenticity")
-            return validation_data
-        
-        # Fallback to regular LLM call
-        response = self.call_llm(messages, temperature=0.3)
-        result = self.parse_json_response(response)
-        
-        if result:
-            # Fix common refiner issues in the result
-            result = self._fix_refiner_data(result)
+        prompt = f"""
+        ORIGINAL IDEA: {idea_data.get('refined_idea', 'Unknown')}
+        TARGET MARKET: {idea_data.get('target_market', 'Unknown')}
+
+        RESEARCH DATA:
+        - Market Insights: {context['market_insights']}
+        - Posts Analyzed: {insights.get('posts_analyzed', 0)}
+
+        VALIDATION DATA:
+        - Validation Summary: {context['validation_summary']}
+        - SWOT Analysis: {context['swot_analysis']}
+
+        REPORT DATA:
+        - Executive Summary: {context['executive_summary']}
+        - Market Analysis: {context['market_analysis']}
+        - Technical Analysis: {context['technical_analysis']}
+        - Financial Analysis: {context['financial_analysis']}
+        """
         
-        if result:
-            self.log_activity("Validated report authenticity")
-            # Log the authenticity validation report
-            print(f"\n🔍 AUTHENTICITY VALIDATION REPORT:")
-            if 'authenticity_score' in result:
-                print(f"   📊 Authenticity Score: {result['authenticity_score']}/10")
-            if 'validation_recommendation' in result:
-                print(f"   ✅ Recommendation: {result['validation_recommendation']}")
-            if 'identified_issues' in result:
-                print(f"   ⚠️  Issues Found: {len(result['identified_issues'])}")
-                for i, issue in enumerate(result['identified_issues'], 1):
-                    print(f"      {i}. {issue}")
-            if 'consistency_check' in result:
-                print(f"   🔄 Consistency: {result['consistency_check']}")
-            if 'data_quality' in result:
-                print(f"   📈 Data Quality: {result['data_quality']}")
-            print()
-        
-        return result or {"error": "Failed to validate report authenticity"}
-    
-    def _fix_refiner_data(self, refiner_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Fix common refiner data issues"""
-        try:
-            # Handle case where the result is nested under validation keys
-            if 'validation_matrix' in refiner_data:
-                refiner_data = refiner_data['validation_matrix']
-            
-            # Ensure required fields exist for ValidationResponse
-            if 'authenticity_score' not in refiner_data:
-                refiner_data['authenticity_score'] = 5  # Default medium score
-            
-            if 'consistency_check' not in refiner_data:
-                refiner_data['consistency_check'] = "Consistency assessment needed"
-            
-            if 'data_quality' not in refiner_data:
-                refiner_data['data_quality'] = "Data quality assessment needed"
-            
-            if 'identified_issues' not in refiner_data:
-                refiner_data['identified_issues'] = []
-            elif isinstance(refiner_data['identified_issues'], list):
-                # Ensure each issue has the required structure
-                for i, issue in enumerate(refiner_data['identified_issues']):
-                    if isinstance(issue, dict):
-                        if 'issue' not in issue:
-                            issue['issue'] = f"Issue {i+1}"
-                        if 'severity' not in issue:
-                            issue['severity'] = 'medium'
-                        if 'recommendation' not in issue:
-                            issue['recommendation'] = "Recommendation needed"
-                    else:
-                        # Convert string issue to proper structure
-                        refiner_data['identified_issues'][i] = {
-                            'issue': str(issue),
-                            'severity': 'medium',
-                            'recommendation': 'Investigate further'
-                        }
-            
-            if 'report_strengths' not in refiner_data:
-                refiner_data['report_strengths'] = []
-            
-            if 'validation_recommendation' not in refiner_data:
-                refiner_data['validation_recommendation'] = 'revise'
-            
-            if 'overall_assessment' not in refiner_data:
-                refiner_data['overall_assessment'] = "Overall assessment needed"
-            
-            return refiner_data
-        except Exception as e:
-            print(f"Error fixing refiner data: {e}")
-            return refiner_data
+        messages = self.prompt_messages("You are an expert quality assurance specialist and business analyst with deep experience in validating business reports and ensuring data integrity.", instructions, prompt)
+        
+        # Strict structured output guarantees the response shape, so no unstructured retry is needed
+        result = self.call_llm_structured(messages, ValidationResponse, temperature=0.3, method='validate_report_authenticity')
+        
+        if not result:
+            return {"error": "Failed to validate report authenticity"}
+        
+        # Convert Pydantic model to dict for compatibility, noting any locally repaired fields
+        result = self.structured_data(result)
+        self.log_activity("Validated report authenticity")
+        # Log the authenticity validation report
+        print(f"\n🔍 AUTHENTICITY VALIDATION REPORT:")
+        print(f"   📊 Authenticity Score: {result['authenticity_score']}/10")
+        print(f"   ✅ Recommendation: {result['validation_recommendation']}")
+        print(f"   ⚠️  Issues Found: {len(result['identified_issues'])}")
+        for i, issue in enumerate(result['identified_issues'], 1):
+            print(f"      {i}. {issue}")
+        print(f"   🔄 Consistency: {result['consistency_check']}")
+        print(f"   📈 Data Quality: {result['data_quality']}")
+        print()
+        
+        return result
     
     def cross_check_claims(self, report_data: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cross-check specific claims in the report against research data"""
         
-        prompt = f"""
-        Cross-check specific claims in the report against the research data:
-
-        RESEARCH DATA:
-        - Market Validation: {research_data.get('insights', {}).get('market_validation', 'Unknown')}
-        - Pain Points: {research_data.get('insights', {}).get('pain_points_identified', [])}
-        - Competition: {research_data.get('insights', {}).get('competition_analysis', 'Unknown')}
-        - Customer Sentiment: {research_data.get('insights', {}).get('customer_sentiment', 'Unknown')}
-        - Posts Analyzed: {research_data.get('insights', {}).get('posts_analyzed', 0)}
-
-        REPORT CLAIMS:
-        - Market Analysis: {report_data.get('market_analysis', {})}
-        - Risk Assessment: {report_data.get('risk_assessment', {})}
-        - Strategic Recommendations: {report_data.get('strategic_recommendations', {})}
+        insights = research_data.get('insights', {})
+        context = self.build_context(
+            pain_points=(insights.get('pain_points_identified', []), HIGH),
+            competition_analysis=(insights.get('competition_analysis', 'Unknown'), MEDIUM),
+            customer_sentiment=(insights.get('customer_sentiment', 'Unknown'), LOW),
+            market_analysis=(report_data.get('market_analysis', {}), HIGH),
+            risk_assessment=(report_data.get('risk_assessment', {}), MEDIUM),
+            strategic_recommendations=(report_data.get('strategic_recommendations', {}), MEDIUM),
+            method='cross_check_claims'
+        )
+        
+        instructions = """
+        Cross-check specific claims in the report against the research data.
 
         Check each claim for:
         1. Evidence support from research data
@@ -176,35 +108,46 @@ class RefinerAgent(BaseAgent):
         4. Accurate interpretation of data
 
         Provide cross-check results in JSON format:
-        {{
-            "market_claims_validation": {{
+        {
+            "market_claims_validation": {
                 "supported_claims": ["List of well-supported claims"],
                 "questionable_claims": ["List of claims needing verification"],
                 "unsupported_claims": ["List of claims without evidence"],
                 "confidence_assessment": "high|medium|low"
-            }},
-            "risk_assessment_validation": {{
+            },
+            "risk_assessment_validation": {
                 "validated_risks": ["List of validated risks"],
                 "overstated_risks": ["List of overstated risks"],
                 "missing_risks": ["List of risks not mentioned"],
                 "risk_confidence": "high|medium|low"
-            }},
-            "recommendation_validation": {{
+            },
+            "recommendation_validation": {
                 "well_founded_recommendations": ["List of well-founded recommendations"],
                 "questionable_recommendations": ["List of questionable recommendations"],
                 "missing_recommendations": ["List of missing recommendations"],
                 "recommendation_confidence": "high|medium|low"
-            }},
+            },
             "overall_validation_score": "0-10 rating"
-        }}
+        }
+        """
+        
+        prompt = f"""
+        RESEARCH DATA:
+        - Market Validation: {insights.get('market_validation', 'Unknown')}
+        - Pain Points: {context['pain_points']}
+        - Competition: {context['competition_analysis']}
+        - Customer Sentiment: {context['customer_sentiment']}
+        - Posts Analyzed: {insights.get('posts_analyzed', 0)}
+
+        REPORT CLAIMS:
+        - Market Analysis: {context['market_analysis']}
+        - Risk Assessment: {context['risk_assessment']}
+        - Strategic Recommendations: {context['strategic_recommendations']}
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert at fact-checking and validating business claims against research data."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self.prompt_messages("You are an expert at fact-checking and validating business claims against research data.", instructions, prompt)
         
-        response = self.call_llm(messages, temperature=0.3)
+        response = self.call_llm(messages, temperature=0.3, method='cross_check_claims')
         result = self.parse_json_response(response)
         
         if result:
@@ -215,20 +158,19 @@ class RefinerAgent(BaseAgent):
     def identify_gaps_and_improvements(self, report_data: Dict[str, Any], idea_data: Dict[str, Any]) -> Dict[str, Any]:
         """Identify gaps and areas for improvement in the report"""
         
-        prompt = f"""
-        Identify gaps and areas for improvement in this business idea analysis report:
-
-        IDEA: {idea_data.get('refined_idea', 'Unknown')}
-        TARGET MARKET: {idea_data.get('target_market', 'Unknown')}
-
-        REPORT SECTIONS:
-        - Executive Summary: {report_data.get('executive_summary', {})}
-        - Market Analysis: {report_data.get('market_analysis', {})}
-        - Technical Analysis: {report_data.get('technical_analysis', {})}
-        - Financial Analysis: {report_data.get('financial_analysis', {})}
-        - Risk Assessment: {report_data.get('risk_assessment', {})}
-        - Strategic Recommendations: {report_data.get('strategic_recommendations', {})}
-        - Implementation Roadmap: {report_data.get('implementation_roadmap', {})}
+        context = self.build_context(
+            executive_summary=(report_data.get('executive_summary', {}), HIGH),
+            market_analysis=(report_data.get('market_analysis', {}), MEDIUM),
+            technical_analysis=(report_data.get('technical_analysis', {}), MEDIUM),
+            financial_analysis=(report_data.get('financial_analysis', {}), MEDIUM),
+            risk_assessment=(report_data.get('risk_assessment', {}), MEDIUM),
+            strategic_recommendations=(report_data.get('strategic_recommendations', {}), MEDIUM),
+            implementation_roadmap=(report_data.get('implementation_roadmap', {}), LOW),
+            method='identify_gaps_and_improvements'
+        )
+        
+        instructions = """
+        Identify gaps and areas for improvement in this business idea analysis report.
 
         Identify:
         1. Missing critical information
@@ -238,45 +180,56 @@ class RefinerAgent(BaseAgent):
         5. Missing alternative scenarios
 
         Provide gap analysis in JSON format:
-        {{
+        {
             "critical_gaps": [
-                {{
+                {
                     "gap": "Description of critical gap",
                     "impact": "high|medium|low",
                     "recommendation": "How to address"
-                }}
+                }
             ],
             "missing_details": [
-                {{
+                {
                     "area": "Area needing more detail",
                     "importance": "high|medium|low",
                     "suggested_content": "What to add"
-                }}
+                }
             ],
             "inconsistencies": [
-                {{
+                {
                     "inconsistency": "Description of inconsistency",
                     "severity": "high|medium|low",
                     "resolution": "How to resolve"
-                }}
+                }
             ],
             "unrealistic_assumptions": [
-                {{
+                {
                     "assumption": "Description of unrealistic assumption",
                     "reality_check": "What the reality likely is",
                     "recommendation": "How to address"
-                }}
+                }
             ],
             "improvement_priorities": ["List of improvement priorities"]
-        }}
+        }
+        """
+        
+        prompt = f"""
+        IDEA: {idea_data.get('refined_idea', 'Unknown')}
+        TARGET MARKET: {idea_data.get('target_market', 'Unknown')}
+
+        REPORT SECTIONS:
+        - Executive Summary: {context['executive_summary']}
+        - Market Analysis: {context['market_analysis']}
+        - Technical Analysis: {context['technical_analysis']}
+        - Financial Analysis: {context['financial_analysis']}
+        - Risk Assessment: {context['risk_assessment']}
+        - Strategic Recommendations: {context['strategic_recommendations']}
+        - Implementation Roadmap: {context['implementation_roadmap']}
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert at identifying gaps and areas for improvement in business analysis reports."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self.prompt_messages("You are an expert at identifying gaps and areas for improvement in business analysis reports.", instructions, prompt)
         
-        response = self.call_llm(messages, temperature=0.3)
+        response = self.call_llm(messages, temperature=0.3, method='identify_gaps_and_improvements')
         result = self.parse_json_response(response)
         
         if result:
@@ -289,48 +242,54 @@ class RefinerAgent(BaseAgent):
                                           gap_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate specific recommendations for report refinement"""
         
-        prompt = f"""
-        Generate specific recommendations for refining the report based on validation results:
-
-        VALIDATION RESULTS: {validation_results}
-        CROSS-CHECK RESULTS: {cross_check_results}
-        GAP ANALYSIS: {gap_analysis}
+        context = self.build_context(
+            validation_results=(validation_results, HIGH),
+            cross_check_results=(cross_check_results, MEDIUM),
+            gap_analysis=(gap_analysis, MEDIUM),
+            method='generate_refinement_recommendations'
+        )
+        
+        instructions = """
+        Generate specific recommendations for refining the report based on validation results.
 
         Provide specific refinement recommendations in JSON format:
-        {{
+        {
             "high_priority_refinements": [
-                {{
+                {
                     "refinement": "Specific refinement needed",
                     "rationale": "Why this refinement is important",
                     "implementation": "How to implement this refinement"
-                }}
+                }
             ],
             "medium_priority_refinements": [
-                {{
+                {
                     "refinement": "Specific refinement needed",
                     "rationale": "Why this refinement is important",
                     "implementation": "How to implement this refinement"
-                }}
+                }
             ],
             "low_priority_refinements": [
-                {{
+                {
                     "refinement": "Specific refinement needed",
                     "rationale": "Why this refinement is important",
                     "implementation": "How to implement this refinement"
-                }}
+                }
             ],
             "overall_refinement_score": "0-10 rating",
             "refinement_priority": "high|medium|low",
             "estimated_effort": "low|medium|high"
-        }}
+        }
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert at providing actionable refinement recommendations for business reports."},
-            {"role": "user", "content": prompt}
-        ]
+        prompt = f"""
+        VALIDATION RESULTS: {context['validation_results']}
+        CROSS-CHECK RESULTS: {context['cross_check_results']}
+        GAP ANALYSIS: {context['gap_analysis']}
+        """
         
-        response = self.call_llm(messages, temperature=0.3)
+        messages = self.prompt_messages("You are an expert at providing actionable refinement recommendations for business reports.", instructions, prompt)
+        
+        response = self.call_llm(messages, temperature=0.3, method='generate_refinement_recommendations')
         result = self.parse_json_response(response)
         
         if result:
@@ -344,16 +303,19 @@ class RefinerAgent(BaseAgent):
                                       refinement_recommendations: Dict[str, Any]) -> Dict[str, Any]:
         """Create a final validation summary"""
         
-        prompt = f"""
-        Create a final validation summary based on all validation results:
-
-        VALIDATION RESULTS: {validation_results}
-        CROSS-CHECK RESULTS: {cross_check_results}
-        GAP ANALYSIS: {gap_analysis}
-        REFINEMENT RECOMMENDATIONS: {refinement_recommendations}
+        context = self.build_context(
+            validation_results=(validation_results, HIGH),
+            cross_check_results=(cross_check_results, MEDIUM),
+            gap_analysis=(gap_analysis, MEDIUM),
+            refinement_recommendations=(refinement_recommendations, HIGH),
+            method='create_final_validation_summary'
+        )
+        
+        instructions = """
+        Create a final validation summary based on all validation results.
 
         Provide a final validation summary in JSON format:
-        {{
+        {
             "overall_quality_score": "0-10 rating",
             "authenticity_assessment": "high|medium|low",
             "consistency_assessment": "high|medium|low",
@@ -363,15 +325,19 @@ class RefinerAgent(BaseAgent):
             "refinement_needed": "yes|no|minor",
             "final_recommendation": "accept|revise|reject",
             "confidence_in_assessment": "high|medium|low"
-        }}
+        }
+        """
+        
+        prompt = f"""
+        VALIDATION RESULTS: {context['validation_results']}
+        CROSS-CHECK RESULTS: {context['cross_check_results']}
+        GAP ANALYSIS: {context['gap_analysis']}
+        REFINEMENT RECOMMENDATIONS: {context['refinement_recommendations']}
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert at synthesizing validation results into clear, actionable summaries."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self.prompt_messages("You are an expert at synthesizing validation results into clear, actionable summaries.", instructions, prompt)
         
-        response = self.call_llm(messages, temperature=0.3)
+        response = self.call_llm(messages, temperature=0.3, method='create_final_validation_summary')
         result = self.parse_json_response(response)
         
         if result:
@@ -383,14 +349,21 @@ class RefinerAgent(BaseAgent):
                      research_data: Dict[str, Any], validation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Main method to refine and validate the report"""
         
-        # Validate report authenticity
-        validation_results = self.validate_report_authenticity(report_data, idea_data, research_data, validation_data)
-        
-        # Cross-check claims
-        cross_check_results = self.cross_check_claims(report_data, research_data)
-        
-        # Identify gaps and improvements
-        gap_analysis = self.identify_gaps_and_improvements(report_data, idea_data)
+        # The three checks only read the report, idea and research data, so they run concurrently;
+        # a check that fails or times out leaves an error entry and the refinement goes on without it
+        graph = TaskGraph("refiner")
+        checks = {
+            "validation_results": lambda _: self.validate_report_authenticity(report_data, idea_data, research_data, validation_data),
+            "cross_check_results": lambda _: self.cross_check_claims(report_data, research_data),
+            "gap_analysis": lambda _: self.identify_gaps_and_improvements(report_data, idea_data)
+        }
+        for name, check in checks.items():
+            graph.add(name, check, timeout=REFINER_CHECK_TIMEOUT_SECONDS, tolerate_errors=True)
+        results = graph.run()
+        validation_results = results["validation_results"]
+        cross_check_results = results["cross_check_results"]
+        gap_analysis = results["gap_analysis"]
+        incomplete_checks = [name for name in checks if isinstance(results[name], dict) and 'error' in results[name]]
         
         # Generate refinement recommendations
         refinement_recommendations = self.generate_refinement_recommendations(
@@ -408,8 +381,9 @@ class RefinerAgent(BaseAgent):
             "cross_check_results": cross_check_results,
             "gap_analysis": gap_analysis,
             "refinement_recommendations": refinement_recommendations,
-            "final_summary": final_summary
+            "final_summary": final_summary,
+            "incomplete_checks": incomplete_checks
         }
         
-        self.log_activity("Completed report refinement")
+        self.log_activity("Completed report refinement", f"Incomplete checks: {incomplete_checks}" if incomplete_checks else None)
         return self.refinement_data 
\ No newline at end of file
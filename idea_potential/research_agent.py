@@ -6,6 +6,7 @@ from collections import Counter
 import time
 from typing import Dict, List, Any, Tuple
 from idea_potential.base_agent import BaseAgent
+from idea_potential.batch import BatchDeferred, current_batch_session
 from idea_potential.config import (REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, SUBREDDIT_CATEGORIES, 
                                    KEYWORD_CATEGORY_MAPPING, FALLBACK_SUBREDDITS, MAX_REDDIT_POSTS, 
                                    MIN_RELEVANCE_SCORE, TIME_FILTER, CHUNK_SIZE, 
@@ -44,11 +45,8 @@ class ResearchAgent(BaseAgent):
         idea_text = idea_data.get('refined_idea', '')
         target_market = idea_data.get('target_market', '')
         
-        prompt = f"""
-        Analyze this business idea and generate the most relevant keywords and subreddits for market research:
-
-        BUSINESS IDEA: {idea_text}
-        TARGET MARKET: {target_market}
+        instructions = """
+        Analyze this business idea and generate the most relevant keywords and subreddits for market research.
 
         Generate:
         1. MAXIMUM 4 highly specific keywords that would help find Reddit discussions about:
@@ -65,20 +63,18 @@ class ResearchAgent(BaseAgent):
 
         Focus on specific, actionable terms that would appear in real Reddit discussions.
         Choose subreddits that are active and relevant to the target market.
-
-        Please respond with valid JSON format containing:
-        - keywords: Array of relevant search keywords (max 5)
-        - subreddits: Array of relevant subreddit names (max 5)
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert in market research and Reddit analysis. Generate specific, relevant keywords and subreddits that would help validate business ideas through Reddit research. Be precise and focus on active, relevant communities."},
-            {"role": "user", "content": prompt}
-        ]
+        prompt = f"""
+        BUSINESS IDEA: {idea_text}
+        TARGET MARKET: {target_market}
+        """
+        
+        messages = self.prompt_messages("You are an expert in market research and Reddit analysis. Generate specific, relevant keywords and subreddits that would help validate business ideas through Reddit research. Be precise and focus on active, relevant communities.", instructions, prompt)
         
         try:
             # Try structured output first
-            result = self.call_llm_structured(messages, KeywordSubredditResponse, temperature=0.3)
+            result = self.call_llm_structured(messages, KeywordSubredditResponse, temperature=0.3, method='generate_relevant_keywords_and_subreddits')
             
             if result:
                 keywords = result.keywords[:4] if result.keywords else []
@@ -168,25 +164,23 @@ class ResearchAgent(BaseAgent):
     def identify_categories_from_text(self, text: str) -> set:
         """Identify relevant categories from the idea text using AI analysis"""
         
-        prompt = f"""
-        Analyze this business idea and identify the most relevant categories from this list:
-        
-        Idea: {text}
+        instructions = """
+        Analyze this business idea and identify the most relevant categories from this list.
         
         Categories: ai, machine_learning, programming, technology, business, entrepreneurship, startups, development, software_engineering, web_development, design, creative, finance, cryptocurrency, health, fitness, education, learning, gaming, entertainment, lifestyle, productivity, marketplace, ecommerce, community, social_media, tools, utilities, prompt_engineering, llm, language_models, forum, platform, marketplace_platform, exchange
         
         Return only the category names that are most relevant to this idea, separated by commas. Be specific and relevant.
         """
         
+        prompt = f"""
+        Idea: {text}
+        """
+        
         try:
-            response = self.llm_client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=100,
-                temperature=0.3
-            )
+            messages = self.prompt_messages("You are an expert in market research and subreddit categorization.", instructions, prompt)
+            response = self.call_llm(messages, temperature=0.3, method='identify_categories_from_text')
             
-            categories_text = response.choices[0].message.content.strip()
+            categories_text = response.strip()
             categories = [cat.strip() for cat in categories_text.split(',')]
             
             # Filter to only valid categories
@@ -251,50 +245,52 @@ class ResearchAgent(BaseAgent):
         if not chunk_data:
             return {"error": "No valid posts in chunk"}
         
-        prompt = f"""
-        Analyze this chunk of Reddit posts for market insights related to this business idea:
-
-        IDEA: {idea_data.get('refined_idea', 'Unknown')}
-        TARGET MARKET: {idea_data.get('target_market', 'Unknown')}
-
-        REDDIT POSTS TO ANALYZE:
-        {chunk_data}
+        instructions = """
+        Analyze this chunk of Reddit posts for market insights related to this business idea.
 
         Provide analysis in JSON format:
-        {{
-            "quantitative_metrics": {{
-                "total_posts": {len(chunk_data)},
+        {
+            "quantitative_metrics": {
+                "total_posts": "number of posts analyzed",
                 "avg_score": "average post score",
                 "avg_comments": "average comments per post",
                 "engagement_rate": "engagement calculation",
-                "sentiment_breakdown": {{
+                "sentiment_breakdown": {
                     "positive": "count",
                     "neutral": "count", 
                     "negative": "count"
-                }}
-            }},
-            "user_feedback": {{
+                }
+            },
+            "user_feedback": {
                 "common_complaints": ["list of complaints"],
                 "expressed_needs": ["list of needs"],
                 "pain_points": ["list of pain points"],
                 "feature_requests": ["list of feature requests"],
                 "user_sentiment": "overall sentiment analysis"
-            }},
-            "market_insights": {{
+            },
+            "market_insights": {
                 "trends_identified": ["list of trends"],
                 "opportunities": ["list of opportunities"],
                 "challenges": ["list of challenges"]
-            }},
-            "references": {chunk_references}
-        }}
+            },
+            "references": ["the REFERENCES given, unchanged"]
+        }
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert market analyst specializing in Reddit data analysis and business idea validation."},
-            {"role": "user", "content": prompt}
-        ]
+        prompt = f"""
+        IDEA: {idea_data.get('refined_idea', 'Unknown')}
+        TARGET MARKET: {idea_data.get('target_market', 'Unknown')}
+
+        REDDIT POSTS TO ANALYZE:
+        {chunk_data}
+
+        REFERENCES:
+        {chunk_references}
+        """
+        
+        messages = self.prompt_messages("You are an expert market analyst specializing in Reddit data analysis and business idea validation.", instructions, prompt)
         
-        response = self.call_llm(messages, temperature=0.3)
+        response = self.call_llm(messages, temperature=0.3, method='analyze_chunk_with_references')
         result = self.parse_json_response(response)
         
         if result:
@@ -318,12 +314,8 @@ class ResearchAgent(BaseAgent):
             # Extract core concepts from the idea
             core_concepts = self.extract_core_concepts(idea_text, target_market)
             
-            prompt = f"""
-            Based on this business idea, generate 15-20 highly specific and relevant search keywords for Reddit research:
-
-            IDEA: {idea_text}
-            TARGET MARKET: {target_market}
-            CORE CONCEPTS: {core_concepts}
+            instructions = """
+            Based on this business idea, generate 15-20 highly specific and relevant search keywords for Reddit research.
 
             Generate keywords that would help find:
             1. People discussing similar problems or needs
@@ -336,19 +328,19 @@ class ResearchAgent(BaseAgent):
 
             Focus on specific, actionable keywords that would appear in Reddit discussions.
             Include both broad and niche terms.
-
-            Please respond with valid JSON format containing:
-            - keywords: Array of search keywords (max 20)
             """
             
-            messages = [
-                {"role": "system", "content": "You are an expert in market research and keyword generation for business idea validation. Generate specific, relevant keywords that would help find Reddit discussions about similar problems, needs, and solutions."},
-                {"role": "user", "content": prompt}
-            ]
+            prompt = f"""
+            IDEA: {idea_text}
+            TARGET MARKET: {target_market}
+            CORE CONCEPTS: {core_concepts}
+            """
+            
+            messages = self.prompt_messages("You are an expert in market research and keyword generation for business idea validation. Generate specific, relevant keywords that would help find Reddit discussions about similar problems, needs, and solutions.", instructions, prompt)
             
             try:
                 # Try structured output first
-                result = self.call_llm_structured(messages, SearchKeywordsResponse, temperature=0.4)
+                result = self.call_llm_structured(messages, SearchKeywordsResponse, temperature=0.4, method='generate_search_keywords')
                 
                 if result and result.keywords:
                     # Remove duplicates and limit
@@ -371,11 +363,8 @@ class ResearchAgent(BaseAgent):
     def extract_core_concepts(self, idea_text: str, target_market: str) -> List[str]:
         """Extract core concepts from the idea for better keyword generation"""
         
-        prompt = f"""
-        Extract 5-8 core concepts from this business idea that would be relevant for market research:
-
-        IDEA: {idea_text}
-        TARGET MARKET: {target_market}
+        instructions = """
+        Extract 5-8 core concepts from this business idea that would be relevant for market research.
 
         Focus on:
         - Main product/service concepts
@@ -383,19 +372,18 @@ class ResearchAgent(BaseAgent):
         - Key technologies or platforms
         - Industry or domain terms
         - Unique value propositions
-
-        Please respond with valid JSON format containing:
-        - concepts: Array of core concepts (max 8)
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert at extracting core business concepts from ideas for market research purposes."},
-            {"role": "user", "content": prompt}
-        ]
+        prompt = f"""
+        IDEA: {idea_text}
+        TARGET MARKET: {target_market}
+        """
+        
+        messages = self.prompt_messages("You are an expert at extracting core business concepts from ideas for market research purposes.", instructions, prompt)
         
         try:
             # Try structured output first
-            result = self.call_llm_structured(messages, CoreConceptsResponse, temperature=0.3)
+            result = self.call_llm_structured(messages, CoreConceptsResponse, temperature=0.3, method='extract_core_concepts')
             
             if result and result.concepts:
                 return result.concepts[:8]
@@ -415,6 +403,17 @@ class ResearchAgent(BaseAgent):
         if not self.reddit:
             return []
         
+        batch_session = current_batch_session()
+        if batch_session is not None:
+            # Bulk runs are replayed after every batch job; the prompts built from the
+            # posts must not change between replays or their batch results won't match
+            return batch_session.memoize('reddit_search', [keywords, subreddits, idea_data],
+                                         lambda: self._search_reddit_posts(keywords, idea_data, subreddits))
+        return self._search_reddit_posts(keywords, idea_data, subreddits)
+    
+    def _search_reddit_posts(self, keywords: List[str], idea_data: Dict[str, Any], subreddits: List[str] = None) -> List[Dict[str, Any]]:
+        """Run the Reddit searches"""
+        
         # Use provided subreddits or fall back to dynamic selection
         if subreddits is None:
             relevant_subreddits = self.select_relevant_subreddits(idea_data)
@@ -552,9 +551,22 @@ class ResearchAgent(BaseAgent):
         pain_points = self.identify_pain_points(problem_posts)
         
         # Generate insights
-        prompt = f"""
-        Analyze this market research data and provide insights about the business idea:
+        instructions = """
+        Analyze this market research data and provide insights about the business idea.
 
+        Provide insights in JSON format:
+        {
+            "market_validation": "Assessment of market need",
+            "pain_points_identified": ["List of key pain points"],
+            "competition_analysis": "Analysis of existing solutions",
+            "customer_sentiment": "Overall customer sentiment",
+            "opportunity_assessment": "Market opportunity assessment",
+            "risks_and_challenges": ["List of potential risks"],
+            "recommendations": ["List of recommendations"]
+        }
+        """
+        
+        prompt = f"""
         IDEA: {idea_data.get('refined_idea', 'Unknown')}
         TARGET MARKET: {idea_data.get('target_market', 'Unknown')}
 
@@ -565,25 +577,11 @@ class ResearchAgent(BaseAgent):
         - Common themes: {themes[:5]}
         - Pain points: {pain_points[:5]}
         - Sentiment analysis: {sentiment_analysis}
-
-        Provide insights in JSON format:
-        {{
-            "market_validation": "Assessment of market need",
-            "pain_points_identified": ["List of key pain points"],
-            "competition_analysis": "Analysis of existing solutions",
-            "customer_sentiment": "Overall customer sentiment",
-            "opportunity_assessment": "Market opportunity assessment",
-            "risks_and_challenges": ["List of potential risks"],
-            "recommendations": ["List of recommendations"]
-        }}
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert market analyst specializing in business idea validation."},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self.prompt_messages("You are an expert market analyst specializing in business idea validation.", instructions, prompt)
         
-        response = self.call_llm(messages, temperature=0.3)
+        response = self.call_llm(messages, temperature=0.3, method='analyze_market_insights')
         result = self.parse_json_response(response)
         
         if result:
@@ -668,6 +666,7 @@ class ResearchAgent(BaseAgent):
             }
             
             # Analyze each chunk
+            deferred = False
             for i, chunk in enumerate(chunks):
                 print(f"Analyzing chunk {i+1}/{len(chunks)}...")
                 try:
@@ -686,10 +685,17 @@ class ResearchAgent(BaseAgent):
                                     quantitative_metrics['sentiment_breakdown'][sentiment] += count
                     else:
                         print(f"Warning: Chunk {i+1} analysis failed: {chunk_insights['error']}")
+                except BatchDeferred:
+                    # Queue the remaining chunks in the same batch job instead of one job per chunk
+                    deferred = True
+                    continue
                 except Exception as e:
                     print(f"Error analyzing chunk {i+1}: {e}")
                     continue
             
+            if deferred:
+                raise BatchDeferred("research.analyze_chunk_with_references")
+            
             # Calculate averages
             if len(all_chunk_insights) > 0:
                 quantitative_metrics['avg_score'] /= len(all_chunk_insights)
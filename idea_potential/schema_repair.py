@@ -0,0 +1,313 @@
+import copy
+import difflib
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar('T', bound=BaseModel)
+
+# Common LLM wordings for the enum values used in structured_outputs.py
+ENUM_SYNONYMS = {
+    'moderate': 'medium', 'med': 'medium', 'mid': 'medium', 'average': 'medium', 'intermediate': 'medium',
+    'critical': 'high', 'severe': 'high', 'significant': 'high', 'strong': 'high', 'very_high': 'high',
+    'minor': 'low', 'minimal': 'low', 'negligible': 'low', 'weak': 'low', 'very_low': 'low',
+    'yes': 'go', 'proceed': 'go', 'approve': 'go', 'approved': 'go',
+    'no': 'no_go', 'nogo': 'no_go', 'reject': 'no_go', 'abandon': 'no_go', 'stop': 'no_go',
+    'maybe': 'conditional', 'caution': 'conditional', 'conditionally': 'conditional', 'pivot': 'conditional',
+    'target_market': 'market', 'customers': 'market', 'value': 'value_proposition',
+    'differentiation': 'value_proposition', 'technical': 'feasibility', 'resources': 'feasibility'
+}
+# Used when a value mixes signals ("high to medium", "go with caution"); a value that matches
+# no option is left unrepaired rather than guessed
+ENUM_FALLBACK_PREFERENCE = ('medium', 'conditional')
+PLACEHOLDER_TEXT = "Not specified"
+# Keys that usually hold the human-readable part of an object the model should have sent as text
+TEXT_KEYS = ('title', 'name', 'risk', 'issue', 'strategy', 'description', 'text', 'summary')
+MAX_REPAIR_PASSES = 5
+
+
+class SchemaRepairer:
+    """Coerces near-miss LLM output into a Pydantic model by walking its validation errors"""
+    
+    def __init__(self, model: Type[T]):
+        self.model = model
+        self.schema = model.model_json_schema()
+        self.defs = self.schema.get('$defs', {})
+        self.fixes: List[str] = []
+    
+    def repair(self, data: Any) -> Optional[T]:
+        """Repair data in place until it validates, or return None if it cannot be fixed"""
+        if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict):
+            data = data[0]
+            self.fixes.append("unwrapped single-item list")
+        if not isinstance(data, dict):
+            return None
+        data = self._normalize(data, self.schema, ())
+        
+        for _ in range(MAX_REPAIR_PASSES):
+            try:
+                return self.model.model_validate(data)
+            except ValidationError as e:
+                errors = e.errors()
+            # Apply every independent fix in one pass, then revalidate
+            changed = [self._fix_error(data, error) for error in errors]
+            if not any(changed):
+                break
+        return None
+    
+    # Schema navigation
+    
+    def _resolve(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Follow $ref and Optional[...] wrappers to the concrete schema node"""
+        while True:
+            if '$ref' in node:
+                extra = {key: value for key, value in node.items() if key != '$ref'}
+                node = {**self.defs.get(node['$ref'].split('/')[-1], {}), **extra}
+            elif 'anyOf' in node:
+                options = [option for option in node['anyOf'] if option.get('type') != 'null']
+                node = options[0] if options else {}
+            else:
+                return node
+    
+    def _node_at(self, loc: Tuple) -> Dict[str, Any]:
+        """Schema node for a validation error location"""
+        node = self._resolve(self.schema)
+        for part in loc:
+            if isinstance(part, int):
+                node = self._resolve(node.get('items', {}))
+            else:
+                node = self._resolve(node.get('properties', {}).get(part, {}))
+        return node
+    
+    # Structural normalisation before validation
+    
+    def _normalize(self, value: Any, node: Dict[str, Any], path: Tuple) -> Any:
+        """Match key spelling to the schema and unwrap objects nested under an extra key"""
+        node = self._resolve(node)
+        if isinstance(value, dict) and node.get('properties'):
+            properties = node['properties']
+            value = self._unwrap(value, properties, path)
+            normalized = {}
+            for key, item in value.items():
+                target = key if key in properties else _normalize_key(key)
+                if target != key and target in properties and target not in value:
+                    self.fixes.append(f"renamed '{'.'.join(map(str, path + (key,)))}' to '{target}'")
+                    key = target
+                normalized[key] = item
+            for key in properties:
+                if key in normalized:
+                    normalized[key] = self._normalize(normalized[key], properties[key], path + (key,))
+            return normalized
+        if isinstance(value, list) and node.get('type') == 'array':
+            items = node.get('items', {})
+            return [self._normalize(item, items, path + (index,)) for index, item in enumerate(value)]
+        return value
+    
+    def _unwrap(self, value: Dict[str, Any], properties: Dict[str, Any], path: Tuple) -> Dict[str, Any]:
+        """Unwrap {"roadmap": {...}}-style responses when no expected key is at the top level"""
+        def overlap(candidate: Dict[str, Any]) -> int:
+            return sum(1 for key in candidate if key in properties or _normalize_key(key) in properties)
+        
+        if overlap(value):
+            return value
+        wrappers = [(key, item) for key, item in value.items() if isinstance(item, dict) and overlap(item)]
+        if not wrappers:
+            return value
+        key, inner = max(wrappers, key=lambda wrapper: overlap(wrapper[1]))
+        self.fixes.append(f"unwrapped '{'.'.join(map(str, path + (key,)))}'")
+        return inner
+    
+    # Error-driven fixes
+    
+    def _fix_error(self, data: Dict[str, Any], error: Dict[str, Any]) -> bool:
+        """Apply a local fix for one validation error; returns True if the data changed"""
+        loc = tuple(error.get('loc', ()))
+        if not loc:
+            return False
+        try:
+            parent = data
+            for part in loc[:-1]:
+                parent = parent[part]
+        except (KeyError, IndexError, TypeError):
+            return False
+        
+        key = loc[-1]
+        node = self._node_at(loc)
+        error_type = error['type']
+        value = error.get('input')
+        ctx = error.get('ctx', {})
+        
+        if error_type == 'missing':
+            fixed = self._default_for(node)
+        elif error_type == 'enum':
+            fixed = self._coerce_enum(value, node.get('enum') or [])
+        elif error_type == 'list_type':
+            fixed = self._to_list(value)
+        elif error_type == 'string_type':
+            fixed = self._to_text(value)
+        elif error_type in ('int_parsing', 'int_type', 'int_from_float', 'float_parsing', 'float_type'):
+            fixed = self._to_number(value, node)
+        elif error_type in ('dict_type', 'model_type', 'model_attributes_type'):
+            fixed = self._to_object(value, node)
+        elif error_type == 'too_long' and isinstance(value, list):
+            fixed = value[:ctx.get('max_length', len(value))]
+        else:
+            # Out-of-range numbers and unparseable booleans (pydantic already accepts yes/no, 1/0 and the like)
+            # would have to be replaced by a judgement the model didn't make
+            return False
+        
+        if fixed is None or (not isinstance(parent, list) and key in parent and parent[key] == fixed):
+            return False
+        try:
+            parent[key] = fixed
+        except (IndexError, TypeError):
+            return False
+        self.fixes.append(f"{error_type} at '{'.'.join(map(str, loc))}'")
+        return True
+    
+    def _default_for(self, node: Dict[str, Any]) -> Any:
+        """Neutral default value for a schema node, or None for values that would have to be made up"""
+        node = self._resolve(node)
+        if 'default' in node:
+            return copy.deepcopy(node['default'])
+        node_type = node.get('type')
+        # A missing rating or score is a judgement the model didn't make, so the repair fails instead
+        if 'enum' in node or node_type in ('integer', 'number'):
+            return None
+        if node_type == 'array':
+            return []
+        if node_type == 'object':
+            properties = node.get('properties', {})
+            fixed = {key: self._default_for(sub_node) for key, sub_node in properties.items()
+                     if key in node.get('required', [])}
+            return None if any(value is None for value in fixed.values()) else fixed
+        if node_type == 'boolean':
+            return False
+        return PLACEHOLDER_TEXT
+    
+    def _coerce_enum(self, value: Any, options: List[str]) -> Optional[str]:
+        """Map free text onto one of the enum values, or None if it names none of them"""
+        if not options:
+            return None
+        text = str(value).strip().lower()
+        normalized = _normalize_key(text)
+        if normalized in options:
+            return normalized
+        if ENUM_SYNONYMS.get(normalized) in options:
+            return ENUM_SYNONYMS[normalized]
+        
+        candidates = []
+        for word in re.findall(r'[a-z_]+', text):
+            match = word if word in options else ENUM_SYNONYMS.get(word)
+            if match in options and match not in candidates:
+                candidates.append(match)
+        if len(candidates) == 1:
+            return candidates[0]
+        if candidates:
+            return _preferred(candidates) if any(option in candidates for option in ENUM_FALLBACK_PREFERENCE) else candidates[0]
+        
+        close = difflib.get_close_matches(normalized, options, n=1, cutoff=0.6)
+        return close[0] if close else None
+    
+    def _to_list(self, value: Any) -> List[Any]:
+        """Wrap a scalar into a list, splitting bulleted or multi-line text into items"""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            lines = [re.sub(r'^\s*(?:[-*•]|\d+[.)])\s*', '', line).strip() for line in value.splitlines()]
+            lines = [line for line in lines if line]
+            return lines if len(lines) > 1 else [value.strip()]
+        if isinstance(value, (tuple, set)):
+            return list(value)
+        return [value]
+    
+    def _to_text(self, value: Any) -> str:
+        """Flatten lists and objects into a single string"""
+        if value is None:
+            return PLACEHOLDER_TEXT
+        if isinstance(value, list):
+            return "; ".join(self._to_text(item) for item in value) or PLACEHOLDER_TEXT
+        if isinstance(value, dict):
+            for key in TEXT_KEYS:
+                if isinstance(value.get(key), str) and value[key].strip():
+                    return value[key]
+            if len(value) == 1:
+                return self._to_text(next(iter(value.values())))
+            return "; ".join(f"{key}: {self._to_text(item)}" for key, item in value.items())
+        return str(value)
+    
+    def _to_number(self, value: Any, node: Dict[str, Any]) -> Any:
+        """Parse the first number out of text such as '7/10' or 'about 8.5'"""
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            number = float(value)
+        else:
+            match = re.search(r'-?\d+(?:\.\d+)?', str(value))
+            if not match:
+                return self._default_for(node)
+            number = float(match.group())
+        return int(round(number)) if node.get('type') == 'integer' else number
+    
+    def _to_object(self, value: Any, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Turn a list or string into the object the schema expects"""
+        if isinstance(value, list):
+            dicts = [item for item in value if isinstance(item, dict)]
+            if len(dicts) == 1:
+                return dicts[0]
+            if not node.get('properties'):
+                return {"items": value}
+            return None
+        if isinstance(value, str) and value.strip():
+            properties = node.get('properties')
+            if not properties:
+                return {"summary": value}
+            fixed = self._default_for(node)
+            if fixed is None:
+                return None
+            text_field = next((key for key, sub_node in properties.items()
+                               if self._resolve(sub_node).get('type') == 'string'), None)
+            if text_field:
+                fixed[text_field] = value
+            return fixed
+        return self._default_for(node) if value is None else None
+
+
+def _normalize_key(key: str) -> str:
+    """'Executive Summary' / 'executive-summary' -> 'executive_summary'"""
+    return re.sub(r'[\s\-/]+', '_', str(key).strip().lower())
+
+
+def _preferred(options: List[str]) -> str:
+    for option in ENUM_FALLBACK_PREFERENCE:
+        if option in options:
+            return option
+    return options[0]
+
+
+def repair_structured_output(data: Any, model: Type[T]) -> Tuple[Optional[T], List[str]]:
+    """Repair parsed LLM output against a response model, returning the instance (or None) and the fixes applied"""
+    repairer = SchemaRepairer(model)
+    return repairer.repair(data), repairer.fixes
+
+
+def filled_ratio(instance: BaseModel) -> float:
+    """Share of a response's leaf fields that carry real content rather than empty or placeholder values"""
+    leaves = []
+    
+    def walk(value: Any):
+        if isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list) and value:
+            for item in value:
+                walk(item)
+        else:
+            leaves.append(value)
+    
+    walk(instance.model_dump())
+    if not leaves:
+        return 0.0
+    filled = [value for value in leaves
+              if value not in (None, "", [], {}) and not (isinstance(value, str) and value.strip() in ("", PLACEHOLDER_TEXT))]
+    return len(filled) / len(leaves)
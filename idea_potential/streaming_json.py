@@ -0,0 +1,120 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Default nesting depth for surfaced fields: 2 gives "swot_analysis" and "swot_analysis.strengths"
+DEFAULT_FIELD_DEPTH = 2
+
+
+class IncrementalJSONParser:
+    """Parses a JSON object as it streams in and reports each field as soon as its value closes"""
+    
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None, max_depth: int = DEFAULT_FIELD_DEPTH):
+        self.on_field = on_field
+        self.max_depth = max_depth
+        self.fields: Dict[str, Any] = {}
+        self._emitted: Set[str] = set()
+        self.reset()
+    
+    def reset(self):
+        """Discard partial input (e.g. before a retried stream) while remembering fields already reported"""
+        self.buffer = ""
+        self._pos = 0
+        self._started = False
+        self._stack: List[Dict[str, Any]] = []
+        self._in_string = False
+        self._escaped = False
+        self._token_start: Optional[int] = None
+        self._scalar_start: Optional[int] = None
+    
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk of streamed text and return the fields it completed"""
+        self.buffer += text
+        completed = []
+        while self._pos < len(self.buffer):
+            char = self.buffer[self._pos]
+            if not self._started:
+                # Skip anything before the object, such as a ```json fence
+                if char == '{':
+                    self._started = True
+                    self._open('object')
+                self._pos += 1
+                continue
+            if not self._stack:
+                break
+            if self._in_string:
+                self._scan_string(char, completed)
+            else:
+                self._scan_structure(char, completed)
+            self._pos += 1
+        return completed
+    
+    def _scan_string(self, char: str, completed: List[Tuple[str, Any]]):
+        if self._escaped:
+            self._escaped = False
+        elif char == '\\':
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+            frame = self._stack[-1]
+            raw = self.buffer[self._token_start:self._pos + 1]
+            if frame['type'] == 'object' and frame['expecting'] == 'key':
+                frame['key'] = json.loads(raw)
+            else:
+                self._complete(frame, raw, completed)
+    
+    def _scan_structure(self, char: str, completed: List[Tuple[str, Any]]):
+        frame = self._stack[-1]
+        if self._scalar_start is not None and (char in ',}]' or char.isspace()):
+            self._complete(frame, self.buffer[self._scalar_start:self._pos].strip(), completed)
+            self._scalar_start = None
+        if char == '"':
+            self._in_string = True
+            self._token_start = self._pos
+        elif char in '{[':
+            self._open('object' if char == '{' else 'array')
+        elif char in '}]':
+            closed = self._stack.pop()
+            if self._stack:
+                self._complete(self._stack[-1], self.buffer[closed['start']:self._pos + 1], completed)
+        elif char == ':':
+            frame['expecting'] = 'value'
+        elif char == ',':
+            if frame['type'] == 'object':
+                frame['expecting'] = 'key'
+            else:
+                frame['index'] += 1
+        elif not char.isspace() and self._scalar_start is None:
+            # Start of a number, true, false or null
+            self._scalar_start = self._pos
+    
+    def _open(self, container_type: str):
+        path = self._child_path(self._stack[-1]) if self._stack else ()
+        self._stack.append({'type': container_type, 'start': self._pos, 'path': path,
+                            'expecting': 'key', 'key': None, 'index': 0})
+    
+    @staticmethod
+    def _child_path(frame: Dict[str, Any]) -> Tuple:
+        return frame['path'] + ((frame['key'],) if frame['type'] == 'object' else (frame['index'],))
+    
+    def _complete(self, parent: Dict[str, Any], raw: str, completed: List[Tuple[str, Any]]):
+        """Report a value that just closed if it is an object field within the depth limit"""
+        if parent['type'] != 'object':
+            return
+        path = self._child_path(parent)
+        if len(path) > self.max_depth or any(not isinstance(part, str) for part in path):
+            return
+        name = '.'.join(path)
+        if name in self._emitted:
+            return
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        self._emitted.add(name)
+        self.fields[name] = value
+        completed.append((name, value))
+        if self.on_field is not None:
+            try:
+                self.on_field(name, value)
+            except Exception as e:
+                print(f"Error in streaming field callback for '{name}': {e}")
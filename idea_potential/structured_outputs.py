@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Type
 from enum import Enum
+from functools import lru_cache
+import json
 
 # Enums for structured outputs
 class ConfidenceLevel(str, Enum):
@@ -181,6 +183,14 @@ class ValidationMatrixResponse(BaseModel):
     customer_adoption: CustomerAdoption
     overall_assessment: OverallAssessment
 
+class ValidationSummaryResponse(BaseModel):
+    overall_validation_score: int = Field(description="Overall validation score from 0-10", ge=0, le=10)
+    key_findings: List[str] = Field(description="List of key validation findings")
+    critical_success_factors: List[str] = Field(description="List of critical success factors")
+    major_concerns: List[str] = Field(description="List of major concerns")
+    validation_recommendation: str = Field(description="Recommendation (proceed/proceed_with_caution/reconsider/abandon)")
+    next_validation_steps: List[str] = Field(description="List of next steps for validation")
+
 class CompetitorAnalysisResponse(BaseModel):
     direct_competitors: List[Dict[str, Any]] = Field(description="Direct competitors analysis")
     indirect_competitors: List[Dict[str, Any]] = Field(description="Indirect competitors analysis")
@@ -292,4 +302,114 @@ class SuggestionsResponse(BaseModel):
         """Convert recommendation_priority to string if it's an integer"""
         if isinstance(v, int):
             return str(v)
-        return v 
\ No newline at end of file
+        return v 
+
+# Schema helpers for OpenAI structured outputs
+# Keywords strict mode rejects; the Pydantic models still enforce them on validation
+_UNSUPPORTED_STRICT_KEYWORDS = {
+    'title', 'default', 'minItems', 'maxItems', 'minimum', 'maximum', 'exclusiveMinimum',
+    'exclusiveMaximum', 'minLength', 'maxLength', 'pattern', 'format'
+}
+
+class _NotStrictCompatible(Exception):
+    """Raised when a schema contains free-form objects that strict mode cannot express"""
+
+def _make_strict(node: Any) -> Any:
+    """Recursively convert a JSON schema node to OpenAI strict mode"""
+    if isinstance(node, list):
+        return [_make_strict(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    
+    # Strict mode does not allow keywords next to a $ref
+    if '$ref' in node:
+        return {'$ref': node['$ref']}
+    
+    strict = {}
+    for key, value in node.items():
+        if key in ('properties', '$defs'):
+            # Keys of these mappings are field/definition names, not keywords
+            strict[key] = {name: _make_strict(sub_schema) for name, sub_schema in value.items()}
+        elif key not in _UNSUPPORTED_STRICT_KEYWORDS:
+            strict[key] = _make_strict(value)
+    
+    if strict.get('type') == 'object':
+        if not strict.get('properties'):
+            # Dict[str, Any] and similar free-form objects
+            raise _NotStrictCompatible()
+        strict['additionalProperties'] = False
+        strict['required'] = list(strict['properties'])
+    return strict
+
+@lru_cache(maxsize=None)
+def _strict_json_schema(model: Type[BaseModel]) -> Optional[str]:
+    try:
+        return json.dumps(_make_strict(model.model_json_schema()))
+    except _NotStrictCompatible:
+        return None
+
+def strict_json_schema(model: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """Get the strict-mode JSON schema for a model, or None if it has free-form (Dict[str, Any]) fields"""
+    schema = _strict_json_schema(model)
+    return json.loads(schema) if schema is not None else None
+
+def _sketch(node: Dict[str, Any], defs: Dict[str, Any], parent_description: str = None) -> Any:
+    """Reduce a JSON schema node to a compact example-style sketch"""
+    description = node.get('description') or parent_description
+    if '$ref' in node:
+        node = defs[node['$ref'].split('/')[-1]]
+    if 'anyOf' in node:
+        options = [option for option in node['anyOf'] if option.get('type') != 'null']
+        node = options[0] if options else {}
+    
+    if 'enum' in node:
+        return '|'.join(str(value) for value in node['enum'])
+    node_type = node.get('type', 'any')
+    if node_type == 'object':
+        if node.get('properties'):
+            return {name: _sketch(sub_schema, defs) for name, sub_schema in node['properties'].items()}
+        return f"object, {description}" if description else "object"
+    if node_type == 'array':
+        return [_sketch(node.get('items', {}), defs, description)]
+    
+    if node_type == 'integer' and ('minimum' in node or 'maximum' in node):
+        node_type = f"integer {node.get('minimum', '')}-{node.get('maximum', '')}"
+    return f"{node_type}, {description}" if description else node_type
+
+@lru_cache(maxsize=None)
+def compact_schema(model: Type[BaseModel]) -> str:
+    """Compact, token-light description of a model's JSON shape for prompts"""
+    schema = model.model_json_schema()
+    return json.dumps(_sketch(schema, schema.get('$defs', {})), separators=(',', ':'))
+
+# Rough completion tokens per JSON value, used to size max_tokens from a response model
+VALUE_TOKENS = {'string': 40, 'scalar': 4, 'key': 4, 'free_object': 250}
+DEFAULT_ARRAY_ITEMS = 5
+
+def _estimate_tokens(node: Dict[str, Any], defs: Dict[str, Any]) -> int:
+    """Expected completion tokens of a JSON value matching a schema node"""
+    if '$ref' in node:
+        node = defs[node['$ref'].split('/')[-1]]
+    if 'anyOf' in node:
+        options = [option for option in node['anyOf'] if option.get('type') != 'null']
+        node = options[0] if options else {}
+    
+    if 'enum' in node:
+        return VALUE_TOKENS['scalar']
+    node_type = node.get('type')
+    if node_type == 'object':
+        if node.get('properties'):
+            return sum(VALUE_TOKENS['key'] + _estimate_tokens(sub_schema, defs)
+                       for sub_schema in node['properties'].values())
+        return VALUE_TOKENS['free_object']
+    if node_type == 'array':
+        return node.get('maxItems', DEFAULT_ARRAY_ITEMS) * _estimate_tokens(node.get('items', {}), defs)
+    if node_type == 'string':
+        return VALUE_TOKENS['string']
+    return VALUE_TOKENS['scalar']
+
+@lru_cache(maxsize=None)
+def expected_completion_tokens(model: Type[BaseModel]) -> int:
+    """Expected size of a model's JSON response in tokens, estimated from its schema"""
+    schema = model.model_json_schema()
+    return _estimate_tokens(schema, schema.get('$defs', {}))
@@ -32,16 +32,10 @@ class SuggesterAgent(BaseAgent):
         # Build context string from the provided context
         context_str = self._build_context_string(context)
         
-        prompt = f"""
+        instructions = """
         You are an expert assistant that provides helpful answer suggestions for users.
         
-        CONTEXT:
-        - Agent Type: {agent_type}
-        - Question Context: {context_str}
-        
-        QUESTION: {question}
-        
-        Based on the context and the type of agent asking this question, provide {max_suggestions} realistic and helpful answer suggestions that a user might give.
+        Based on the context and the type of agent asking this question, provide the requested number of realistic and helpful answer suggestions that a user might give.
         
         Consider:
         1. The type of agent asking (clarifier, validator, researcher, etc.)
@@ -49,98 +43,52 @@ class SuggesterAgent(BaseAgent):
         3. What information would be most valuable for that agent
         4. Realistic user responses that would help move the conversation forward
 
-        Please respond with valid JSON format containing:
-        - suggestions: Array of suggestion objects with suggestion, context, and category fields
-        - context_analysis: Brief description of what context was considered
-        - recommendation_priority: Priority recommendation as a string (e.g., "high", "medium", "low", or descriptive text)
-
-        For the category field, use one of: "specific", "general", "detailed", "brief"
-        IMPORTANT: recommendation_priority must be a string, not a number.
+        For each suggestion's category, use one of: "specific", "general", "detailed", "brief"
         """
         
-        messages = [
-            {"role": "system", "content": "You are an expert at providing helpful answer suggestions that move conversations forward productively."},
-            {"role": "user", "content": prompt}
-        ]
+        prompt = f"""
+        CONTEXT:
+        - Agent Type: {agent_type}
+        - Question Context: {context_str}
         
-        try:
-            # Try structured output first
-            result = self.call_llm_structured(messages, SuggestionsResponse, temperature=0.7)
-            
-            if result:
-                # Convert Pydantic model to dict for compatibility with expected structure
-                suggestions_data = {
-                    "suggestions": [
-                        {
-                            "text": s.suggestion,
-                            "reasoning": s.context,
-                            "category": s.category
-                        } for s in result.suggestions
-                    ],
-                    "context_used": result.context_analysis,
-                    "agent_type": agent_type,
-                    "question": question,
-                    "recommendation_priority": str(result.recommendation_priority) if result.recommendation_priority else "medium"
-                }
-                
-                # Add to context history
-                self.context_history.append({
-                    "question": question,
-                    "agent_type": agent_type,
-                    "suggestions": suggestions_data.get("suggestions", []),
-                    "timestamp": self._get_timestamp()
-                })
-                
-                self.log_activity(f"Generated {len(result.suggestions)} suggestions for {agent_type} agent")
-                return suggestions_data
-                
-        except Exception as e:
-            print(f"Error generating suggestions with structured output: {e}")
+        QUESTION: {question}
         
-        # Fallback to regular LLM call
-        response = self.call_llm(messages, temperature=0.7)
-        result = self.parse_json_response(response)
+        NUMBER OF SUGGESTIONS: {max_suggestions}
+        """
         
-        if result:
-            # Ensure the result has the expected structure
-            if "suggestions" in result:
-                # Convert suggestions to expected format if needed
-                suggestions = result.get("suggestions", [])
-                formatted_suggestions = []
-                for suggestion in suggestions:
-                    if isinstance(suggestion, dict):
-                        formatted_suggestion = {
-                            "text": suggestion.get("text", suggestion.get("suggestion", "No suggestion")),
-                            "reasoning": suggestion.get("reasoning", suggestion.get("context", "No reasoning")),
-                            "category": suggestion.get("category", "general")
-                        }
-                        formatted_suggestions.append(formatted_suggestion)
-                    else:
-                        # Handle case where suggestion is just a string
-                        formatted_suggestions.append({
-                            "text": str(suggestion),
-                            "reasoning": "Generated suggestion",
-                            "category": "general"
-                        })
-                result["suggestions"] = formatted_suggestions
-            
-            # Ensure recommendation_priority is a string
-            if "recommendation_priority" in result:
-                result["recommendation_priority"] = str(result["recommendation_priority"])
-            else:
-                result["recommendation_priority"] = "medium"
+        messages = self.prompt_messages("You are an expert at providing helpful answer suggestions that move conversations forward productively.", instructions, prompt)
+        
+        # Strict structured output; a failed call is not retried unstructured
+        result = self.call_llm_structured(messages, SuggestionsResponse, temperature=0.7, method='generate_suggestions')
             
+        if result:
+            # Convert Pydantic model to dict for compatibility with expected structure
+            suggestions_data = {
+                "suggestions": [
+                    {
+                        "text": s.suggestion,
+                        "reasoning": s.context,
+                        "category": s.category
+                    } for s in result.suggestions
+                ],
+                "context_used": result.context_analysis,
+                "agent_type": agent_type,
+                "question": question,
+                "recommendation_priority": str(result.recommendation_priority) if result.recommendation_priority else "medium"
+            }
+                
             # Add to context history
             self.context_history.append({
                 "question": question,
                 "agent_type": agent_type,
-                "suggestions": result.get("suggestions", []),
+                "suggestions": suggestions_data.get("suggestions", []),
                 "timestamp": self._get_timestamp()
             })
-            
-            self.log_activity(f"Generated {len(result.get('suggestions', []))} suggestions for {agent_type} agent")
-        
-        return result or {"error": "Failed to generate suggestions"}
+                
+            self.log_activity(f"Generated {len(result.suggestions)} suggestions for {agent_type} agent")
+            return suggestions_data
+                
+        return {"error": "Failed to generate suggestions"}
     
     def _build_context_string(self, context: Dict[str, Any]) -> str:
         """Build a readable context string from the context dictionary"""
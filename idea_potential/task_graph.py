@@ -0,0 +1,159 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+from idea_potential.config import AGENT_MAX_CONCURRENCY
+from idea_potential.llm_errors import LLMCallError
+
+# Stop flags of the graph steps the current code runs in: the step's own (set on timeout) and
+# one per enclosing graph (set when it fails)
+_cancel_flags: contextvars.ContextVar[Tuple[threading.Event, ...]] = contextvars.ContextVar('task_graph_cancel_flags',
+                                                                                           default=())
+
+
+def cancellation_requested() -> bool:
+    """Whether the graph step running this code has timed out or a graph it runs in has failed"""
+    return any(flag.is_set() for flag in _cancel_flags.get())
+
+
+@dataclass
+class Step:
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Sequence[str]
+    timeout: Optional[float] = None
+    tolerate_errors: bool = False
+
+
+class TaskGraph:
+    """Runs named steps as soon as their dependencies have finished, independent steps concurrently.
+    
+    Each step gets a dict of its dependencies' results. Steps run on worker threads with a copy of
+    the caller's context, so the usage ledger and batch sessions see them like serial calls. An
+    exception in a step is raised from run() unless the step tolerates errors; a tolerated failure,
+    or a step that runs past its timeout, gets an error dict as its result and its dependents go
+    ahead without it. When run() raises, the steps still running are told to stop (their next LLM
+    call fails, one in flight is cancelled) and run() waits for them, so none of them keeps calling
+    the LLM or writing checkpoints after the failure.
+    
+    A timed-out step is told to stop the same way, but run() doesn't wait for it, so a timeout is
+    not a hard bound on the work done: tokens of the cancelled call may still be billed, and work
+    other than LLM calls (e.g. Reddit requests) carries on until the step returns.
+    """
+    
+    def __init__(self, name: str = "graph", max_concurrency: int = AGENT_MAX_CONCURRENCY):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.steps: Dict[str, Step] = {}
+        self.timings: Dict[str, float] = {}
+    
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Sequence[str] = (),
+            timeout: Optional[float] = None, tolerate_errors: bool = False) -> 'TaskGraph':
+        if name in self.steps:
+            raise ValueError(f"Duplicate step '{name}' in {self.name}")
+        self.steps[name] = Step(name, fn, tuple(deps), timeout, tolerate_errors)
+        return self
+    
+    def _order(self) -> List[str]:
+        """Step names in dependency order, rejecting unknown dependencies and cycles"""
+        for step in self.steps.values():
+            unknown = [dep for dep in step.deps if dep not in self.steps]
+            if unknown:
+                raise ValueError(f"Step '{step.name}' in {self.name} depends on unknown steps {unknown}")
+        order: List[str] = []
+        remaining = dict(self.steps)
+        while remaining:
+            ready = [name for name, step in remaining.items() if all(dep in order for dep in step.deps)]
+            if not ready:
+                raise ValueError(f"Dependency cycle in {self.name} between {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+    
+    def run(self) -> Dict[str, Any]:
+        """Run every step and return their results by name"""
+        # Fail on unknown dependencies and cycles before anything runs
+        self._order()
+        results: Dict[str, Any] = {}
+        pending = dict(self.steps)
+        running: Dict[Future, str] = {}
+        started: Dict[str, float] = {}
+        # max_concurrency is enforced by the loop below; a thread per step keeps a timed-out step,
+        # which may still be winding down, from holding up the steps submitted after it
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.steps)), thread_name_prefix=self.name)
+        stop_flags: Dict[str, threading.Event] = {}
+        # Set when the run fails; checked by the steps' LLM calls, including those of nested graphs
+        failed = threading.Event()
+        
+        try:
+            while pending or running:
+                for name, step in list(pending.items()):
+                    if len(running) >= self.max_concurrency:
+                        break
+                    if all(dep in results for dep in step.deps):
+                        inputs = {dep: results[dep] for dep in step.deps}
+                        stop_flags[name] = threading.Event()
+                        context = contextvars.copy_context()
+                        context.run(_cancel_flags.set, _cancel_flags.get() + (failed, stop_flags[name]))
+                        future = executor.submit(context.run, step.fn, inputs)
+                        running[future] = name
+                        started[name] = time.monotonic()
+                        del pending[name]
+                
+                deadlines = [started[name] + self.steps[name].timeout for name in running.values()
+                             if self.steps[name].timeout is not None]
+                wait_seconds = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                done, _ = wait(running, timeout=wait_seconds, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name = running.pop(future)
+                    self.timings[name] = round(time.monotonic() - started[name], 3)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        # Bad credentials or an exhausted quota fail every call, so they always stop the run
+                        if not self.steps[name].tolerate_errors or (isinstance(e, LLMCallError) and e.fatal):
+                            raise
+                        results[name] = {"error": f"{name} failed: {e}"}
+                        print(f"[GRAPH] {self.name}.{name}: failed ({e}), continuing without it")
+                
+                now = time.monotonic()
+                for future, name in list(running.items()):
+                    timeout = self.steps[name].timeout
+                    if timeout is not None and now - started[name] >= timeout:
+                        # Cancel the step's LLM calls; whatever it returns is ignored
+                        stop_flags[name].set()
+                        del running[future]
+                        self.timings[name] = round(now - started[name], 3)
+                        results[name] = {"error": f"{name} timed out after {timeout:.0f}s"}
+                        print(f"[GRAPH] {self.name}.{name}: timed out after {timeout:.0f}s, stopping it and continuing without it")
+        except BaseException:
+            failed.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        # Steps that timed out have been told to stop and are left to wind down on their own
+        executor.shutdown(wait=False)
+        
+        return results
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """The chain of dependent steps that took longest in the last run, and its duration"""
+        finished: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self._order():
+            deps = [dep for dep in self.steps[name].deps if dep in finished]
+            slowest = max(deps, key=lambda dep: finished[dep], default=None)
+            previous[name] = slowest
+            finished[name] = (finished[slowest] if slowest else 0.0) + self.timings.get(name, 0.0)
+        if not finished:
+            return [], 0.0
+        name = max(finished, key=finished.get)
+        total = finished[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], round(total, 3)
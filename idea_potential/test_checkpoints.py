@@ -0,0 +1,143 @@
+"""
+Test run checkpoints and resuming a stopped pipeline run: finished steps are skipped, the rest re-run
+"""
+
+import pytest
+
+from idea_potential import pipeline as pipeline_module
+from idea_potential.checkpoints import RunCheckpoint
+from idea_potential.pipeline import IdeaPotentialPipeline
+from idea_potential.report_agent import ReportAgent
+
+CLARIFICATION = {"refined_idea": "Meal planning for shift workers", "target_market": "Nurses"}
+
+
+def test_checkpoint_round_trip(tmp_path):
+    """Saved steps load back and are listed as completed; the manifest isn't a step"""
+    checkpoint = RunCheckpoint("run", root=str(tmp_path))
+    assert checkpoint.load("research") is None
+    assert checkpoint.completed_steps() == []
+    
+    checkpoint.save("research", {"pain_points": ["no time"]})
+    checkpoint.update_manifest(idea="idea", status="running")
+    checkpoint.update_manifest(status="failed")
+    
+    assert checkpoint.load("research") == {"pain_points": ["no time"]}
+    assert checkpoint.completed_steps() == ["research"]
+    assert checkpoint.manifest()["idea"] == "idea"
+    assert checkpoint.manifest()["status"] == "failed"
+
+
+def test_unreadable_checkpoint_counts_as_missing(tmp_path):
+    """A corrupt step file is ignored, so the step is simply run again"""
+    checkpoint = RunCheckpoint("run", root=str(tmp_path))
+    checkpoint.save("research", {"ok": True})
+    with open(f"{checkpoint.directory}/research.json", "w", encoding="utf-8") as f:
+        f.write('{"step": "resea')
+    assert checkpoint.load("research") is None
+
+
+@pytest.fixture
+def steps(tmp_path, monkeypatch):
+    """Replace every agent call of the pipeline with a fake step that records when it runs.
+    
+    Steps named in steps.crash raise once, like a run that stopped part way through.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pipeline_module, "get_step_cache", lambda: None)
+    monkeypatch.setattr(pipeline_module, "get_llm_cache", lambda: None)
+    
+    class Steps:
+        ran = []
+        crash = set()
+        
+        @classmethod
+        def fake(cls, name, result):
+            def run(*args, **kwargs):
+                cls.ran.append(name)
+                if name in cls.crash:
+                    cls.crash.discard(name)
+                    raise RuntimeError(f"{name} interrupted")
+                return result
+            return run
+    
+    for method, name, result in [
+        ("clarify_idea", "clarification", CLARIFICATION),
+        ("_clarify_interactively", "clarification", CLARIFICATION),
+        ("conduct_research", "research", {"pain_points": ["no time"]}),
+        ("create_validation_matrix", "validation", {"validation_matrix": {"score": 7}}),
+        ("create_roadmap", "roadmap", {"phases": []}),
+        ("generate_report", "report", {"report_data": {"summary": "ok"}}),
+    ]:
+        monkeypatch.setattr(IdeaPotentialPipeline, method, staticmethod(Steps.fake(name, result)))
+    monkeypatch.setattr(ReportAgent, "create_financial_models",
+                        staticmethod(Steps.fake("financial_models", {"revenue": []})))
+    return Steps
+
+
+def new_pipeline(**agents):
+    return IdeaPotentialPipeline(**agents, run_id="run-1", checkpoint=True)
+
+
+def test_resume_skips_finished_steps(steps):
+    """A resumed standard run re-runs only the steps that hadn't finished"""
+    steps.crash = {"validation"}
+    with pytest.raises(RuntimeError, match="validation interrupted"):
+        new_pipeline().start_analysis("Meal planning app")
+    assert RunCheckpoint("run-1").completed_steps() == ["clarification", "research"]
+    
+    steps.ran.clear()
+    result = IdeaPotentialPipeline.resume("run-1")
+    
+    assert "error" not in result
+    assert steps.ran == ["validation", "financial_models", "report"]
+    manifest = RunCheckpoint("run-1").manifest()
+    assert (manifest["mode"], manifest["status"]) == ("standard", "completed")
+
+
+def test_resume_after_failed_step(steps, monkeypatch):
+    """A run stopped by a failed required step picks up at that step"""
+    monkeypatch.setattr(IdeaPotentialPipeline, "create_roadmap",
+                        staticmethod(steps.fake("roadmap", {"error": "model refused"})))
+    result = new_pipeline(use_roadmap_agent=True).start_analysis("Meal planning app")
+    assert "Roadmap creation failed" in result["error"]
+    assert RunCheckpoint("run-1").manifest()["status"] == "failed"
+    
+    monkeypatch.setattr(IdeaPotentialPipeline, "create_roadmap", staticmethod(steps.fake("roadmap", {"phases": []})))
+    steps.ran.clear()
+    assert "error" not in IdeaPotentialPipeline.resume("run-1")
+    # The agents the run was started with come back from the manifest
+    assert steps.ran == ["roadmap", "report"]
+
+
+def test_resume_interactive_run_keeps_answers(steps):
+    """A resumed interactive run doesn't ask its clarifying questions again"""
+    steps.crash = {"research"}
+    result = new_pipeline().run_interactive_analysis("Meal planning app")
+    assert "research interrupted" in result["error"]
+    assert RunCheckpoint("run-1").manifest()["mode"] == "interactive"
+    
+    steps.ran.clear()
+    assert "error" not in IdeaPotentialPipeline.resume("run-1")
+    assert steps.ran == ["research", "validation", "financial_models", "report"]
+    assert RunCheckpoint("run-1").manifest()["mode"] == "interactive"
+
+
+def test_resume_clarified_run_starts_from_its_clarification(steps):
+    """A resumed what-if run continues from the clarification it was given, without clarifying"""
+    steps.crash = {"report"}
+    with pytest.raises(RuntimeError, match="report interrupted"):
+        new_pipeline().analyze_clarification(CLARIFICATION)
+    assert RunCheckpoint("run-1").manifest()["mode"] == "clarified"
+    
+    steps.ran.clear()
+    result = IdeaPotentialPipeline.resume("run-1")
+    assert "error" not in result
+    assert result["idea_summary"] == CLARIFICATION["refined_idea"]
+    assert steps.ran == ["report"]
+    assert RunCheckpoint("run-1").manifest()["mode"] == "clarified"
+
+
+def test_resume_unknown_run(steps):
+    """Resuming a run without a checkpoint reports an error instead of starting over"""
+    assert "No checkpointed run" in IdeaPotentialPipeline.resume("missing")["error"]
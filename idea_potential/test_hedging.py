@@ -0,0 +1,131 @@
+"""
+Test request hedging with fake senders: which response wins, the hedge budget and cancellation
+"""
+
+import asyncio
+
+import pytest
+
+from idea_potential.config import HEDGE_CONFIG
+from idea_potential.hedging import Hedger
+
+
+def make_hedger(**overrides):
+    """A hedger that sends its duplicate after 0.05s"""
+    config = dict(HEDGE_CONFIG, enabled=True, default_delay_seconds=0.05, min_delay_seconds=0.0)
+    config.update(overrides)
+    return Hedger(config)
+
+
+class FakeSender:
+    """send() for Hedger.run: the n-th request answers f"response {n}" after delays[n] seconds"""
+    
+    def __init__(self, *delays):
+        self.delays = delays
+        self.sent = 0
+        self.cancelled = []
+    
+    async def __call__(self):
+        number = self.sent
+        self.sent += 1
+        try:
+            await asyncio.sleep(self.delays[number])
+        except asyncio.CancelledError:
+            self.cancelled.append(number)
+            raise
+        return f"response {number}"
+
+
+def test_fast_primary_is_not_hedged():
+    """A primary that answers within the hedge delay is the only request sent"""
+    hedger = make_hedger()
+    send = FakeSender(0.01)
+    
+    assert asyncio.run(hedger.run("gpt-4o", "generate_suggestions", send)) == "response 0"
+    assert send.sent == 1
+    assert hedger.stats()["hedges"] == 0
+
+
+def test_primary_wins_the_race():
+    """A slow primary that still beats its duplicate is used and the duplicate is cancelled"""
+    hedger = make_hedger()
+    send = FakeSender(0.1, 1.0)
+    discarded = []
+    
+    result = asyncio.run(hedger.run("gpt-4o", "generate_suggestions", send,
+                                    on_discarded=lambda winner, loser: discarded.append((winner, loser))))
+    
+    assert result == "response 0"
+    assert send.sent == 2
+    assert send.cancelled == [1]
+    assert discarded == [("response 0", None)]
+    assert hedger.stats()["hedges"] == 1
+    assert hedger.stats()["hedge_wins"] == 0
+
+
+def test_hedge_wins_the_race():
+    """A duplicate that answers first is used and the stuck primary is cancelled"""
+    hedger = make_hedger()
+    send = FakeSender(1.0, 0.01)
+    
+    assert asyncio.run(hedger.run("gpt-4o", "generate_suggestions", send)) == "response 1"
+    assert send.cancelled == [0]
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_failed_request_falls_back_to_the_other():
+    """If one of the racing requests fails, the other one's response is used"""
+    hedger = make_hedger()
+    send = FakeSender(0.2, 0.01)
+    
+    async def primary_fails():
+        if send.sent == 0:
+            send.sent += 1
+            await asyncio.sleep(0.1)
+            raise RuntimeError("server error")
+        return await send()
+    
+    assert asyncio.run(hedger.run("gpt-4o", "generate_suggestions", primary_fails)) == "response 1"
+
+
+def test_no_duplicate_when_budget_is_exhausted():
+    """Past the hedge budget a slow primary is simply awaited"""
+    hedger = make_hedger(budget_ratio=0.0)
+    first = FakeSender(0.2, 0.01)
+    second = FakeSender(0.2)
+    
+    assert asyncio.run(hedger.run("gpt-4o", "generate_suggestions", first)) == "response 1"
+    assert asyncio.run(hedger.run("gpt-4o", "generate_suggestions", second)) == "response 0"
+    assert second.sent == 1
+    assert hedger.stats()["over_budget"] == 1
+
+
+def test_no_duplicate_without_rate_limit_capacity():
+    """A hedge that can't reserve rate limit capacity is given back to the budget"""
+    hedger = make_hedger()
+    send = FakeSender(0.2)
+    
+    assert asyncio.run(hedger.run("gpt-4o", "generate_suggestions", send, reserve=lambda: False)) == "response 0"
+    assert send.sent == 1
+    assert hedger.stats()["hedges"] == 0
+    assert hedger.stats()["rate_limited"] == 1
+
+
+@pytest.mark.parametrize("cancel_after", [0.02, 0.1])
+def test_cancelled_caller_cancels_its_requests(cancel_after):
+    """Cancelling the caller, before or after the duplicate is sent, cancels every request in flight"""
+    hedger = make_hedger()
+    send = FakeSender(1.0, 1.0)
+    
+    async def cancel_caller():
+        caller = asyncio.ensure_future(hedger.run("gpt-4o", "generate_suggestions", send))
+        await asyncio.sleep(cancel_after)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run() exits, which would cancel leftover tasks anyway
+        return sorted(send.cancelled)
+    
+    assert asyncio.run(cancel_caller()) == list(range(send.sent))
+    assert send.sent == (1 if cancel_after < 0.05 else 2)
@@ -0,0 +1,124 @@
+"""
+Test the disk-backed LLM response cache: TTL expiry, LRU eviction and cache keys
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from idea_potential import llm_cache
+from idea_potential.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock in place of time.time() for the cache"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def make_cache(tmp_path, **kwargs):
+    return LLMResponseCache(str(tmp_path / "cache" / "responses.sqlite3"), **kwargs)
+
+
+REQUEST = {
+    "model": "gpt-4o",
+    "messages": [{"role": "system", "content": "You are an analyst."}, {"role": "user", "content": "Score this idea."}],
+    "temperature": 0.7,
+    "response_format": {"type": "json_object"},
+}
+
+
+def test_round_trip_and_stats(tmp_path):
+    """A stored value comes back equal, and lookups are counted"""
+    cache = make_cache(tmp_path)
+    assert cache.get("missing") is None
+    cache.set("key", {"content": "ok", "usage": {"prompt_tokens": 3}})
+    assert cache.get("key") == {"content": "ok", "usage": {"prompt_tokens": 3}}
+    
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_entry_expires_after_ttl(tmp_path, clock):
+    """An entry is served up to its TTL, then treated as a miss and removed"""
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("key", {"content": "ok"})
+    
+    clock.value += 60
+    assert cache.get("key") == {"content": "ok"}
+    clock.value += 1
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_reads_do_not_extend_ttl(tmp_path, clock):
+    """The TTL counts from when the entry was written, not when it was last read"""
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("key", {"content": "ok"})
+    for _ in range(3):
+        clock.value += 30
+        cache.get("key")
+    assert cache.get("key") is None
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    """Beyond max_entries the entries read or written longest ago go first"""
+    cache = make_cache(tmp_path, max_entries=3)
+    for key in ("a", "b", "c"):
+        clock.value += 1
+        cache.set(key, {"content": key})
+    
+    clock.value += 1
+    cache.get("a")
+    clock.value += 1
+    cache.set("d", {"content": "d"})
+    assert cache.get("b") is None
+    
+    clock.value += 1
+    cache.set("e", {"content": "e"})
+    assert cache.get("c") is None
+    assert [cache.get(key) is not None for key in ("a", "d", "e")] == [True, True, True]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_survive_reopening(tmp_path):
+    """The cache is on disk, so a new instance on the same path sees earlier entries"""
+    make_cache(tmp_path).set("key", {"content": "ok"})
+    assert make_cache(tmp_path).get("key") == {"content": "ok"}
+
+
+def test_key_ignores_dict_order_and_unrelated_fields():
+    """Keys depend on what determines the response, not on how the request dict was built"""
+    reordered = {
+        "response_format": {"type": "json_object"},
+        "temperature": 0.7,
+        "messages": [{"content": "You are an analyst.", "role": "system"}, {"content": "Score this idea.", "role": "user"}],
+        "model": "gpt-4o",
+        "stream": True,
+    }
+    assert LLMResponseCache.make_key(reordered) == LLMResponseCache.make_key(REQUEST)
+
+
+@pytest.mark.parametrize("change", [
+    {"model": "gpt-4o-mini"},
+    {"temperature": 0.2},
+    {"messages": REQUEST["messages"][:1]},
+    {"response_format": None},
+])
+def test_key_changes_with_request(change):
+    """Any field that affects the response gives a different key"""
+    assert LLMResponseCache.make_key(dict(REQUEST, **change)) != LLMResponseCache.make_key(REQUEST)
+
+
+def test_key_changes_with_schema():
+    """The same request validated against another schema is cached separately"""
+    schema = {"type": "object", "required": ["score"]}
+    assert LLMResponseCache.make_key(REQUEST, schema) != LLMResponseCache.make_key(REQUEST)
+    assert LLMResponseCache.make_key(REQUEST, schema) != LLMResponseCache.make_key(REQUEST, {"type": "object"})
+
+
+def test_key_is_stable_across_runs():
+    """Keys are a fixed hash, so a cache written by an earlier run keeps hitting"""
+    assert LLMResponseCache.make_key(REQUEST) == "4666bec8561f0e7a4e6d147d2e075339aa6c3b0027ebf4bf22aaf62befdb6345"
@@ -0,0 +1,102 @@
+"""
+Test the client-side token buckets and per-model rate limiters
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from idea_potential.rate_limiter import ModelRateLimiter, RateLimiter, TokenBucket
+
+
+def test_bucket_take_is_capped_at_capacity():
+    """take() removes at most a full bucket and reports what it removed"""
+    bucket = TokenBucket(1000)
+    assert bucket.take(300) == 300
+    assert bucket.level == 700
+    assert bucket.take(5000) == 1000
+    assert bucket.level == -300
+
+
+def test_bucket_refills_continuously_up_to_capacity():
+    """The level grows by capacity/60 per second and never beyond capacity"""
+    bucket = TokenBucket(600)
+    bucket.take(600)
+    bucket.refill(bucket.updated + 30)
+    assert bucket.level == pytest.approx(300)
+    bucket.refill(bucket.updated + 600)
+    assert bucket.level == 600
+
+
+def test_bucket_wait_time():
+    """wait_time() is the time until the amount (at most a full bucket) is available"""
+    bucket = TokenBucket(600)
+    assert bucket.wait_time(600) == 0
+    bucket.take(600)
+    assert bucket.wait_time(100) == pytest.approx(10)
+    # An amount over capacity only waits for a full bucket
+    assert bucket.wait_time(6000) == pytest.approx(60)
+
+
+def test_bucket_give_back_is_capped():
+    """Returned units don't push the level over capacity"""
+    bucket = TokenBucket(1000)
+    bucket.take(100)
+    bucket.give_back(500)
+    assert bucket.level == 1000
+
+
+def test_acquire_reserves_requests_and_tokens():
+    """A request that fits is admitted immediately and reserves its estimate"""
+    limiter = ModelRateLimiter("gpt-4o", rpm=10, tpm=10000)
+    waited, reserved = asyncio.run(limiter.acquire(4000))
+    assert waited < 0.1
+    assert reserved == 4000
+    status = limiter.status()
+    assert status["requests_available"] == 9
+    assert 6000 <= status["tokens_available"] < 6010
+
+
+def test_acquire_waits_for_refill():
+    """A request that doesn't fit waits until the bucket has refilled enough"""
+    limiter = ModelRateLimiter("gpt-4o", rpm=100, tpm=600)
+    asyncio.run(limiter.acquire(600))
+    started = time.monotonic()
+    waited, reserved = asyncio.run(limiter.acquire(5))
+    assert 0.3 < time.monotonic() - started < 2
+    assert waited == pytest.approx(time.monotonic() - started, abs=0.1)
+    assert reserved == 5
+
+
+def test_settle_works_from_the_capped_reservation():
+    """An estimate over capacity reserves a full bucket, and settling credits back from that"""
+    limiter = ModelRateLimiter("gpt-4o", rpm=10, tpm=30000)
+    _, reserved = asyncio.run(limiter.acquire(40000))
+    assert reserved == 30000
+    limiter.settle(reserved, 10000)
+    assert 20000 <= limiter.status()["tokens_available"] < 20010
+
+
+def test_settle_charges_usage_over_the_reservation():
+    """A request that used more than it reserved takes the difference, possibly below zero"""
+    limiter = ModelRateLimiter("gpt-4o", rpm=10, tpm=10000)
+    _, reserved = asyncio.run(limiter.acquire(8000))
+    limiter.settle(reserved, 12000)
+    assert limiter.tokens.level < -1990
+
+
+def test_try_acquire_never_waits():
+    """try_acquire() reserves only when the request fits now and leaves the buckets alone otherwise"""
+    limiter = ModelRateLimiter("gpt-4o", rpm=10, tpm=1000)
+    assert limiter.try_acquire(800) == 800
+    assert limiter.try_acquire(800) is None
+    assert limiter.status()["requests_available"] == 9
+
+
+def test_limiter_registry_matches_dated_snapshots():
+    """Dated model snapshots share their base model's limiter; unknown models are unlimited"""
+    registry = RateLimiter({"gpt-4o": {"rpm": 10, "tpm": 1000}, "gpt-4o-mini": {"rpm": 20, "tpm": 2000}})
+    assert registry.for_model("gpt-4o-2024-08-06") is registry.for_model("gpt-4o")
+    assert registry.for_model("gpt-4o-mini-2024-07-18").model == "gpt-4o-mini"
+    assert registry.for_model("o1") is None
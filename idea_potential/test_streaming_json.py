@@ -0,0 +1,101 @@
+"""
+Test the incremental JSON parser on streamed chunks: split tokens, escapes and nesting
+"""
+
+import json
+
+import pytest
+
+from idea_potential.streaming_json import IncrementalJSONParser
+
+
+DOCUMENT = json.dumps({
+    "summary": "Say \"hi\" to {braces}, [brackets] and a back\\slash",
+    "score": -12.5,
+    "viable": True,
+    "notes": None,
+    "swot_analysis": {
+        "strengths": ["fast", "cheap"],
+        "threats": {"level": 3, "sources": [{"name": "incumbents"}]},
+    },
+    "tags": [1, {"nested": "in a list"}],
+})
+
+
+def feed_in_chunks(parser, text, size):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+def expected_fields(document):
+    """Every object field up to two levels deep, as the parser should report it"""
+    fields = {}
+    for key, value in document.items():
+        fields[key] = value
+        if isinstance(value, dict):
+            for child, child_value in value.items():
+                fields[f"{key}.{child}"] = child_value
+    return fields
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(DOCUMENT)])
+def test_chunk_boundaries_do_not_matter(size):
+    """Splitting the stream anywhere, even inside tokens and escapes, gives the same fields"""
+    parser = IncrementalJSONParser()
+    completed = feed_in_chunks(parser, DOCUMENT, size)
+    assert dict(completed) == expected_fields(json.loads(DOCUMENT))
+    assert len(completed) == len(parser.fields)
+
+
+def test_escaped_quote_split_across_chunks():
+    """A backslash at the end of a chunk still escapes the quote that starts the next one"""
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"quote": "she said \\') == []
+    assert parser.feed('"no\\') == []
+    assert parser.feed('" twice", "next": 1}') == [("quote", 'she said "no" twice'), ("next", 1)]
+
+
+def test_field_reported_as_soon_as_its_value_closes():
+    """Each field is reported by the chunk that completes it, through the callback as well"""
+    seen = []
+    parser = IncrementalJSONParser(on_field=lambda name, value: seen.append(name))
+    assert parser.feed('{"title": "Idea"') == [("title", "Idea")]
+    # A number only ends at the next delimiter
+    assert parser.feed(', "score": 7') == []
+    assert parser.feed('5, "market": {"size": "large"') == [("score", 75), ("market.size", "large")]
+    assert parser.feed('}}') == [("market", {"size": "large"})]
+    assert seen == ["title", "score", "market.size", "market"]
+
+
+def test_nested_fields_follow_max_depth():
+    """Fields deeper than max_depth are only reported as part of their parent"""
+    text = '{"a": {"b": {"c": {"d": 1}}}}'
+    assert [name for name, _ in IncrementalJSONParser().feed(text)] == ["a.b", "a"]
+    assert [name for name, _ in IncrementalJSONParser(max_depth=3).feed(text)] == ["a.b.c", "a.b", "a"]
+
+
+def test_text_around_the_object_is_ignored():
+    """A code fence before the object and anything after it don't produce fields"""
+    parser = IncrementalJSONParser()
+    completed = feed_in_chunks(parser, '```json\n{"ok": true}\n```\n{"later": 1}', 4)
+    assert completed == [("ok", True)]
+
+
+def test_reset_keeps_reported_fields():
+    """After a retried stream starts over, fields reported by the first attempt aren't repeated"""
+    parser = IncrementalJSONParser()
+    parser.feed('{"first": 1, "second": "partial')
+    parser.reset()
+    assert parser.feed('{"first": 1, "second": "done"}') == [("second", "done")]
+    assert parser.fields == {"first": 1, "second": "done"}
+
+
+def test_failing_callback_does_not_stop_parsing():
+    """An exception in on_field is reported and parsing carries on"""
+    def callback(name, value):
+        raise RuntimeError("display failed")
+    
+    parser = IncrementalJSONParser(on_field=callback)
+    assert parser.feed('{"a": 1, "b": 2}') == [("a", 1), ("b", 2)]
@@ -0,0 +1,235 @@
+"""
+Test the task graph scheduler: dependency order, failures, timeouts and stopping running steps
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from idea_potential.base_agent import BaseAgent
+from idea_potential.llm_errors import LLMCallError
+from idea_potential.task_graph import TaskGraph, cancellation_requested
+
+
+def recorder():
+    """A step factory that logs when each step starts and finishes"""
+    events = []
+    lock = threading.Lock()
+    
+    def step(name, seconds=0.0, result=None):
+        def run(inputs):
+            with lock:
+                events.append(("start", name))
+            time.sleep(seconds)
+            with lock:
+                events.append(("end", name))
+            return result if result is not None else {"name": name, "inputs": sorted(inputs)}
+        return run
+    
+    return events, step
+
+
+def test_dependencies_finish_before_dependents_start():
+    """A step starts only after all its dependencies finished, and receives their results"""
+    events, step = recorder()
+    graph = TaskGraph("test", max_concurrency=4)
+    graph.add("research", step("research", 0.05))
+    graph.add("competitors", step("competitors", 0.05), deps=["research"])
+    graph.add("market", step("market", 0.05), deps=["research"])
+    graph.add("matrix", step("matrix"), deps=["competitors", "market"])
+    
+    results = graph.run()
+    
+    position = {event: index for index, event in enumerate(events)}
+    assert position[("end", "research")] < position[("start", "competitors")]
+    assert position[("end", "research")] < position[("start", "market")]
+    assert position[("end", "competitors")] < position[("start", "matrix")]
+    assert position[("end", "market")] < position[("start", "matrix")]
+    assert results["matrix"]["inputs"] == ["competitors", "market"]
+
+
+def test_independent_steps_run_concurrently():
+    """Steps without dependencies between them overlap"""
+    graph = TaskGraph("test", max_concurrency=3)
+    for name in ("a", "b", "c"):
+        graph.add(name, lambda _: time.sleep(0.2) or {})
+    
+    started = time.monotonic()
+    graph.run()
+    assert time.monotonic() - started < 0.5
+
+
+def test_unknown_dependency_and_cycle_rejected():
+    """Bad graphs fail before any step runs"""
+    events, step = recorder()
+    graph = TaskGraph("test").add("a", step("a"), deps=["missing"])
+    with pytest.raises(ValueError, match="unknown"):
+        graph.run()
+    
+    graph = TaskGraph("test").add("a", step("a"), deps=["b"]).add("b", step("b"), deps=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        graph.run()
+    assert events == []
+
+
+def test_tolerated_failure_gives_error_result():
+    """A step that tolerates errors fails into an error dict and its dependents still run"""
+    def fail(_):
+        raise RuntimeError("no data")
+    
+    graph = TaskGraph("test")
+    graph.add("check", fail, tolerate_errors=True)
+    graph.add("summary", lambda inputs: {"saw": inputs["check"]}, deps=["check"])
+    
+    results = graph.run()
+    assert "no data" in results["check"]["error"]
+    assert results["summary"]["saw"] == results["check"]
+
+
+def test_strict_failure_stops_running_steps_before_returning():
+    """When a strict step raises, running siblings are told to stop and run() waits for them"""
+    sibling = {}
+    
+    def fail(_):
+        time.sleep(0.05)
+        raise RuntimeError("step failed")
+    
+    def long_running(_):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if cancellation_requested():
+                sibling["stopped"] = True
+                break
+            time.sleep(0.01)
+        sibling["finished"] = True
+        return {}
+    
+    events, step = recorder()
+    graph = TaskGraph("test", max_concurrency=2)
+    graph.add("fail", fail)
+    graph.add("sibling", long_running)
+    graph.add("after", step("after"), deps=["fail"])
+    
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="step failed"):
+        graph.run()
+    
+    assert time.monotonic() - started < 2
+    assert sibling == {"stopped": True, "finished": True}
+    assert ("start", "after") not in events
+
+
+def test_timed_out_step_is_skipped():
+    """A step past its timeout gets an error result and its dependents go ahead without it"""
+    graph = TaskGraph("test")
+    graph.add("slow", lambda _: time.sleep(0.5) or {"late": True}, timeout=0.1, tolerate_errors=True)
+    graph.add("next", lambda inputs: {"saw": inputs["slow"]}, deps=["slow"])
+    
+    started = time.monotonic()
+    results = graph.run()
+    
+    assert time.monotonic() - started < 0.4
+    assert "timed out" in results["slow"]["error"]
+    assert results["next"]["saw"] == results["slow"]
+
+
+def test_failure_cancels_llm_call_in_flight():
+    """A sibling's LLM call that is waiting on the API is cancelled when the graph fails"""
+    call = {}
+    
+    class SlowCompletions:
+        async def create(self, **request):
+            call["started"] = True
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                call["cancelled"] = True
+                raise
+    
+    agent = BaseAgent("validation")
+    agent.cache = None
+    agent._get_async_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions()))
+    
+    def fail(_):
+        while not call.get("started"):
+            time.sleep(0.01)
+        raise RuntimeError("step failed")
+    
+    def ask(_):
+        return agent.call_llm([{"role": "user", "content": "hi"}], method="create_risk_assessment")
+    
+    graph = TaskGraph("test", max_concurrency=2)
+    graph.add("fail", fail)
+    graph.add("ask", ask)
+    
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="step failed"):
+        graph.run()
+    
+    assert time.monotonic() - started < 3
+    assert call.get("cancelled")
+
+
+def test_call_after_stop_fails_fast():
+    """Once its graph has failed, a step's next LLM call raises a fatal cancellation error"""
+    agent = BaseAgent("validation")
+    agent.cache = None
+    agent._get_async_client = lambda: pytest.fail("no request should be sent")
+    outcome = {}
+    
+    def fail(_):
+        raise RuntimeError("step failed")
+    
+    def ask(_):
+        while not cancellation_requested():
+            time.sleep(0.01)
+        try:
+            agent.call_llm([{"role": "user", "content": "hi"}], method="create_risk_assessment")
+        except LLMCallError as e:
+            outcome["kind"], outcome["fatal"] = e.kind, e.fatal
+        return {}
+    
+    graph = TaskGraph("test", max_concurrency=2)
+    graph.add("fail", fail)
+    graph.add("ask", ask)
+    with pytest.raises(RuntimeError):
+        graph.run()
+    
+    assert outcome == {"kind": "cancelled", "fatal": True}
+
+
+def test_timeout_cancels_llm_call_and_frees_its_slot():
+    """A timed-out step's LLM call is cancelled and the next step doesn't queue behind its thread"""
+    call = {}
+    
+    class SlowCompletions:
+        async def create(self, **request):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                call["cancelled"] = True
+                raise
+    
+    agent = BaseAgent("refiner")
+    agent.cache = None
+    agent._get_async_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions()))
+    
+    def ask(_):
+        return agent.call_llm([{"role": "user", "content": "hi"}], method="cross_check_claims")
+    
+    graph = TaskGraph("test", max_concurrency=1)
+    graph.add("check", ask, timeout=0.2, tolerate_errors=True)
+    graph.add("next", lambda _: {"ran_at": time.monotonic()}, deps=["check"])
+    
+    started = time.monotonic()
+    results = graph.run()
+    
+    assert "timed out" in results["check"]["error"]
+    assert results["next"]["ran_at"] - started < 0.5
+    deadline = time.monotonic() + 2
+    while not call.get("cancelled") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert call.get("cancelled")
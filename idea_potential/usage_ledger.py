@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+from idea_potential.config import MODEL_PRICING, BATCH_CONFIG
+
+
+def compute_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int,
+                 batch: bool = False) -> float:
+    """Compute the USD cost of a call from MODEL_PRICING"""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        # Dated snapshots (e.g. gpt-4o-2024-08-06) are priced like their base model
+        matches = [name for name in MODEL_PRICING if model.startswith(name)]
+        if not matches:
+            return 0.0
+        pricing = MODEL_PRICING[max(matches, key=len)]
+    
+    uncached_tokens = max(prompt_tokens - cached_tokens, 0)
+    cost = (uncached_tokens * pricing['input']
+            + cached_tokens * pricing.get('cached_input', pricing['input'])
+            + completion_tokens * pricing['output'])
+    if batch:
+        cost *= BATCH_CONFIG['price_multiplier']
+    return cost / 1_000_000
+
+
+class UsageLedger:
+    """Per-run record of every LLM call: tokens, latency and cost by agent and method"""
+    
+    def __init__(self):
+        self.started_at = datetime.now().isoformat()
+        self.entries: List[Dict[str, Any]] = []
+        self.cascade_entries: List[Dict[str, Any]] = []
+        self.truncation_entries: List[Dict[str, Any]] = []
+        self.repair_entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def record(self, agent: str, method: Optional[str], model: str, prompt_tokens: int = 0,
+               cached_tokens: int = 0, completion_tokens: int = 0, latency_seconds: float = 0.0,
+               cache_hit: bool = False, queued_seconds: float = 0.0, attempts: int = 1,
+               batch: bool = False, hedge: bool = False) -> Dict[str, Any]:
+        """Record one LLM call; hedge marks the discarded duplicate of a hedged request"""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "agent": agent,
+            "method": method or "unknown",
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "latency_seconds": round(latency_seconds, 3),
+            "queued_seconds": round(queued_seconds, 3),
+            "cost_usd": round(compute_cost(model, prompt_tokens, cached_tokens, completion_tokens, batch), 6),
+            "cache_hit": cache_hit,
+            "attempts": attempts,
+            "batch": batch,
+            "hedge": hedge
+        }
+        with self._lock:
+            self.entries.append(entry)
+        return entry
+    
+    def record_cascade(self, agent: str, method: Optional[str], model: str, escalated: bool,
+                       reason: Optional[str] = None):
+        """Record whether a cascaded call was answered by the cheap model or escalated"""
+        with self._lock:
+            self.cascade_entries.append({
+                "agent": agent,
+                "method": method or "unknown",
+                "model": model,
+                "escalated": escalated,
+                "reason": reason
+            })
+    
+    def cascade_summary(self) -> List[Dict[str, Any]]:
+        """Escalation rate of every cascaded agent method"""
+        with self._lock:
+            entries = list(self.cascade_entries)
+        groups = defaultdict(list)
+        for entry in entries:
+            groups[(entry['agent'], entry['method'])].append(entry)
+        
+        summary = []
+        for (agent, method), group in groups.items():
+            escalations = [entry for entry in group if entry['escalated']]
+            reasons = defaultdict(int)
+            for entry in escalations:
+                reasons[entry['reason']] += 1
+            summary.append({
+                "agent": agent,
+                "method": method,
+                "calls": len(group),
+                "escalations": len(escalations),
+                "escalation_rate": round(len(escalations) / len(group), 3),
+                "reasons": dict(reasons)
+            })
+        summary.sort(key=lambda row: row['escalation_rate'], reverse=True)
+        return summary
+    
+    def record_truncation(self, agent: str, method: Optional[str], model: str, max_tokens: Optional[int],
+                          continuations: int, completed: bool):
+        """Record a response that hit max_tokens and how many continuations it took to finish"""
+        with self._lock:
+            self.truncation_entries.append({
+                "agent": agent,
+                "method": method or "unknown",
+                "model": model,
+                "max_tokens": max_tokens,
+                "continuations": continuations,
+                "completed": completed
+            })
+    
+    def truncation_summary(self) -> List[Dict[str, Any]]:
+        """Truncated responses per agent method, to tune COMPLETION_BUDGETS"""
+        with self._lock:
+            entries = list(self.truncation_entries)
+        groups = defaultdict(list)
+        for entry in entries:
+            groups[(entry['agent'], entry['method'])].append(entry)
+        
+        summary = []
+        for (agent, method), group in groups.items():
+            summary.append({
+                "agent": agent,
+                "method": method,
+                "max_tokens": group[-1]['max_tokens'],
+                "truncated": len(group),
+                "continuations": sum(entry['continuations'] for entry in group),
+                "unfinished": sum(1 for entry in group if not entry['completed'])
+            })
+        summary.sort(key=lambda row: row['truncated'], reverse=True)
+        return summary
+    
+    def record_repair(self, agent: str, method: Optional[str], response_model: str, fixes: List[str],
+                      repaired: bool):
+        """Record a structured response that failed validation and the fixes applied to it locally"""
+        with self._lock:
+            self.repair_entries.append({
+                "agent": agent,
+                "method": method or "unknown",
+                "response_model": response_model,
+                "repaired": repaired,
+                "fixes": list(fixes)
+            })
+    
+    def repair_summary(self) -> List[Dict[str, Any]]:
+        """Locally repaired and unrepairable responses per agent method"""
+        with self._lock:
+            entries = list(self.repair_entries)
+        groups = defaultdict(list)
+        for entry in entries:
+            groups[(entry['agent'], entry['method'])].append(entry)
+        
+        summary = []
+        for (agent, method), group in groups.items():
+            summary.append({
+                "agent": agent,
+                "method": method,
+                "repaired": sum(1 for entry in group if entry['repaired']),
+                "failed": sum(1 for entry in group if not entry['repaired']),
+                "fixes": [fix for entry in group if entry['repaired'] for fix in entry['fixes']]
+            })
+        summary.sort(key=lambda row: row['repaired'] + row['failed'], reverse=True)
+        return summary
+    
+    def query(self, agent: str = None, method: str = None, model: str = None) -> List[Dict[str, Any]]:
+        """Get the recorded calls matching the given filters"""
+        with self._lock:
+            entries = list(self.entries)
+        return [
+            entry for entry in entries
+            if (agent is None or entry['agent'] == agent)
+            and (method is None or entry['method'] == method)
+            and (model is None or entry['model'] == model)
+        ]
+    
+    def totals(self, entries: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Aggregate token counts, latency and cost over a set of calls (default: all)"""
+        if entries is None:
+            entries = self.query()
+        return {
+            "calls": len(entries),
+            "cache_hits": sum(1 for entry in entries if entry['cache_hit']),
+            "batch_calls": sum(1 for entry in entries if entry.get('batch')),
+            "hedged_duplicates": sum(1 for entry in entries if entry.get('hedge')),
+            "hedge_cost_usd": round(sum(entry['cost_usd'] for entry in entries if entry.get('hedge')), 6),
+            "retries": sum(entry['attempts'] - 1 for entry in entries),
+            "prompt_tokens": sum(entry['prompt_tokens'] for entry in entries),
+            "cached_tokens": sum(entry['cached_tokens'] for entry in entries),
+            "completion_tokens": sum(entry['completion_tokens'] for entry in entries),
+            "total_tokens": sum(entry['total_tokens'] for entry in entries),
+            "latency_seconds": round(sum(entry['latency_seconds'] for entry in entries), 3),
+            "queued_seconds": round(sum(entry['queued_seconds'] for entry in entries), 3),
+            "cost_usd": round(sum(entry['cost_usd'] for entry in entries), 6)
+        }
+    
+    def summarize(self, group_by: Sequence[str] = ("agent", "method")) -> List[Dict[str, Any]]:
+        """Aggregate calls per group, most expensive first"""
+        groups = defaultdict(list)
+        for entry in self.query():
+            groups[tuple(entry[field] for field in group_by)].append(entry)
+        
+        summary = []
+        for key, entries in groups.items():
+            row = dict(zip(group_by, key))
+            row.update(self.totals(entries))
+            summary.append(row)
+        summary.sort(key=lambda row: (row['cost_usd'], row['latency_seconds']), reverse=True)
+        return summary
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the ledger with its totals and per-method breakdown"""
+        return {
+            "started_at": self.started_at,
+            "totals": self.totals(),
+            "by_agent_method": self.summarize(("agent", "method")),
+            "by_model": self.summarize(("model",)),
+            "cascade": self.cascade_summary(),
+            "truncations": self.truncation_summary(),
+            "repairs": self.repair_summary(),
+            "calls": self.query()
+        }
+    
+    def save(self, filepath: str) -> Optional[str]:
+        """Save the ledger to a JSON file"""
+        try:
+            directory = os.path.dirname(filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+            return filepath
+        except Exception as e:
+            print(f"Error saving usage ledger: {e}")
+            return None
+    
+    def print_summary(self, top: int = 10):
+        """Print run totals and the most expensive agent methods"""
+        totals = self.totals()
+        print(f"💰 LLM usage: {totals['calls']} calls, {totals['total_tokens']} tokens "
+              f"({totals['cached_tokens']} of {totals['prompt_tokens']} prompt tokens cached), "
+              f"${totals['cost_usd']:.4f}, {totals['latency_seconds']:.1f}s in calls")
+        if totals['hedged_duplicates']:
+            print(f"  ⏱️ {totals['hedged_duplicates']} hedged duplicate(s) discarded, "
+                  f"~${totals['hedge_cost_usd']:.4f} of the total")
+        for row in self.summarize()[:top]:
+            print(f"  • {row['agent']}.{row['method']}: {row['calls']} calls, {row['total_tokens']} tokens, "
+                  f"${row['cost_usd']:.4f}, {row['latency_seconds']:.1f}s")
+        for row in self.cascade_summary():
+            print(f"  ↗ {row['agent']}.{row['method']}: escalated {row['escalations']}/{row['calls']} "
+                  f"cascaded calls ({row['escalation_rate']:.0%})")
+        for row in self.truncation_summary():
+            print(f"  ✂ {row['agent']}.{row['method']}: {row['truncated']} response(s) hit max_tokens="
+                  f"{row['max_tokens']}, {row['continuations']} continuation(s), {row['unfinished']} unfinished")
+        for row in self.repair_summary():
+            print(f"  🔧 {row['agent']}.{row['method']}: {row['repaired']} response(s) repaired locally "
+                  f"({len(row['fixes'])} fix(es)), {row['failed']} unrepairable")
@@ -2,24 +2,147 @@
 Base Agent Class for Idea Validation Pipeline
 """
 
-import json
-from typing import Dict, Any
+import asyncio
+import time
+from typing import Dict, Any, List
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_openai import ChatOpenAI
 
+from common.cassette import Cassette, get_cassette
+from common.json_extractor import extract_json
+
 
 class BaseAgent:
     def __init__(self, llm: ChatOpenAI):
-        self.llm = llm
+        self.usage = UsageMeter()
+        self.llm = with_usage_meter(with_cassette(llm, type(self).__name__), self.usage)
         self.max_retries = 3
     
     def parse_json_response(self, response: str) -> Dict[str, Any]:
         """Safely parse JSON from LLM response"""
-        try:
-            # Extract JSON from response if wrapped in markdown
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response.strip()
-            return json.loads(json_str)
-        except (json.JSONDecodeError, IndexError) as e:
-            raise ValueError(f"Invalid JSON response: {e}") 
\ No newline at end of file
+        # Tolerates prose around the JSON, fences, near-JSON and truncated output
+        result = extract_json(response)
+        if result is None:
+            raise ValueError("Invalid JSON response: no JSON object found")
+        return result
+
+
+def _to_messages(prompt: Any) -> List[BaseMessage]:
+    """Normalise a chain input (prompt value, message list or string) to messages"""
+    if isinstance(prompt, PromptValue):
+        return prompt.to_messages()
+    if isinstance(prompt, str):
+        return [HumanMessage(content=prompt)]
+    return list(prompt)
+
+
+def _cassette_request(llm: ChatOpenAI, prompt: Any) -> Dict[str, Any]:
+    """Describe a chat model call the same way idea_potential requests are recorded"""
+    roles = {"human": "user", "ai": "assistant"}
+    messages = [{"role": roles.get(message.type, message.type), "content": message.content}
+                for message in _to_messages(prompt)]
+    return {"model": llm.model_name, "messages": messages, "temperature": llm.temperature}
+
+
+def _usage(response: AIMessage) -> Dict[str, int]:
+    metadata = getattr(response, "usage_metadata", None) or {}
+    return {
+        "prompt_tokens": metadata.get("input_tokens", 0),
+        "cached_tokens": (metadata.get("input_token_details") or {}).get("cache_read", 0),
+        "completion_tokens": metadata.get("output_tokens", 0)
+    }
+
+
+class UsageMeter:
+    """Token usage of an agent's LLM calls, including prompt tokens served from the provider's prefix cache"""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+    
+    def add(self, usage: Dict[str, int]):
+        self.calls += 1
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.cached_tokens += usage.get("cached_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+    
+    def totals(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_cache_hit_rate": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0
+        }
+
+
+def with_usage_meter(llm: Runnable, meter: UsageMeter) -> Runnable:
+    """Wrap a chat model so the usage of every call is added to the meter"""
+    
+    def invoke(prompt: Any) -> AIMessage:
+        response = llm.invoke(prompt)
+        meter.add(_usage(response))
+        return response
+    
+    async def ainvoke(prompt: Any) -> AIMessage:
+        response = await llm.ainvoke(prompt)
+        meter.add(_usage(response))
+        return response
+    
+    return RunnableLambda(invoke, afunc=ainvoke, name="usage_meter")
+
+
+def _replayed(entry: Dict[str, Any]) -> AIMessage:
+    """Rebuild a recorded response, with its usage so replayed runs report the same token counts"""
+    usage = entry.get("usage") or {}
+    usage_metadata = {
+        "input_tokens": usage.get("prompt_tokens", 0),
+        "output_tokens": usage.get("completion_tokens", 0),
+        "total_tokens": usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0),
+        "input_token_details": {"cache_read": usage.get("cached_tokens", 0)}
+    }
+    return AIMessage(content=entry["content"] or "", usage_metadata=usage_metadata)
+
+
+def with_cassette(llm: ChatOpenAI, source: str) -> Runnable:
+    """Wrap a chat model so its calls are recorded to, or replayed from, the LLM cassette"""
+    cassette = get_cassette()
+    if cassette is None:
+        return llm
+    
+    def invoke(prompt: Any) -> AIMessage:
+        request = _cassette_request(llm, prompt)
+        if cassette.replaying:
+            entry = cassette.lookup(request)
+            time.sleep(cassette.replay_delay(entry))
+            return _replayed(entry)
+        started = time.perf_counter()
+        response = llm.invoke(prompt)
+        _record(cassette, request, response, time.perf_counter() - started, source)
+        return response
+    
+    async def ainvoke(prompt: Any) -> AIMessage:
+        request = _cassette_request(llm, prompt)
+        if cassette.replaying:
+            entry = cassette.lookup(request)
+            await asyncio.sleep(cassette.replay_delay(entry))
+            return _replayed(entry)
+        started = time.perf_counter()
+        response = await llm.ainvoke(prompt)
+        _record(cassette, request, response, time.perf_counter() - started, source)
+        return response
+    
+    return RunnableLambda(invoke, afunc=ainvoke, name=f"cassette_{llm.model_name}")
+
+
+def _record(cassette: Cassette, request: Dict[str, Any], response: AIMessage, latency: float, source: str):
+    finish_reason = (getattr(response, "response_metadata", None) or {}).get("finish_reason")
+    cassette.record(request, response.content, usage=_usage(response), latency_seconds=latency,
+                    finish_reason=finish_reason, source=f"idea_refinement_engine.{source}")
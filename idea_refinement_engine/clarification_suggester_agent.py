@@ -45,6 +45,8 @@ class GenericSuggestionAgent(BaseAgent):
 - For **Validation Questions**: Provide concrete testing methods and validation approaches
 - For **General Questions**: Provide practical implementation guidance
 
+Generate three diverse ANSWERS or GUIDANCE for each question. Provide concrete, helpful responses that directly address what the user needs to answer - NOT more questions to ask.
+
 **Output Format**:
 ```json
 {{
@@ -74,11 +76,9 @@ class GenericSuggestionAgent(BaseAgent):
 }}
 ```"""),
             ("human", """
-Questions: {questions}
 User Idea: {user_idea}
 Question Context: {question_context}
-
-Generate three diverse ANSWERS or GUIDANCE for each question. Provide concrete, helpful responses that directly address what the user needs to answer - NOT more questions to ask.
+Questions: {questions}
 """)
         ])
     
@@ -6,7 +6,7 @@ Multi-agent system for brainstorming, critiquing, and validating ideas
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 
@@ -18,12 +18,15 @@ from .questioner_agent import QuestionerAgent
 from .reality_miner_agent import RealityMinerAgent
 from .synthesizer_agent import SynthesizerAgent
 from .clarification_suggester_agent import GenericSuggestionAgent
+from common.answer_providers import CLARIFICATION, VALIDATION, AnswerProvider, Question, get_answer_provider
 
 
 class IdeaValidationPipeline:
     """Main pipeline orchestrator using LangGraph"""
     
-    def __init__(self, llm_model: str = "gpt-4"):
+    def __init__(self, llm_model: str = "gpt-4", answers: Optional[AnswerProvider] = None):
+        # Answers the clarification and validation questions instead of input() (default: ANSWER_PROVIDER)
+        self.answers = answers if answers is not None else get_answer_provider()
         # Initialize specific models for each agent
         self.agents = {
             "clarifier": ClarifierAgent(ChatOpenAI(model="gpt-4-turbo", temperature=0.3)),
@@ -87,8 +90,17 @@ class IdeaValidationPipeline:
             {"brainstormer": "brainstormer", "single_clarification": "single_clarification"}
         )
         
-        # After single clarification, go back to clarifier
-        workflow.add_edge("single_clarification", "clarifier")
+        # After single clarification, go back to clarifier; without an answer the idea goes ahead as clarified so far
+        def should_continue_after_single_clarification(state: ValidationState) -> str:
+            if state["clarified_idea"] and state["clarified_idea"].get("status") == "complete":
+                return "brainstormer"
+            return "clarifier"
+        
+        workflow.add_conditional_edges(
+            "single_clarification",
+            should_continue_after_single_clarification,
+            {"brainstormer": "brainstormer", "clarifier": "clarifier"}
+        )
         
         # Linear flow for the rest
         workflow.add_edge("brainstormer", "critic")
@@ -121,6 +133,77 @@ class IdeaValidationPipeline:
     async def _run_synthesizer(self, state: ValidationState) -> ValidationState:
         return await self.agents["synthesizer"].run(state)
     
+    async def _suggest(self, question: str, user_idea: str, question_type: str) -> Optional[Dict[str, Any]]:
+        """Generate and show AI answer suggestions for a question, unless the answer provider doesn't use them"""
+        if self.answers is not None and not self.answers.uses_suggestions:
+            return None
+        
+        suggestion_agent = self.agents["generic_suggester"]
+        suggestions_result = await suggestion_agent.generate_suggestions(
+            [question], 
+            user_idea, 
+            question_type
+        )
+        
+        # Show AI suggestions if available
+        if suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
+            question_suggestions = suggestions_result["suggestions"][0]
+            if question_suggestions.get("suggestions"):
+                print("\n🤖 AI Suggestions:")
+                for j, suggestion in enumerate(question_suggestions["suggestions"], 1):
+                    print(f"   {j}. [{suggestion['type'].upper()}] {suggestion['suggestion']}")
+                    print(f"      Reasoning: {suggestion['reasoning']}")
+                print("   4. Write your own answer")
+            else:
+                print("\n🤖 AI Suggestions: (No suggestions available)")
+                print("   Write your own answer:")
+        else:
+            print("\n🤖 AI Suggestions: (Generating suggestions...)")
+            print("   Write your own answer:")
+        
+        return suggestions_result
+    
+    @staticmethod
+    def _suggestion_texts(suggestions_result: Optional[Dict[str, Any]]) -> List[str]:
+        if not suggestions_result or not suggestions_result.get("suggestions"):
+            return []
+        return [suggestion["suggestion"] for suggestion in suggestions_result["suggestions"][0].get("suggestions") or []]
+    
+    def _answer(self, question: Question, suggestions_result: Optional[Dict[str, Any]]) -> Optional[str]:
+        """The answer provider's answer, or the user's at the terminal when there is no provider"""
+        if self.answers is None:
+            return self._ask_user(suggestions_result)
+        answer = self.answers.answer(question)
+        if answer is not None:
+            print(f"✅ Answered: {answer}")
+        return answer
+    
+    def _ask_user(self, suggestions_result: Optional[Dict[str, Any]]) -> str:
+        """Ask at the terminal for a suggestion's number or an own answer"""
+        while True:
+            choice = input("\nChoose option (1-4) or write your answer: ").strip()
+            
+            if choice in ['1', '2', '3'] and suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
+                question_suggestions = suggestions_result["suggestions"][0]
+                if question_suggestions.get("suggestions") and len(question_suggestions["suggestions"]) >= int(choice):
+                    # User chose an AI suggestion
+                    suggestion_idx = int(choice) - 1
+                    selected_suggestion = question_suggestions["suggestions"][suggestion_idx]
+                    answer = selected_suggestion["suggestion"]
+                    print(f"✅ Selected: {answer}")
+                    return answer
+                else:
+                    print("Invalid choice. Please select a valid option or write your answer.")
+            elif choice == '4' or not choice.isdigit():
+                # User wants to write their own answer
+                answer = input("Your answer: ").strip()
+                if answer:
+                    return answer
+                else:
+                    print("Please provide an answer.")
+            else:
+                print("Invalid choice. Please select 1-4 or write your answer.")
+    
     async def _get_single_clarification(self, state: ValidationState) -> ValidationState:
         """Get single clarification from user with AI suggestions"""
         if state.get("next_clarification_question"):
@@ -135,54 +218,19 @@ class IdeaValidationPipeline:
             print(f"Reason: {reason}")
             print(f"\nQuestion: {question}")
             
-            # Generate AI suggestions for this specific question
-            suggestion_agent = self.agents["generic_suggester"]
-            suggestions_result = await suggestion_agent.generate_suggestions(
-                [question], 
-                state["user_idea"], 
-                "clarification"
-            )
-            
-            # Show AI suggestions if available
-            if suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
-                question_suggestions = suggestions_result["suggestions"][0]
-                if question_suggestions.get("suggestions"):
-                    print("\n🤖 AI Suggestions:")
-                    for j, suggestion in enumerate(question_suggestions["suggestions"], 1):
-                        print(f"   {j}. [{suggestion['type'].upper()}] {suggestion['suggestion']}")
-                        print(f"      Reasoning: {suggestion['reasoning']}")
-                    print("   4. Write your own answer")
-                else:
-                    print("\n🤖 AI Suggestions: (No suggestions available)")
-                    print("   Write your own answer:")
-            else:
-                print("\n🤖 AI Suggestions: (Generating suggestions...)")
-                print("   Write your own answer:")
-            
-            # Get user choice
-            while True:
-                choice = input("\nChoose option (1-4) or write your answer: ").strip()
-                
-                if choice in ['1', '2', '3'] and suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
-                    question_suggestions = suggestions_result["suggestions"][0]
-                    if question_suggestions.get("suggestions") and len(question_suggestions["suggestions"]) >= int(choice):
-                        # User chose an AI suggestion
-                        suggestion_idx = int(choice) - 1
-                        selected_suggestion = question_suggestions["suggestions"][suggestion_idx]
-                        answer = selected_suggestion["suggestion"]
-                        print(f"✅ Selected: {answer}")
-                        break
-                    else:
-                        print("Invalid choice. Please select a valid option or write your answer.")
-                elif choice == '4' or not choice.isdigit():
-                    # User wants to write their own answer
-                    answer = input("Your answer: ").strip()
-                    if answer:
-                        break
-                    else:
-                        print("Please provide an answer.")
-                else:
-                    print("Invalid choice. Please select 1-4 or write your answer.")
+            suggestions_result = await self._suggest(question, state["user_idea"], "clarification")
+            answer = self._answer(Question(
+                question, CLARIFICATION, self._suggestion_texts(suggestions_result),
+                {"idea": state["user_idea"], "category": category, "reason": reason},
+                number=state.get("iteration_count", 0) + 1
+            ), suggestions_result)
+            if answer is None:
+                # Nothing more to add: go ahead with the idea as clarified so far
+                print("\n⏭️ No answer, continuing with the idea as clarified so far...")
+                if state["clarified_idea"]:
+                    state["clarified_idea"]["status"] = "complete"
+                state["next_clarification_question"] = None
+                return state
             
             # Update the user idea with this clarification
             clarification_text = f"Q: {question}\nA: {answer}"
@@ -229,54 +277,15 @@ class IdeaValidationPipeline:
                 print(f"   Risk: {linked_risk}")
                 print(f"   Test Method: {test_method}")
                 
-                # Generate AI suggestions for validation questions
-                suggestion_agent = self.agents["generic_suggester"]
-                suggestions_result = await suggestion_agent.generate_suggestions(
-                    [question], 
-                    state["user_idea"], 
-                    "validation"
-                )
-                
-                # Show AI suggestions if available
-                if suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
-                    question_suggestions = suggestions_result["suggestions"][0]
-                    if question_suggestions.get("suggestions"):
-                        print("\n🤖 AI Suggestions:")
-                        for j, suggestion in enumerate(question_suggestions["suggestions"], 1):
-                            print(f"   {j}. [{suggestion['type'].upper()}] {suggestion['suggestion']}")
-                            print(f"      Reasoning: {suggestion['reasoning']}")
-                        print("   4. Write your own answer")
-                    else:
-                        print("\n🤖 AI Suggestions: (No suggestions available)")
-                        print("   Write your own answer:")
-                else:
-                    print("\n🤖 AI Suggestions: (Generating suggestions...)")
-                    print("   Write your own answer:")
-                
-                # Get user choice
-                while True:
-                    choice = input("\nChoose option (1-4) or write your answer: ").strip()
-                    
-                    if choice in ['1', '2', '3'] and suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
-                        question_suggestions = suggestions_result["suggestions"][0]
-                        if question_suggestions.get("suggestions") and len(question_suggestions["suggestions"]) >= int(choice):
-                            # User chose an AI suggestion
-                            suggestion_idx = int(choice) - 1
-                            selected_suggestion = question_suggestions["suggestions"][suggestion_idx]
-                            response = selected_suggestion["suggestion"]
-                            print(f"✅ Selected: {response}")
-                            break
-                        else:
-                            print("Invalid choice. Please select a valid option or write your answer.")
-                    elif choice == '4' or not choice.isdigit():
-                        # User wants to write their own answer
-                        response = input("Your answer: ").strip()
-                        if response:
-                            break
-                        else:
-                            print("Please provide an answer.")
-                    else:
-                        print("Invalid choice. Please select 1-4 or write your answer.")
+                suggestions_result = await self._suggest(question, state["user_idea"], "validation")
+                response = self._answer(Question(
+                    question, VALIDATION, self._suggestion_texts(suggestions_result),
+                    {"idea": state["user_idea"], "linked_risk": linked_risk, "test_method": test_method},
+                    number=i
+                ), suggestions_result)
+                if response is None:
+                    print("\n⏭️ No more answers, continuing analysis...")
+                    break
                 
                 user_responses.append({
                     "question": question,
@@ -346,54 +355,16 @@ class IdeaValidationPipeline:
                 print(f"Test Method: {test_method}")
                 print(f"Reasoning: {reasoning}")
                 
-                # Generate AI suggestions for this specific question
-                suggestion_agent = self.agents["generic_suggester"]
-                suggestions_result = await suggestion_agent.generate_suggestions(
-                    [question], 
-                    state["user_idea"], 
-                    "validation"
-                )
-                
-                # Show AI suggestions if available
-                if suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
-                    question_suggestions = suggestions_result["suggestions"][0]
-                    if question_suggestions.get("suggestions"):
-                        print("\n🤖 AI Suggestions:")
-                        for j, suggestion in enumerate(question_suggestions["suggestions"], 1):
-                            print(f"   {j}. [{suggestion['type'].upper()}] {suggestion['suggestion']}")
-                            print(f"      Reasoning: {suggestion['reasoning']}")
-                        print("   4. Write your own answer")
-                    else:
-                        print("\n🤖 AI Suggestions: (No suggestions available)")
-                        print("   Write your own answer:")
-                else:
-                    print("\n🤖 AI Suggestions: (Generating suggestions...)")
-                    print("   Write your own answer:")
-                
-                # Get user choice
-                while True:
-                    choice = input("\nChoose option (1-4) or write your answer: ").strip()
-                    
-                    if choice in ['1', '2', '3'] and suggestions_result and suggestions_result.get("suggestions") and len(suggestions_result["suggestions"]) > 0:
-                        question_suggestions = suggestions_result["suggestions"][0]
-                        if question_suggestions.get("suggestions") and len(question_suggestions["suggestions"]) >= int(choice):
-                            # User chose an AI suggestion
-                            suggestion_idx = int(choice) - 1
-                            selected_suggestion = question_suggestions["suggestions"][suggestion_idx]
-                            response = selected_suggestion["suggestion"]
-                            print(f"✅ Selected: {response}")
-                            break
-                        else:
-                            print("Invalid choice. Please select a valid option or write your answer.")
-                    elif choice == '4' or not choice.isdigit():
-                        # User wants to write their own answer
-                        response = input("Your answer: ").strip()
-                        if response:
-                            break
-                        else:
-                            print("Please provide an answer.")
-                    else:
-                        print("Invalid choice. Please select 1-4 or write your answer.")
+                suggestions_result = await self._suggest(question, state["user_idea"], "validation")
+                response = self._answer(Question(
+                    question, VALIDATION, self._suggestion_texts(suggestions_result),
+                    {"idea": state["user_idea"], "linked_risk": linked_risk, "test_method": test_method,
+                     "reasoning": reasoning},
+                    number=len(user_responses) + 1
+                ), suggestions_result)
+                if response is None:
+                    print("\n⏭️ No more answers, continuing analysis...")
+                    break
                 
                 # Store the response
                 user_responses.append({
@@ -415,6 +386,26 @@ class IdeaValidationPipeline:
         
         return state
     
+    def get_usage_summary(self) -> Dict[str, Any]:
+        """Token usage of the current run per agent, with prompt tokens served from the prefix cache"""
+        summary = {name: agent.usage.totals() for name, agent in self.agents.items()}
+        prompt_tokens = sum(usage["prompt_tokens"] for usage in summary.values())
+        cached_tokens = sum(usage["cached_tokens"] for usage in summary.values())
+        summary["total"] = {
+            "calls": sum(usage["calls"] for usage in summary.values()),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": sum(usage["completion_tokens"] for usage in summary.values()),
+            "prompt_cache_hit_rate": round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0
+        }
+        return summary
+    
+    def print_usage_summary(self):
+        total = self.get_usage_summary()["total"]
+        print(f"\n💰 LLM usage: {total['calls']} calls, {total['prompt_tokens']} prompt tokens "
+              f"({total['cached_tokens']} cached, {total['prompt_cache_hit_rate']:.0%}), "
+              f"{total['completion_tokens']} completion tokens")
+    
     def _save_report_to_file(self, report_content: str, user_idea: str) -> str:
         """Save the final report to a markdown file with datetime filename"""
         try:
@@ -476,9 +467,13 @@ class IdeaValidationPipeline:
             "analysis_duration_minutes": None
         }
         
+        for agent in self.agents.values():
+            agent.usage.reset()
+        
         try:
             # Run the graph
             final_state = await self.graph.ainvoke(initial_state)
+            self.print_usage_summary()
             
             # Calculate analysis duration
             if final_state.get("analysis_start_time"):
@@ -514,7 +509,8 @@ class IdeaValidationPipeline:
                 "tracking": {
                     "validation_id": final_state.get("validation_id"),
                     "analysis_duration_minutes": final_state.get("analysis_duration_minutes"),
-                    "analysis_start_time": final_state.get("analysis_start_time")
+                    "analysis_start_time": final_state.get("analysis_start_time"),
+                    "usage": self.get_usage_summary()
                 }
             }
             
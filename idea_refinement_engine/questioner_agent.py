@@ -75,9 +75,6 @@ Test Method: "data analysis"
 5. Consider the user's development stage (MVP vs production)
 6. Focus on MVP-level validation for early-stage ideas
 
-**Previous Questions and Responses**:
-{previous_qa}
-
 **Remaining Critical Uncertainties**:
 - Technical feasibility gaps
 - Market validation needs  
@@ -92,6 +89,9 @@ Test Method: "data analysis"
 5. Focus on MVP-level questions if user is building an MVP
 6. If all major uncertainties are addressed, return "complete"
 
+Generate the next most critical validation question. Focus on MVP-level concerns if this appears to be an early-stage idea.
+The idea, critique and previous questions and responses are given in the user message.
+
 **Output Format**:
 ```json
 {{
@@ -104,13 +104,12 @@ Test Method: "data analysis"
   }}
 }}
 ```"""),
+            # The Q&A grows by one exchange per question, so it goes after the parts that stay the same
             ("human", """
+User Idea: {user_idea}
 Critique Analysis: {critique}
 Previous Q&A: {previous_qa}
 Current Question Index: {question_index}
-User Idea: {user_idea}
-
-Generate the next most critical validation question. Focus on MVP-level concerns if this appears to be an early-stage idea.
 """)
         ])
     
@@ -10,11 +10,15 @@
 Main entry point for the pforprompts-usecases project
 """
 
+import argparse
 import asyncio
 import json
+import os
 import sys
 from idea_refinement_engine.pipeline import IdeaValidationPipeline
 from idea_potential import run_idea_analysis
+from idea_potential.config import PORTFOLIO_CONFIG
+from idea_potential.portfolio import load_ideas, run_portfolio
 from settings import OPENAI_API_KEY
 
 
@@ -62,7 +66,7 @@ async def run_idea_refinement_engine():
 
 
 def run_idea_potential_analysis():
-    """Run the idea potential analysis system"""
+    """Run the idea potential analysis system; returns whether it succeeded, for the exit status"""
     
     print("🎯 Idea Potential Analysis System")
     print("=" * 50)
@@ -71,22 +75,55 @@ def run_idea_potential_analysis():
     if len(sys.argv) > 1:
         if sys.argv[1] == "--interactive" or sys.argv[1] == "-i":
             # Interactive mode
-            run_idea_analysis(interactive=True)
+            return "error" not in run_idea_analysis(interactive=True)
         elif sys.argv[1] == "--all-agents" or sys.argv[1] == "-a":
             # Run with all agents enabled
             idea = " ".join(sys.argv[2:]) if len(sys.argv) > 2 else None
-            run_idea_analysis(idea=idea, use_suggester_agent=True, use_roadmap_agent=True, use_refiner_agent=True)
+            return "error" not in run_idea_analysis(idea=idea, use_suggester_agent=True, use_roadmap_agent=True,
+                                                    use_refiner_agent=True)
+        elif sys.argv[1] == "--resume" or sys.argv[1] == "-r":
+            # Resume a checkpointed run, skipping the steps it already finished
+            if len(sys.argv) < 3:
+                print("Usage: python main.py --resume <run_id>")
+                return False
+            return "error" not in run_idea_analysis(run_id=sys.argv[2])
+        elif sys.argv[1] == "--batch" or sys.argv[1] == "-b":
+            # Analyze every idea in a JSONL/CSV file, resuming from its results file
+            return run_idea_batch(sys.argv[2:])
         elif sys.argv[1] == "--minimal" or sys.argv[1] == "-m":
             # Run with only required agents
             idea = " ".join(sys.argv[2:]) if len(sys.argv) > 2 else None
-            run_idea_analysis(idea=idea, use_suggester_agent=False, use_roadmap_agent=False, use_refiner_agent=False)
+            return "error" not in run_idea_analysis(idea=idea, use_suggester_agent=False, use_roadmap_agent=False,
+                                                    use_refiner_agent=False)
         else:
             # Idea provided as argument
             idea = " ".join(sys.argv[1:])
-            run_idea_analysis(idea=idea)
+            return "error" not in run_idea_analysis(idea=idea)
     else:
         # Get idea from user input with agent selection
-        run_idea_analysis()
+        return "error" not in run_idea_analysis()
+
+
+def run_idea_batch(args):
+    """Analyze every idea in a JSONL or CSV file non-interactively; returns whether none of them failed"""
+    
+    parser = argparse.ArgumentParser(prog="main.py --batch", description="Analyze many ideas from a JSONL or CSV file")
+    parser.add_argument("path", help="JSONL (one idea object or string per line) or CSV file with an 'idea' column")
+    parser.add_argument("--output", "-o", default=PORTFOLIO_CONFIG['output_path'],
+                        help="JSONL results file; ideas already completed in it are skipped")
+    parser.add_argument("--concurrency", "-c", type=int, default=PORTFOLIO_CONFIG['max_concurrency'],
+                        help="Ideas analyzed at once")
+    parser.add_argument("--all-agents", "-a", action="store_true", help="Also run the roadmap and refiner agents")
+    parser.add_argument("--log", help="File for the agents' output (default: next to the results file)")
+    options = parser.parse_args(args)
+    
+    ideas = load_ideas(options.path)
+    summary = run_portfolio(
+        ideas, output_path=options.output, max_concurrency=options.concurrency,
+        log_path=options.log or f"{os.path.splitext(options.output)[0]}.log",
+        use_roadmap_agent=options.all_agents, use_refiner_agent=options.all_agents
+    )
+    return summary['failed'] == 0
 
 
 def show_menu():
@@ -152,6 +189,10 @@ if __name__ == "__main__":
 # i have an idea to build a platform like stackoverflow for developers, only for their struggle in prompts, llm hallucinations, which can be fixed by tweaking prompt, so community will help user refine prompt to get the expected answer
 # """
 
+    if len(sys.argv) > 1:
+        # Command line options, e.g. --batch ideas.jsonl or --resume <run_id>
+        sys.exit(0 if run_idea_potential_analysis() else 1)
+
     idea = "building agentic os"
 
     run_idea_analysis(
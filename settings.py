@@ -9,3 +9,16 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
 REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID', '')
 REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET', '')
+
+# LLM record/replay (common.cassette): 'off', 'record' or 'replay'
+LLM_CASSETTE_MODE = os.getenv('LLM_CASSETTE_MODE', 'off').lower()
+LLM_CASSETTE_PATH = os.getenv('LLM_CASSETTE_PATH', 'cassettes/llm_cassette.jsonl')
+# Simulated replay latency: 'none', 'recorded[:scale]', 'fixed:seconds', 'uniform:low,high' or 'lognormal:median,sigma'
+LLM_CASSETTE_LATENCY = os.getenv('LLM_CASSETTE_LATENCY', 'recorded')
+LLM_CASSETTE_SEED = int(os.getenv('LLM_CASSETTE_SEED', '0'))
+
+# Who answers the engines' clarification and validation questions (common.answer_providers):
+# 'console', 'skip', 'auto[:choice]' (pick a suggested answer) or 'scripted:<path>'
+ANSWER_PROVIDER = os.getenv('ANSWER_PROVIDER', 'console')
+# Answers the questions a script has no answers left for, e.g. 'auto' (default: stop asking)
+ANSWER_PROVIDER_FALLBACK = os.getenv('ANSWER_PROVIDER_FALLBACK', '')